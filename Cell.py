@@ -1,14 +1,40 @@
-import random
 from environment.grid.EnvironmentGrid import EnvironmentGrid
 from tools.direction import Direction
 
 # import environment.physical_data as phy
 
 
+class PopulationAttribute:
+    """Descriptor of a Cell attribute stored in an array of the cell's population.
+    Read on the Cell class, it returns the default value given to the new cells.
+    When a setter name is given, the value is changed through this method of the
+    population instead of being written directly in the array.
+    """
+
+    def __init__(self, default=None, setter: str = None) -> None:
+        self.default = default
+        self.setter = setter
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, cell, owner=None):
+        if cell is None:
+            return self.default
+        return getattr(cell.population, self.name)[cell.index].item()
+
+    def __set__(self, cell, value) -> None:
+        if self.setter is None:
+            getattr(cell.population, self.name)[cell.index] = value
+        else:
+            getattr(cell.population, self.setter)(cell.index, value)
+
+
 class Cell:
     """Class reprensenting a cellular individual as a colored cube,
     capable of movement and replication.
     The cell's color is changing along with its age.
+    A cell is a view of one cell of a CellPopulation, where its attributes are stored.
 
     Attributes:
     calculus_width (float) : size of the width of the cell in meters
@@ -33,6 +59,9 @@ class Cell:
     replication_rate (float): probability of the cell to replicate in one iteration of the game loop
     age (int): actual age of the cell or the number of loops it has been living
     max_age (int): maximal age the cell can be
+    population (CellPopulation): the population storing the cell
+    handle (tuple): stable (slot, generation) handle of the cell in its population
+    index (int): actual index of the cell in the arrays of its population
     """
 
     calculus_width: float = 1 * 10 ** (-6)  # m
@@ -45,57 +74,96 @@ class Cell:
     width: int = 20  # pixels
     length: int = 20  # pixels
 
-    x: float
-    y: float
-    display_x: float
-    display_y: float
-    ending_x: float
-    ending_y: float
+    x = PopulationAttribute()
+    y = PopulationAttribute()
+    display_x = PopulationAttribute()
+    display_y = PopulationAttribute()
+    ending_x = PopulationAttribute()
+    ending_y = PopulationAttribute()
 
     birth_color: tuple = (0, 12, 255)
-    color: tuple = birth_color
     death_color: tuple = (0, 0, 0)
-    display_rect: tuple
 
-    speed: float = 5  # pixels.loop⁻¹
+    speed = PopulationAttribute(5)  # pixels.loop⁻¹
 
-    replication_rate: float = 1 / 1000
+    replication_rate = PopulationAttribute(1 / 1000, "setReplicationRate")
 
-    age: int = 0
-    max_age: int = 6000  # loops
+    max_age = PopulationAttribute(6000, "setMaxAge")  # loops
+
+    population: object
+    handle: tuple
 
     def __init__(
-        self, environment: EnvironmentGrid, pos_x: float = 0, pos_y: float = 0
+        self,
+        environment: EnvironmentGrid,
+        pos_x: float = 0,
+        pos_y: float = 0,
+        population=None,
     ):
-        # The starting position of the cell
-        self.x = pos_x
-        self.y = pos_y
-        self.display_x = pos_x
-        self.display_y = pos_y
-
-        self.ending_x = self.x + self.width
-        self.ending_y = self.y + self.length
-
-        environment.changeMultipleOccupationStates(
-            (self.x, self.y),
-            (self.x + self.width, self.y + self.length),
-            True,
+        """
+        Args:
+          environment (EnvironmentGrid): object of class EnvironmentGrid the cell lies on
+          pos_x (float): starting position of the cell along the x axis
+          pos_y (float): starting position of the cell along the y axis
+          population (CellPopulation): population the cell is added to. A new
+            population containing only this cell is created if None
+        """
+        if population is None:
+            from CellPopulation import CellPopulation
+
+            population = CellPopulation(capacity=1)
+        self.population = population
+        self.handle = population.getHandle(
+            population.addCell(environment, pos_x, pos_y)
         )
 
-        self.display_rect = (self.x, self.y, self.width, self.length)
+    @classmethod
+    def fromPopulation(cls, population, index: int) -> "Cell":
+        """Returns a view of a cell already stored in a population.
+
+        Args:
+          population (CellPopulation): the population storing the cell
+          index (int): index of the cell in the population
+        """
+        cell = cls.__new__(cls)
+        cell.population = population
+        cell.handle = population.getHandle(index)
+        return cell
+
+    @property
+    def index(self) -> int:
+        return self.population.getIndex(self.handle)
 
     def __str__(self) -> str:
         string = f"Cell's age is : {self.age} loops\n"
         string += f"Its color in RGB encoding is {self.color}\n"
         return string
 
+    @property
+    def age(self) -> int:
+        index = self.index
+        return int(self.population.getAges(slice(index, index + 1))[0])
+
+    @age.setter
+    def age(self, new_age: int) -> None:
+        self.population.setAge(self.index, new_age)
+
+    @property
+    def color(self) -> tuple:
+        self.adaptColor()
+        return tuple(self.population.color[self.index].tolist())
+
+    @property
+    def display_rect(self) -> tuple:
+        return (self.display_x, self.display_y, self.width, self.length)
+
     def isReplicationPossible(self) -> bool:
         """Takes a random number between 0 and 1 and checks if it is lower than the replication rate of the cell
 
         Returns:
           bool: True if the cell is randomly capable of replicating itself
         """
-        return random.random() <= self.replication_rate
+        return self.population.random_generator.random() <= self.replication_rate
 
     def deleteCellFromEnvironment(self, environment: EnvironmentGrid) -> None:
         """Change every Environment units' is_occupied attribute the cell is currently lying over
@@ -104,9 +172,7 @@ class Cell:
         Args:
             environment (EnvironmentGrid): object of class EnvironmentGrid
         """
-        environment.changeMultipleOccupationStates(
-            (self.x, self.y), (self.ending_x, self.ending_y), False
-        )
+        self.population.deleteCellFromEnvironment(environment, self.index)
 
     def addCellOnEnvironment(self, environment: EnvironmentGrid) -> None:
         """Change every Environment units' is_occupied attribute the cell is currently lying over
@@ -115,9 +181,7 @@ class Cell:
         Args:
             environment (EnvironmentGrid): object of class EnvironmentGrid
         """
-        environment.changeMultipleOccupationStates(
-            (self.x, self.y), (self.ending_x, self.ending_y), True
-        )
+        self.population.addCellOnEnvironment(environment, self.index)
 
     def moving(self, environment: EnvironmentGrid, direction: tuple = ()) -> None:
         """
@@ -130,65 +194,30 @@ class Cell:
             direction (tuple): tuple containing the x and y coordinates of the movement
         """
         if direction == ():
-            direction = Direction.getRandomDirection()
+            direction = Direction.getRandomDirection(self.population.random_generator)
         else:
             pass
 
-        self.deleteCellFromEnvironment(environment)
-
-        # Compute the potential coordinates of the cell
-        x_movement = self.speed * direction[0]
-        y_movement = self.speed * direction[1]
-
-        is_space_for_moving = environment.isSpace(
-            (self.x, self.y), (self.ending_x, self.ending_y), (x_movement, y_movement)
-        )
-
-        # print("The cell is moving : ", is_space_for_moving)
-
-        if is_space_for_moving:
-            self.x += x_movement
-            self.y += y_movement
-            self.display_x = (self.display_x + x_movement) % environment.width
-            self.display_y = (self.display_y + y_movement) % environment.length
-            self.ending_x += x_movement
-            self.ending_y += y_movement
-
-            self.display_rect = (
-                self.display_x,
-                self.display_y,
-                self.width,
-                self.length,
-            )
-
-        self.addCellOnEnvironment(environment)
+        self.population.moveCell(environment, self.index, direction)
 
     def replicating(self, environment: EnvironmentGrid):
         """
-        Add a new cell to cells_list if their is enough space to create it.
+        Add a new cell to the cell's population if their is enough space to create it.
         Args :
           environment (EnvironmentGrid): an object of the instance Environment from the environment.py module
-          cells_list (list): the list of all the cells of our environment
+
+        Returns:
+          Cell: the new cell, None if the cell didn't replicate
         """
         if self.isReplicationPossible():
-            random_direction = Direction.getRandomReplicationDirection()
-            # print("rdm dir :",random_direction)
-            needed_replication_space = (
-                self.width * random_direction[0],
-                self.length * random_direction[1],
+            random_direction = Direction.getRandomReplicationDirection(
+                self.population.random_generator
             )
-            is_space_for_replication = environment.isSpace(
-                (self.x, self.y),
-                (self.ending_x, self.ending_y),
-                needed_replication_space,
+            new_index = self.population.replicateCell(
+                environment, self.index, random_direction
             )
-            # print("is_space :",is_space)
-            if is_space_for_replication:
-                return Cell(
-                    environment,
-                    self.x + self.width * random_direction[0],
-                    self.y + self.length * random_direction[1],
-                )
+            if new_index is not None:
+                return Cell.fromPopulation(self.population, new_index)
             else:
                 pass
         else:
@@ -208,12 +237,8 @@ class Cell:
         """
         Linear interpolation to determine the cell's color depending of its age
         """
-        alpha = self.age / self.max_age
-        self.color = (
-            (1 - alpha) * self.birth_color[0] + alpha * self.death_color[0],
-            (1 - alpha) * self.birth_color[1] + alpha * self.death_color[1],
-            (1 - alpha) * self.birth_color[2] + alpha * self.death_color[2],
-        )
+        index = self.index
+        self.population.adaptColors(slice(index, index + 1))
         return None
 
 
@@ -0,0 +1,707 @@
+import numpy as np
+from Cell import Cell
+from environment.grid.EnvironmentGrid import EnvironmentGrid
+from environment.unit.EnvironmentUnit import EnvironmentUnit
+from tools.random_generator import RandomGenerator
+from tools.timing_wheel import TimingWheel
+
+
+class CellPopulation:
+    """Container storing every cell of a world as a structure of arrays : each
+    attribute of the cells is a contiguous numpy array, the cell number i being
+    stored at the index i of every array.
+    Aging, color adaptation, death tests and replication draws are computed for the
+    whole population at once. Cell objects are views of one cell of the population.
+
+    Deaths and replications are events scheduled on a timing wheel : the death of a
+    cell is scheduled at its birth, since max_age is known, and its next replication
+    attempt is drawn from a geometric distribution of parameter replication_rate.
+    The ages are never incremented, they are deduced from the birth steps and the
+    clock of the population.
+
+    Removing a cell moves the last cell of the arrays in its place, so indices change
+    when cells die. Each cell is therefore also identified by a stable handle
+    (slot, generation) : the slot is reused by a later cell once the cell is dead,
+    its generation being then increased, so a handle never designates another cell.
+
+    Attributes:
+    size (int): number of cells in the population
+    capacity (int): number of cells the arrays can store before being enlarged
+    x (np.ndarray): coordinates along the x axis of the cells
+    y (np.ndarray): coordinates along the y axis of the cells
+    display_x (np.ndarray): coordinates along the x axis used to display the cells
+    display_y (np.ndarray): coordinates along the y axis used to display the cells
+    ending_x (np.ndarray): coordinates along the x axis of the bottom right corners
+    ending_y (np.ndarray): coordinates along the y axis of the bottom right corners
+    birth_step (np.ndarray): values of the clock when the cells were born, shifted
+      when the cells age faster or slower than one loop per loop
+    age (np.ndarray): ages of the cells, in loops, computed from birth_step
+    next_replication_step (np.ndarray): steps of the next replication attempts, -1 when
+      the cell never replicates
+    color (np.ndarray): array of shape (capacity, 3) of the RGB colors of the cells
+    max_age (np.ndarray): maximal ages of the cells, in loops
+    replication_rate (np.ndarray): probabilities of the cells to replicate in one loop
+    speed (np.ndarray): speeds of the cells in pixel.loop⁻¹
+    energy (np.ndarray): internal energies of the cells in J, gained by the uptake of
+      glucose and shared with the daughter cells
+    default_max_age (int): max_age given to the cells added to the population
+    default_replication_rate (float): replication_rate given to the cells added
+    default_speed (float): speed given to the cells added to the population
+    random_generator (RandomGenerator): source of the random draws of the cells
+    slot (np.ndarray): slot of the handle of each cell
+    slot_index (np.ndarray): index of the cell using each slot, -1 for a free slot
+    slot_generation (np.ndarray): generation of each slot, increased when its cell dies
+    free_slots (list): slots not used by any cell, ready to be reused
+    event_wheel (TimingWheel): wheel storing the (kind, slot, generation) death and
+      replication events
+    clock (int): actual step of the population, the step of event_wheel
+    """
+
+    # Kinds of the events of event_wheel
+    DEATH_EVENT: int = 0
+    REPLICATION_EVENT: int = 1
+
+    # Name and type of every array storing one attribute of the cells
+    cell_attributes: dict = {
+        "x": float,
+        "y": float,
+        "display_x": float,
+        "display_y": float,
+        "ending_x": float,
+        "ending_y": float,
+        "birth_step": float,
+        "next_replication_step": np.int64,
+        "max_age": np.int64,
+        "replication_rate": float,
+        "speed": float,
+        "energy": float,
+    }
+
+    size: int
+    capacity: int
+
+    def __init__(
+        self,
+        max_age: int = None,
+        replication_rate: float = None,
+        speed: float = None,
+        capacity: int = 16,
+        random_generator: RandomGenerator = None,
+    ) -> None:
+        """
+        Args:
+          max_age (int): max_age of the cells, Cell.max_age if None
+          replication_rate (float): replication_rate of the cells, Cell.replication_rate
+            if None
+          speed (float): speed of the cells, Cell.speed if None
+          capacity (int): number of cells the arrays can initially store
+          random_generator (RandomGenerator): source of the random draws of the cells,
+            a new unseeded generator if None
+        """
+        if random_generator is None:
+            random_generator = RandomGenerator()
+        self.random_generator = random_generator
+
+        self.default_max_age = Cell.max_age if max_age is None else max_age
+        self.default_replication_rate = (
+            Cell.replication_rate if replication_rate is None else replication_rate
+        )
+        self.default_speed = Cell.speed if speed is None else speed
+
+        self.size = 0
+        self.capacity = max(1, capacity)
+        for name, dtype in self.cell_attributes.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+        self.color = np.zeros((self.capacity, 3))
+
+        self.slot = np.zeros(self.capacity, dtype=np.int64)
+        self.slot_index = np.full(self.capacity, -1, dtype=np.int64)
+        self.slot_generation = np.zeros(self.capacity, dtype=np.int64)
+        self.free_slots = []
+        self.used_slots_number = 0
+
+        self.event_wheel = TimingWheel()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield Cell.fromPopulation(self, index)
+
+    def __getitem__(self, index: int) -> Cell:
+        if not -self.size <= index < self.size:
+            raise IndexError("cell index out of range")
+        return Cell.fromPopulation(self, index % self.size)
+
+    def __str__(self) -> str:
+        string = f"Population of {self.size} cells\n"
+        if self.size > 0:
+            string += f"Mean age : {self.age.mean():.1f} loops\n"
+        return string
+
+    @property
+    def clock(self) -> int:
+        return self.event_wheel.current_step
+
+    @property
+    def age(self) -> np.ndarray:
+        return self.getAges()
+
+    def getAges(self, cells: slice = None) -> np.ndarray:
+        """Returns the ages of some cells, in loops
+
+        Args:
+          cells (slice): cells whose ages are returned, every cell if None
+        """
+        if cells is None:
+            cells = slice(0, self.size)
+        return self.clock - self.birth_step[cells]
+
+    def enlargeCapacity(self, needed_capacity: int) -> None:
+        """Doubles the capacity of the arrays until they can store needed_capacity cells.
+
+        Args:
+          needed_capacity (int): number of cells the arrays must be able to store
+        """
+        new_capacity = self.capacity
+        while new_capacity < needed_capacity:
+            new_capacity *= 2
+        if new_capacity == self.capacity:
+            return None
+
+        for name in list(self.cell_attributes) + ["color", "slot"]:
+            old_array = getattr(self, name)
+            new_array = np.zeros((new_capacity,) + old_array.shape[1:], old_array.dtype)
+            new_array[: self.size] = old_array[: self.size]
+            setattr(self, name, new_array)
+
+        # Slots are indexed by slot, not by cell index
+        self.slot_index = np.concatenate(
+            (self.slot_index, np.full(new_capacity - self.capacity, -1, np.int64))
+        )
+        self.slot_generation = np.concatenate(
+            (self.slot_generation, np.zeros(new_capacity - self.capacity, np.int64))
+        )
+        self.capacity = new_capacity
+
+    def getHandle(self, index: int) -> tuple:
+        """Returns the stable handle of a cell.
+
+        Args:
+          index (int): index of the cell
+
+        Returns:
+          tuple: (slot, generation) of the cell
+        """
+        slot = int(self.slot[index])
+        return (slot, int(self.slot_generation[slot]))
+
+    def isAlive(self, handle: tuple) -> bool:
+        """Returns True if the cell designated by handle is still in the population
+
+        Args:
+          handle (tuple): (slot, generation) of the cell
+        """
+        slot, generation = handle
+        return self.slot_generation[slot] == generation and self.slot_index[slot] != -1
+
+    def getIndex(self, handle: tuple) -> int:
+        """Returns the actual index of the cell designated by handle
+
+        Args:
+          handle (tuple): (slot, generation) of the cell
+
+        Returns:
+          int: index of the cell in the arrays
+        """
+        if not self.isAlive(handle):
+            raise KeyError(f"The cell of handle {handle} is not in the population")
+        return int(self.slot_index[handle[0]])
+
+    def appendCell(self, pos_x: float, pos_y: float) -> int:
+        """Adds a new cell of age 0 at the end of the arrays, without marking its
+        position on any environment grid.
+
+        Args:
+          pos_x (float): coordinate along the x axis of the cell
+          pos_y (float): coordinate along the y axis of the cell
+
+        Returns:
+          int: index of the new cell
+        """
+        self.enlargeCapacity(self.size + 1)
+        index = self.size
+        self.size += 1
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = self.used_slots_number
+            self.used_slots_number += 1
+        self.slot[index] = slot
+        self.slot_index[slot] = index
+
+        self.x[index], self.y[index] = pos_x, pos_y
+        self.display_x[index], self.display_y[index] = pos_x, pos_y
+        self.ending_x[index] = pos_x + Cell.width
+        self.ending_y[index] = pos_y + Cell.length
+        self.birth_step[index] = self.clock
+        self.max_age[index] = self.default_max_age
+        self.replication_rate[index] = self.default_replication_rate
+        self.speed[index] = self.default_speed
+        self.energy[index] = 0
+        self.color[index] = Cell.birth_color
+
+        self.scheduleDeath(index)
+        self.scheduleReplications(np.array([index]))
+        return index
+
+    def addCell(self, environment: EnvironmentGrid, pos_x: float, pos_y: float) -> int:
+        """Adds a new cell to the population and sets the environment units it is
+        lying over as occupied.
+
+        Args:
+          environment (EnvironmentGrid): object of class EnvironmentGrid
+          pos_x (float): coordinate along the x axis of the cell
+          pos_y (float): coordinate along the y axis of the cell
+
+        Returns:
+          int: index of the new cell
+        """
+        index = self.appendCell(pos_x, pos_y)
+        self.addCellOnEnvironment(environment, index)
+        return index
+
+    def copyCell(self, population: "CellPopulation", index: int) -> int:
+        """Appends a copy of a cell of another population.
+
+        Args:
+          population (CellPopulation): population containing the cell to copy
+          index (int): index of the cell in population
+
+        Returns:
+          int: index of the copy in this population
+        """
+        new_index = self.appendCell(population.x[index], population.y[index])
+        for name in list(self.cell_attributes) + ["color"]:
+            getattr(self, name)[new_index] = getattr(population, name)[index]
+
+        # The age is kept, the clocks of the populations being different
+        self.setAge(new_index, population.getAges(slice(index, index + 1))[0])
+        self.setReplicationRate(new_index, population.replication_rate[index])
+        return new_index
+
+    def extractCells(self, indices: np.ndarray) -> dict:
+        """Removes cells from the population, without changing the environment, and
+        returns their attributes so that insertCells can add them to another population.
+
+        Args:
+          indices (np.ndarray): indices of the cells to extract
+
+        Returns:
+          dict: array of the values of each attribute of cell_attributes, of "color"
+            and of "age"
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        cells = {
+            name: getattr(self, name)[indices].copy()
+            for name in list(self.cell_attributes) + ["color"]
+        }
+        cells["age"] = self.clock - self.birth_step[indices]
+        self.removeCells(indices)
+        return cells
+
+    def insertCells(self, cells: dict) -> np.ndarray:
+        """Appends cells extracted from another population by extractCells, keeping
+        their ages and parameters. Their environment units are supposed to be already
+        occupied. Their deaths and next replication attempts are scheduled again.
+
+        Args:
+          cells (dict): dictionary returned by extractCells
+
+        Returns:
+          np.ndarray: indices of the new cells
+        """
+        new_indices = np.array(
+            [self.appendCell(x, y) for x, y in zip(cells["x"], cells["y"])],
+            dtype=np.int64,
+        )
+        for name in list(self.cell_attributes) + ["color"]:
+            getattr(self, name)[new_indices] = cells[name]
+        self.birth_step[new_indices] = self.clock - cells["age"]
+        for index in new_indices.tolist():
+            self.scheduleDeath(index)
+        self.scheduleReplications(new_indices)
+        return new_indices
+
+    def removeCell(self, index: int) -> None:
+        """Removes a cell from the population in constant time, the last cell of the
+        arrays taking its index.
+
+        Args:
+          index (int): index of the cell to remove
+        """
+        slot = self.slot[index]
+        self.slot_index[slot] = -1
+        self.slot_generation[slot] += 1
+        self.free_slots.append(int(slot))
+
+        last_index = self.size - 1
+        if index != last_index:
+            for name in list(self.cell_attributes) + ["color", "slot"]:
+                array = getattr(self, name)
+                array[index] = array[last_index]
+            self.slot_index[self.slot[index]] = index
+        self.size -= 1
+
+    def removeCells(self, indices) -> None:
+        """Removes several cells from the population in one sweep, in a time
+        proportional to the number of removed cells.
+
+        Args:
+          indices (np.ndarray): indices of the cells to remove
+        """
+        # From the highest index, so that the moved last cells are never to be removed
+        for index in sorted(np.asarray(indices).tolist(), reverse=True):
+            self.removeCell(index)
+
+    def deleteCellFromEnvironment(
+        self, environment: EnvironmentGrid, index: int
+    ) -> None:
+        """Sets the environment units a cell is lying over as not occupied.
+
+        Args:
+          environment (EnvironmentGrid): object of class EnvironmentGrid
+          index (int): index of the cell
+        """
+        environment.changeMultipleOccupationStates(
+            (self.x[index], self.y[index]),
+            (self.ending_x[index], self.ending_y[index]),
+            False,
+        )
+
+    def addCellOnEnvironment(self, environment: EnvironmentGrid, index: int) -> None:
+        """Sets the environment units a cell is lying over as occupied.
+
+        Args:
+          environment (EnvironmentGrid): object of class EnvironmentGrid
+          index (int): index of the cell
+        """
+        environment.changeMultipleOccupationStates(
+            (self.x[index], self.y[index]),
+            (self.ending_x[index], self.ending_y[index]),
+            True,
+        )
+
+    def setAge(self, index: int, age: int) -> None:
+        """Changes the age of a cell and schedules its death accordingly.
+
+        Args:
+          index (int): index of the cell
+          age (int): new age of the cell, in loops
+        """
+        self.birth_step[index] = self.clock - age
+        self.scheduleDeath(index)
+
+    def setMaxAge(self, index: int, max_age: int) -> None:
+        """Changes the max_age of a cell and schedules its death accordingly.
+
+        Args:
+          index (int): index of the cell
+          max_age (int): new maximal age of the cell, in loops
+        """
+        self.max_age[index] = max_age
+        self.scheduleDeath(index)
+
+    def setReplicationRate(self, index: int, replication_rate: float) -> None:
+        """Changes the replication_rate of a cell and draws its next replication attempt.
+
+        Args:
+          index (int): index of the cell
+          replication_rate (float): new probability of the cell to replicate in one loop
+        """
+        self.replication_rate[index] = replication_rate
+        self.scheduleReplications(np.array([index]))
+
+    def scheduleDeath(self, index: int) -> None:
+        """Schedules the death of a cell at the first step its age is superior to its
+        max_age. Events made obsolete by a change of age or max_age are ignored when due.
+
+        Args:
+          index (int): index of the cell
+        """
+        slot, generation = self.getHandle(index)
+        self.event_wheel.schedule(
+            int(self.birth_step[index] + self.max_age[index] + 1),
+            (self.DEATH_EVENT, slot, generation),
+        )
+
+    def scheduleReplications(self, indices: np.ndarray) -> None:
+        """Draws the next replication attempts of several cells and schedules them.
+        The number of steps until the next attempt follows a geometric distribution,
+        as if a Bernoulli draw of parameter replication_rate was made at each step.
+
+        Args:
+          indices (np.ndarray): indices of the cells
+        """
+        replication_rates = self.replication_rate[indices]
+        can_replicate = replication_rates > 0
+        self.next_replication_step[indices[~can_replicate]] = -1
+
+        indices = indices[can_replicate]
+        next_steps = self.clock + self.random_generator.drawReplicationDelays(
+            replication_rates[can_replicate]
+        )
+        self.next_replication_step[indices] = next_steps
+        for index, step in zip(indices.tolist(), next_steps.tolist()):
+            slot, generation = self.getHandle(index)
+            self.event_wheel.schedule(step, (self.REPLICATION_EVENT, slot, generation))
+
+    def popDueEvents(self) -> tuple:
+        """Removes the events due at the actual step from the wheel and keeps those
+        still valid.
+
+        Returns:
+          tuple: (dying_cells, replicating_cells), the indices of the cells too old to
+            live and the handles of the cells attempting to replicate at this step
+        """
+        dying_cells = []
+        replicating_cells = []
+        for step, (kind, slot, generation) in self.event_wheel.popDueEvents():
+            if not self.isAlive((slot, generation)):
+                continue
+            index = int(self.slot_index[slot])
+            if kind == self.DEATH_EVENT:
+                if self.clock - self.birth_step[index] > self.max_age[index]:
+                    dying_cells.append(index)
+                else:
+                    # The cell aged slower than one loop per loop
+                    self.scheduleDeath(index)
+            elif self.next_replication_step[index] == step:
+                replicating_cells.append((slot, generation))
+        return np.unique(np.array(dying_cells, dtype=np.int64)), replicating_cells
+
+    def advanceClock(self) -> None:
+        """Makes every cell one loop older"""
+        self.event_wheel.advance()
+
+    def ageCells(self, aging_rates: np.ndarray) -> None:
+        """Makes every cell age by its aging rate during the last advance of the clock,
+        instead of one loop. Cells becoming too old are found by getTooOldCells, their
+        scheduled deaths being possibly later.
+
+        Args:
+          aging_rates (np.ndarray): number of loops each cell aged during the last loop
+        """
+        self.birth_step[: self.size] += 1 - np.asarray(aging_rates)
+
+    def adaptColors(self, cells: slice = None) -> None:
+        """Linear interpolation to determine the cells' colors depending of their ages
+
+        Args:
+          cells (slice): cells whose colors are adapted, every cell if None
+        """
+        if cells is None:
+            cells = slice(0, self.size)
+        alpha = (self.getAges(cells) / self.max_age[cells])[:, None]
+        self.color[cells] = (1 - alpha) * np.array(Cell.birth_color) + alpha * np.array(
+            Cell.death_color
+        )
+
+    def getTooOldCells(self) -> np.ndarray:
+        """Returns the indices of the cells whose age is superior to their max_age"""
+        return np.flatnonzero(self.age > self.max_age[: self.size])
+
+    def getFootprints(self, units_on_width: int, units_on_length: int) -> tuple:
+        """Returns the units of a grid lying under every cell, the same ones as
+        EnvironmentGrid.getRegionSlices, computed for the whole population at once.
+
+        Args:
+          units_on_width (int): number of units of the grid along the x axis
+          units_on_length (int): number of units of the grid along the y axis
+
+        Returns:
+          tuple: (cell_indices, x_indices, y_indices), with one element per unit of
+            the footprint of every cell, the units being wrapped around the grid
+        """
+        axes = []
+        for starts, endings, unit_size, units_number in (
+            (self.x, self.ending_x, EnvironmentUnit.width, units_on_width),
+            (self.y, self.ending_y, EnvironmentUnit.length, units_on_length),
+        ):
+            starts = np.floor(starts[: self.size]).astype(np.int64)
+            endings = np.ceil(endings[: self.size]).astype(np.int64)
+            units_counts = np.clip(-((starts - endings) // unit_size), 0, units_number)
+            offsets = np.arange(units_counts.max(initial=0))
+            axes.append(
+                (
+                    (starts[:, None] // unit_size + offsets) % units_number,
+                    offsets < units_counts[:, None],
+                )
+            )
+        (x_indices, x_inside), (y_indices, y_inside) = axes
+        inside = x_inside[:, :, None] & y_inside[:, None, :]
+        return (
+            np.broadcast_to(np.arange(self.size)[:, None, None], inside.shape)[inside],
+            np.broadcast_to(x_indices[:, :, None], inside.shape)[inside],
+            np.broadcast_to(y_indices[:, None, :], inside.shape)[inside],
+        )
+
+    def getCenterUnits(self, units_on_width: int, units_on_length: int) -> tuple:
+        """Returns the units of a grid lying under the centers of every cell
+
+        Args:
+          units_on_width (int): number of units of the grid along the x axis
+          units_on_length (int): number of units of the grid along the y axis
+
+        Returns:
+          tuple: (x_indices, y_indices), the indices of the unit of each cell
+        """
+        x_centers = (self.x[: self.size] + self.ending_x[: self.size]) / 2
+        y_centers = (self.y[: self.size] + self.ending_y[: self.size]) / 2
+        x_indices = np.floor(x_centers / EnvironmentUnit.width).astype(np.int64)
+        y_indices = np.floor(y_centers / EnvironmentUnit.length).astype(np.int64)
+        return x_indices % units_on_width, y_indices % units_on_length
+
+    def moveCell(
+        self, environment: EnvironmentGrid, index: int, direction: tuple
+    ) -> bool:
+        """Makes a cell move in a direction, after checking if the environment in the
+        direction isn't occupied by others cells.
+
+        Args:
+          environment (EnvironmentGrid): object of class EnvironmentGrid
+          index (int): index of the cell
+          direction (tuple): tuple containing the x and y coordinates of the movement
+
+        Returns:
+          bool: True if the cell has moved
+        """
+        self.deleteCellFromEnvironment(environment, index)
+
+        # Compute the potential coordinates of the cell
+        x_movement = self.speed[index] * direction[0]
+        y_movement = self.speed[index] * direction[1]
+
+        is_space_for_moving = environment.isSpace(
+            (self.x[index], self.y[index]),
+            (self.ending_x[index], self.ending_y[index]),
+            (x_movement, y_movement),
+        )
+
+        if is_space_for_moving:
+            self.x[index] += x_movement
+            self.y[index] += y_movement
+            self.display_x[index] = (
+                self.display_x[index] + x_movement
+            ) % environment.width
+            self.display_y[index] = (
+                self.display_y[index] + y_movement
+            ) % environment.length
+            self.ending_x[index] += x_movement
+            self.ending_y[index] += y_movement
+
+        self.addCellOnEnvironment(environment, index)
+        return is_space_for_moving
+
+    def replicateCell(
+        self, environment: EnvironmentGrid, index: int, direction: tuple
+    ) -> int:
+        """Adds a new cell next to a cell, in the given direction, if there is enough
+        space to create it.
+
+        Args:
+          environment (EnvironmentGrid): object of class EnvironmentGrid
+          index (int): index of the replicating cell
+          direction (tuple): one of the replication directions of Direction
+
+        Returns:
+          int: index of the new cell, None if there wasn't enough space
+        """
+        needed_replication_space = (
+            Cell.width * direction[0],
+            Cell.length * direction[1],
+        )
+        is_space_for_replication = environment.isSpace(
+            (self.x[index], self.y[index]),
+            (self.ending_x[index], self.ending_y[index]),
+            needed_replication_space,
+        )
+        if is_space_for_replication:
+            new_index = self.addCell(
+                environment,
+                self.x[index] + needed_replication_space[0],
+                self.y[index] + needed_replication_space[1],
+            )
+            self.energy[index] /= 2
+            self.energy[new_index] = self.energy[index]
+            return new_index
+        return None
+
+
+if __name__ == "__main__":
+    enviro = EnvironmentGrid(20, 20)
+    population = CellPopulation()
+    population.addCell(enviro, 0, 0)
+    population.addCell(enviro, 50, 0)
+    print(len(population) == 2)  # OK
+
+    # Aging tests
+    population.setAge(1, 7000)
+    print(population.getTooOldCells())  # OK -> [1]
+    print(population.popDueEvents()[0])  # OK -> [1]
+    population.advanceClock()
+    population.adaptColors()
+    print(population.color[0], population.color[1])  # OK
+
+    # Movement and replication tests
+    print(population.moveCell(enviro, 0, (1, 0)))  # OK
+    print(population.replicateCell(enviro, 0, (0, 1)))  # OK -> 2
+    print(enviro)
+
+    # Removal tests
+    removed_handle = population.getHandle(1)
+    moved_handle = population.getHandle(2)
+    population.removeCell(1)
+    print(population.x[: len(population)])  # OK -> [5. 5.]
+    print(population.isAlive(removed_handle) == False)  # OK
+    print(population.getIndex(moved_handle) == 1)  # OK
+    print(population.getHandle(population.appendCell(0, 60)) != removed_handle)  # OK
+    population.removeCells([0, 2])
+    print(population.getIndex(moved_handle) == 0)  # OK
+    print(population[0])  # OK
+
+    # Footprint tests : the units of getRegionSlices, wrapped around the grid
+    population.appendCell(92.5, 40)
+    cell_indices, x_indices, y_indices = population.getFootprints(20, 20)
+    for index in range(len(population)):
+        footprint = np.zeros((20, 20), dtype=bool)
+        footprint[
+            x_indices[cell_indices == index], y_indices[cell_indices == index]
+        ] = 1
+        expected = np.zeros((20, 20), dtype=bool)
+        for x_slice, y_slice in enviro.getRegionSlices(
+            (population.x[index], population.y[index]),
+            (population.ending_x[index], population.ending_y[index]),
+        ):
+            expected[x_slice, y_slice] = True
+        print((footprint == expected).all())  # OK
+    print(np.bincount(cell_indices).tolist() == [16, 20])  # OK
+    print([indices.tolist() for indices in population.getCenterUnits(20, 20)])
+    # OK -> [[3, 0], [6, 10]]
+
+    # Aging rate tests : a cell aging slower dies later, a faster one earlier
+    birth_clock = population.clock
+    for index in (0, 1):
+        population.setAge(index, 0)
+        population.setMaxAge(index, 10)
+    death_ages = {}
+    for step in range(25):
+        for index in population.popDueEvents()[0].tolist():
+            death_ages.setdefault(index, population.clock - birth_clock)
+        population.advanceClock()
+        population.ageCells([0.5, 2])
+        if step == 5:
+            print(population.getTooOldCells().tolist() == [1])  # OK
+    print(death_ages == {0: 21, 1: 11})  # OK
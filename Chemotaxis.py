@@ -0,0 +1,157 @@
+from CellPopulation import CellPopulation
+from environment.grid.GlucoseGrid import GlucoseGrid
+from tools.direction import Direction
+from tools.random_generator import RandomGenerator
+import numpy as np
+
+
+class Chemotaxis:
+    """Biased random walk of the cells towards the glucose. The probability of each
+    direction of Direction.DIRECTIONS grows exponentially with the glucose gained by
+    moving along it, estimated from the gradient of the concentrations.
+    The gradient and the cumulative probabilities of the 8 directions are computed
+    for every unit of the grid once per change of the glucose grid, then read for the
+    unit under the center of every cell, so a step of the walk costs one gather and
+    one draw for the whole population.
+
+    Attributes:
+      sensitivity (float): log-weight added to a direction per kg/m³ of glucose gained
+        by moving one unit along it. 0 for a uniform random walk
+      preference_table (np.ndarray): array of shape (8, units_on_width,
+        units_on_length) of the cumulative probabilities of the directions in every
+        unit, one plane per direction
+      glucose_grid (GlucoseGrid): grid preference_table was computed for, None
+        before the first computation
+      glucose_version (int): version of glucose_grid preference_table was computed at
+    """
+
+    sensitivity: float  # m³/kg
+    preference_table: np.ndarray
+    glucose_grid: GlucoseGrid
+    glucose_version: int
+
+    def __init__(self, sensitivity: float = 10**4) -> None:
+        """
+        Args:
+          sensitivity (float): log-weight added to a direction per kg/m³ of glucose
+            gained by moving one unit along it
+        """
+        self.sensitivity = sensitivity
+        self.preference_table = None
+        self.glucose_grid = None
+        self.glucose_version = None
+
+    def __str__(self) -> str:
+        return f"Chemotaxis of sensitivity {self.sensitivity} m³/kg\n"
+
+    def computeGradient(self, glucose_grid: GlucoseGrid) -> np.ndarray:
+        """Returns the gradient of the glucose concentrations by centered differences,
+        the grid being periodic
+
+        Args:
+          glucose_grid (GlucoseGrid): grid of the glucose concentrations
+
+        Returns:
+          np.ndarray: array of shape (2, units_on_width, units_on_length) of the
+            derivatives along x and y, in kg/m³ per unit
+        """
+        glucose = np.asarray(glucose_grid.glucose_array)
+        gradient = np.empty((2,) + glucose.shape)
+        for axis in (0, 1):
+            np.subtract(
+                np.roll(glucose, -1, axis),
+                np.roll(glucose, 1, axis),
+                out=gradient[axis],
+            )
+        gradient /= 2
+        return gradient
+
+    def updatePreferenceTable(self, glucose_grid: GlucoseGrid) -> None:
+        """Computes the cumulative probabilities of the directions in every unit, if
+        the glucose grid changed since the last computation
+
+        Args:
+          glucose_grid (GlucoseGrid): grid of the glucose concentrations
+        """
+        if (
+            self.glucose_grid is glucose_grid
+            and self.glucose_version == glucose_grid.version
+        ):
+            return
+        x_gradient, y_gradient = self.sensitivity * self.computeGradient(glucose_grid)
+        # The largest log-weight of each unit, removed to avoid overflows, is the one
+        # of an axis since the diagonal movements are half as long
+        largest_log_weights = np.maximum(np.abs(x_gradient), np.abs(y_gradient))
+
+        preference_table = np.empty(
+            (len(Direction.DIRECTIONS),) + x_gradient.shape, dtype=np.float32
+        )
+        cumulative_weights = np.zeros(x_gradient.shape)
+        weights = np.empty(x_gradient.shape)
+        for index, (x_movement, y_movement) in enumerate(Direction.DIRECTIONS):
+            np.multiply(x_gradient, x_movement, out=weights)
+            weights += y_movement * y_gradient
+            weights -= largest_log_weights
+            cumulative_weights += np.exp(weights, out=weights)
+            preference_table[index] = cumulative_weights
+        preference_table /= preference_table[-1]
+        # The last direction catches the draws lost to the rounding
+        preference_table[-1] = 1
+        self.preference_table = preference_table
+        self.glucose_grid = glucose_grid
+        self.glucose_version = glucose_grid.version
+
+    def drawDirectionIndices(
+        self, population: CellPopulation, glucose_grid: GlucoseGrid
+    ) -> np.ndarray:
+        """Draws an index of Direction.DIRECTIONS for every cell, following the
+        preferences of the unit under its center
+
+        Args:
+          population (CellPopulation): the moving cells
+          glucose_grid (GlucoseGrid): grid of the glucose concentrations
+
+        Returns:
+          np.ndarray: integers between 0 and 7
+        """
+        self.updatePreferenceTable(glucose_grid)
+        x_indices, y_indices = population.getCenterUnits(
+            glucose_grid.units_on_width, glucose_grid.units_on_length
+        )
+        cumulative_probabilities = self.preference_table.reshape(
+            len(Direction.DIRECTIONS), -1
+        )[:, x_indices * glucose_grid.units_on_length + y_indices]
+        return population.random_generator.drawWeightedDirectionIndices(
+            cumulative_probabilities
+        )
+
+
+if __name__ == "__main__":
+    # Glucose increasing along x : the cells mostly move towards the east
+    glucose_grid = GlucoseGrid(40, 40)
+    glucose_grid.glucose_array[...] = 0.001 * np.abs(np.arange(40) - 20)[:, None]
+    glucose_grid.signalUnitsChange()
+    population = CellPopulation(random_generator=RandomGenerator(0))
+    for i in range(100):
+        population.appendCell(150, 5 * i)
+    chemotaxis = Chemotaxis(sensitivity=5000)
+    direction_indices = chemotaxis.drawDirectionIndices(population, glucose_grid)
+    x_movements = np.array(Direction.DIRECTIONS)[direction_indices, 0]
+    print(x_movements.mean() > 0.5)  # OK
+    print(chemotaxis.preference_table.shape == (8, 40, 40))  # OK
+
+    # The table is kept until the grid changes
+    preference_table = chemotaxis.preference_table
+    chemotaxis.drawDirectionIndices(population, glucose_grid)
+    print(chemotaxis.preference_table is preference_table)  # OK
+    glucose_grid.changeMultipleGlucoseConcentration([30], [10], 0)
+    chemotaxis.drawDirectionIndices(population, glucose_grid)
+    print(chemotaxis.preference_table is not preference_table)  # OK
+
+    # Without sensitivity, every direction is equally likely
+    chemotaxis = Chemotaxis(sensitivity=0)
+    chemotaxis.updatePreferenceTable(glucose_grid)
+    print(
+        np.allclose(chemotaxis.preference_table, np.arange(1, 9)[:, None, None] / 8)
+    )  # OK
+    print(chemotaxis)
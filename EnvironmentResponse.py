@@ -0,0 +1,203 @@
+from CellPopulation import CellPopulation
+from environment.grid.GlucoseGrid import GlucoseGrid
+from environment.grid.TemperatureGrid import TemperatureGrid
+import environment.physical_data as phy
+import numpy as np
+
+
+class EnvironmentResponse:
+    """Dependence of the replications and of the aging of the cells on the temperature
+    and the glucose concentration of the unit under their centers.
+    The local values are gathered for the whole population by one indexed read of the
+    field arrays, and turned into factors by response curves computed on arrays :
+      the replication rate of a cell is its replication_rate, reached at the optimal
+      temperature without glucose limitation, times a cardinal temperature factor
+      (Rosso's model with inflection) and a Monod factor of the glucose.
+      the aging rate, in loops per loop, follows the Arrhenius law around the
+      reference temperature, where the cells age one loop per loop.
+
+    Attributes:
+      minimal_temperature (float): temperature below which the cells don't replicate,
+        in K
+      optimal_temperature (float): temperature of the fastest replications, in K. It
+        must be closer to maximal_temperature than to minimal_temperature
+      maximal_temperature (float): temperature above which the cells don't
+        replicate, in K
+      glucose_half_saturation (float): glucose concentration halving the
+        replication rate, in kg/m³. 0 for replications not limited by the glucose
+      aging_activation_energy (float): activation energy of the aging, in J/mol
+      reference_temperature (float): temperature at which the cells age one loop per
+        loop, in K
+    """
+
+    minimal_temperature: float  # K
+    optimal_temperature: float  # K
+    maximal_temperature: float  # K
+    glucose_half_saturation: float  # kg/m³
+    aging_activation_energy: float  # J/mol
+    reference_temperature: float  # K
+
+    def __init__(
+        self,
+        minimal_temperature: float = 278.15,
+        optimal_temperature: float = 310.15,
+        maximal_temperature: float = 318.15,
+        glucose_half_saturation: float = 0,
+        aging_activation_energy: float = 5 * 10**4,
+        reference_temperature: float = 298.15,
+    ) -> None:
+        """
+        Args:
+          minimal_temperature (float): temperature below which the cells don't
+            replicate, in K
+          optimal_temperature (float): temperature of the fastest replications, in K
+          maximal_temperature (float): temperature above which the cells don't
+            replicate, in K
+          glucose_half_saturation (float): glucose concentration halving the
+            replication rate, in kg/m³, 0 for replications not limited by the glucose
+          aging_activation_energy (float): activation energy of the aging, in J/mol
+          reference_temperature (float): temperature at which the cells age one loop
+            per loop, in K
+        """
+        if not (
+            minimal_temperature
+            < (minimal_temperature + maximal_temperature) / 2
+            < optimal_temperature
+            < maximal_temperature
+        ):
+            raise ValueError(
+                "The optimal temperature must lie between the middle of the minimal and "
+                + "maximal temperatures and the maximal temperature"
+            )
+        self.minimal_temperature = minimal_temperature
+        self.optimal_temperature = optimal_temperature
+        self.maximal_temperature = maximal_temperature
+        self.glucose_half_saturation = glucose_half_saturation
+        self.aging_activation_energy = aging_activation_energy
+        self.reference_temperature = reference_temperature
+
+    def __str__(self) -> str:
+        string = f"Replications between {self.minimal_temperature} K and "
+        string += (
+            f"{self.maximal_temperature} K, optimal at {self.optimal_temperature} K\n"
+        )
+        string += f"Aging activation energy : {self.aging_activation_energy} J/mol\n"
+        return string
+
+    def sampleEnvironment(
+        self,
+        population: CellPopulation,
+        temperature_grid: TemperatureGrid,
+        glucose_grid: GlucoseGrid,
+    ) -> tuple:
+        """Returns the temperature and the glucose concentration of the unit under the
+        center of every cell
+
+        Args:
+          population (CellPopulation): the cells sampling their environment
+          temperature_grid (TemperatureGrid): grid of the temperatures
+          glucose_grid (GlucoseGrid): grid of the glucose concentrations, of the same
+            size as temperature_grid
+
+        Returns:
+          tuple: (temperatures, concentrations), arrays in K and kg/m³
+        """
+        x_indices, y_indices = population.getCenterUnits(
+            temperature_grid.units_on_width, temperature_grid.units_on_length
+        )
+        # Flat indices of the units, shared by the reads of both fields
+        unit_indices = x_indices * temperature_grid.units_on_length + y_indices
+        return (
+            temperature_grid.temperature_array.reshape(-1)[unit_indices],
+            glucose_grid.glucose_array.reshape(-1)[unit_indices],
+        )
+
+    def computeTemperatureFactors(self, temperatures: np.ndarray) -> np.ndarray:
+        """Returns the cardinal temperature factors of the replication rates, 1 at the
+        optimal temperature and 0 outside of the minimal and maximal temperatures
+
+        Args:
+          temperatures (np.ndarray): temperatures of the cells, in K
+        """
+        t_min = self.minimal_temperature
+        t_opt = self.optimal_temperature
+        t_max = self.maximal_temperature
+        temperatures = np.clip(temperatures, t_min, t_max)
+        return (
+            (temperatures - t_max)
+            * (temperatures - t_min) ** 2
+            / (
+                (t_opt - t_min)
+                * (
+                    (t_opt - t_min) * (temperatures - t_opt)
+                    - (t_opt - t_max) * (t_opt + t_min - 2 * temperatures)
+                )
+            )
+        )
+
+    def computeGlucoseFactors(self, concentrations: np.ndarray) -> np.ndarray:
+        """Returns the Monod factors of the replication rates, all equal to 1 when the
+        replications aren't limited by the glucose
+
+        Args:
+          concentrations (np.ndarray): glucose concentrations of the cells, in kg/m³
+        """
+        if self.glucose_half_saturation == 0:
+            return np.ones(len(concentrations))
+        concentrations = np.maximum(concentrations, 0)
+        return concentrations / (self.glucose_half_saturation + concentrations)
+
+    def computeReplicationFactors(
+        self, temperatures: np.ndarray, concentrations: np.ndarray
+    ) -> np.ndarray:
+        """Returns the fractions of their replication_rate the cells replicate at
+
+        Args:
+          temperatures (np.ndarray): temperatures of the cells, in K
+          concentrations (np.ndarray): glucose concentrations of the cells, in kg/m³
+        """
+        return self.computeTemperatureFactors(
+            temperatures
+        ) * self.computeGlucoseFactors(concentrations)
+
+    def computeAgingRates(self, temperatures: np.ndarray) -> np.ndarray:
+        """Returns the number of loops the cells age during one loop
+
+        Args:
+          temperatures (np.ndarray): temperatures of the cells, in K
+        """
+        return np.exp(
+            self.aging_activation_energy
+            / phy.R
+            * (1 / self.reference_temperature - 1 / np.asarray(temperatures))
+        )
+
+
+if __name__ == "__main__":
+    response = EnvironmentResponse(glucose_half_saturation=0.001)
+    temperatures = np.array([270, 278.15, 298.15, 310.15, 318.15, 330])
+    factors = response.computeTemperatureFactors(temperatures)
+    print(np.allclose(factors[[0, 1, 3, 4, 5]], [0, 0, 1, 0, 0]))  # OK
+    print(0 < factors[2] < 1)  # OK
+    print(np.allclose(response.computeGlucoseFactors([0, 0.001]), [0, 0.5]))  # OK
+    aging_rates = response.computeAgingRates([288.15, 298.15, 308.15])
+    print(aging_rates[0] < aging_rates[1] == 1 < aging_rates[2])  # OK
+
+    # Every cell samples the units under its center
+    temperature_grid = TemperatureGrid(40, 40, 298.15)
+    glucose_grid = GlucoseGrid(40, 40, 0.002)
+    temperature_grid.changeMultipleTemperature([4], [4], 310.15)
+    population = CellPopulation()
+    for x, y in ((12, 12), (100, 100)):
+        population.appendCell(x, y)
+    temperatures, concentrations = response.sampleEnvironment(
+        population, temperature_grid, glucose_grid
+    )
+    print(temperatures.tolist() == [310.15, 298.15])  # OK
+    print(
+        np.allclose(
+            response.computeReplicationFactors(temperatures, concentrations),
+            [2 / 3, 2 / 3 * factors[2]],
+        )
+    )  # OK
+    print(response)
@@ -0,0 +1,127 @@
+from CellPopulation import CellPopulation
+from environment.grid.GlucoseGrid import GlucoseGrid
+from environment.unit.EnvironmentUnit import EnvironmentUnit
+import environment.physical_data as phy
+import numpy as np
+
+
+class Metabolism:
+    """Uptake of the glucose of a GlucoseGrid by the cells of a CellPopulation, and
+    conversion of the glucose taken up into the internal energy of the cells.
+    Each cell takes glucose from every unit lying under it. The footprints of the
+    whole population are computed at once, and the demands of the cells are removed
+    from the grid by a single scatter-add, so the uptake costs a few array operations
+    rather than a loop over the cells and their units.
+
+    Attributes:
+      uptake_rate (float): concentration of glucose a cell takes from each unit of its
+        footprint per second, in kg/m³/s
+      maintenance_power (float): energy spent by a cell per second to stay alive, in W
+      energy_yield (float): energy gained by a cell per kg of glucose taken up, in J/kg
+    """
+
+    uptake_rate: float  # kg/m³/s
+    maintenance_power: float  # W
+    energy_yield: float  # J/kg
+
+    def __init__(
+        self,
+        uptake_rate: float = 10 ** (-2),
+        maintenance_power: float = 10 ** (-14),
+        energy_yield: float = phy.GLUCOSE_ENERGY_DENSITY,
+    ) -> None:
+        """
+        Args:
+          uptake_rate (float): concentration of glucose a cell takes from each unit of
+            its footprint per second, in kg/m³/s
+          maintenance_power (float): energy spent by a cell per second, in W
+          energy_yield (float): energy gained per kg of glucose taken up, in J/kg
+        """
+        self.uptake_rate = uptake_rate
+        self.maintenance_power = maintenance_power
+        self.energy_yield = energy_yield
+
+    def __str__(self) -> str:
+        string = f"Glucose uptake rate : {self.uptake_rate} kg/m³/s per unit\n"
+        string += f"Maintenance power : {self.maintenance_power} W\n"
+        return string
+
+    def takeUpGlucose(
+        self,
+        population: CellPopulation,
+        glucose_grid: GlucoseGrid,
+        time_step: float = phy.TIME_ITERATION,
+    ) -> float:
+        """Makes every cell take up glucose from the units under it during a time step,
+        then updates the internal energies of the cells. A unit demanded by several
+        cells is shared between them, and the concentrations never become negative.
+        The energy of a cell taking up too little glucose decreases, and becomes
+        negative once its reserves are spent.
+
+        Args:
+          population (CellPopulation): the cells taking up glucose
+          glucose_grid (GlucoseGrid): grid of the glucose taken up
+          time_step (float): duration of the uptake, in seconds
+
+        Returns:
+          float: mass of glucose taken up by the whole population, in kg
+        """
+        cell_indices, x_indices, y_indices = population.getFootprints(
+            glucose_grid.units_on_width, glucose_grid.units_on_length
+        )
+        concentrations = glucose_grid.consumeGlucose(
+            x_indices,
+            y_indices,
+            np.full(len(cell_indices), self.uptake_rate * time_step),
+        )
+        masses = EnvironmentUnit.volume * np.bincount(
+            cell_indices, weights=concentrations, minlength=len(population)
+        )
+        population.energy[: len(population)] += (
+            self.energy_yield * masses - self.maintenance_power * time_step
+        )
+        return masses.sum()
+
+
+if __name__ == "__main__":
+    population = CellPopulation()
+    glucose_grid = GlucoseGrid(40, 40, 0.005)
+    for x, y in ((0, 0), (50, 20), (187.5, 100)):
+        population.appendCell(x, y)
+    metabolism = Metabolism(uptake_rate=0.1)
+
+    # The glucose taken up from the grid is found in the energies of the cells
+    total_mass = glucose_grid.glucose_array.sum() * EnvironmentUnit.volume
+    mass = metabolism.takeUpGlucose(population, glucose_grid, 0.01)
+    print(mass > 0)  # OK
+    print(
+        np.isclose(
+            glucose_grid.glucose_array.sum() * EnvironmentUnit.volume + mass, total_mass
+        )
+    )  # OK
+    energies = population.energy[: len(population)].copy()
+    print(
+        np.isclose(
+            energies.sum(),
+            metabolism.energy_yield * mass - 3 * metabolism.maintenance_power * 0.01,
+        )
+    )  # OK
+    # The third cell lies over 5 x 4 units, the others over 4 x 4 units
+    gains = energies + metabolism.maintenance_power * 0.01
+    print(np.allclose(gains / gains[0], [1, 1, 5 / 4]))  # OK
+
+    # Once the units are empty, the concentrations stay at zero
+    for i in range(100):
+        metabolism.takeUpGlucose(population, glucose_grid, 0.01)
+    print(glucose_grid.glucose_array.min() == 0)  # OK
+    energies = population.energy[: len(population)].copy()
+    print(metabolism.takeUpGlucose(population, glucose_grid, 0.01) == 0)  # OK
+    print(
+        np.allclose(
+            energies - population.energy[: len(population)],
+            metabolism.maintenance_power * 0.01,
+            rtol=10 ** (-9),
+            atol=0,
+        )
+    )  # OK
+    print(metabolism)
@@ -0,0 +1,851 @@
+import math
+import os
+import multiprocessing
+import multiprocessing.connection
+from multiprocessing import shared_memory
+import time
+import traceback
+import numpy as np
+from Cell import Cell
+from CellPopulation import CellPopulation
+from Chemotaxis import Chemotaxis
+from EnvironmentResponse import EnvironmentResponse
+from Metabolism import Metabolism
+from Simulation import Simulation
+from World import World
+from environment.field_storage import FieldStorage
+from environment.grid.EnvironmentGrid import EnvironmentGrid
+from environment.grid.GlucoseGrid import GlucoseGrid
+from environment.grid.TemperatureGrid import TemperatureGrid
+from environment.unit.EnvironmentUnit import EnvironmentUnit
+from tools.random_generator import RandomGenerator
+from tools.scheduler import Scheduler
+import environment.diffusion as diffusion
+import environment.physical_data as phy
+
+# Default number of seconds an iteration may take : longer waits at a barrier, for
+# migrating cells or for the replies of the workers mean that a worker is stuck
+WORKER_TIMEOUT = 60
+
+
+class SharedFieldStorage(FieldStorage):
+    """Backend creating the arrays of the fields in shared memory blocks, so that
+    several processes work on the same fields. The process creating the storage owns
+    the blocks, the other processes attach to them by name.
+
+    Attributes:
+      name_prefix (str): prefix of the names of the shared memory blocks
+      is_owner (bool): True for the process creating the blocks
+      blocks (dict): shared memory blocks of the arrays, by array name
+    """
+
+    name_prefix: str
+    is_owner: bool
+    blocks: dict
+
+    def __init__(self, name_prefix: str, is_owner: bool = True) -> None:
+        """
+        Args:
+          name_prefix (str): prefix of the names of the shared memory blocks
+          is_owner (bool): True to create the blocks, False to attach to them
+        """
+        super().__init__()
+        self.name_prefix = name_prefix
+        self.is_owner = is_owner
+        self.blocks = {}
+
+    def containsArray(self, name: str) -> bool:
+        """Returns True for the processes attaching to the blocks, whose arrays already
+        hold the values written by the owner"""
+        return not self.is_owner
+
+    def createArray(self, name: str, shape: tuple, dtype, fill_value=0) -> np.ndarray:
+        """Creates, or attaches to, the shared array of a field
+
+        Args:
+          name (str): name of the array
+          shape (tuple): shape of the array, the first axis being the x axis
+          dtype: type of the elements
+          fill_value: initial value of the elements, only used by the owner
+
+        Returns:
+          np.ndarray: the array, backed by a shared memory block
+        """
+        dtype = np.dtype(dtype)
+        size = max(1, math.prod(shape) * dtype.itemsize)
+        block = shared_memory.SharedMemory(
+            f"{self.name_prefix}_{name}", create=self.is_owner, size=size
+        )
+        self.blocks[name] = block
+        array = np.ndarray(shape, dtype, buffer=block.buf)
+        if self.is_owner:
+            array[...] = fill_value
+        return array
+
+    def close(self) -> None:
+        """Detaches from the shared memory blocks, and frees them for the owner"""
+        for block in self.blocks.values():
+            block.close()
+            if self.is_owner:
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        self.blocks = {}
+
+
+class Subdomain:
+    """Strip of a world owned by a worker process : the cells lying on the strip and
+    the shared grids of the whole world. It has the grids and the cell_population of
+    a World, so that a Simulation can update its cells.
+
+    Attributes:
+      worker_index (int): index of the worker owning the strip
+      workers_number (int): number of strips of the world
+      strip (slice): units along the x axis owned by the worker
+      environment_grid (EnvironmentGrid): grid of the whole world, in shared memory
+      cell_population (CellPopulation): cells whose x coordinate lies on the strip
+      glucose_grid (GlucoseGrid): glucose grid of the whole world, in shared memory
+      temperature_grid (TemperatureGrid): temperature grid of the whole world, in
+        shared memory
+      halos (dict): for each field, shared array of shape (workers_number, 2, length)
+        of the first and last lines of every strip
+    """
+
+    def __init__(
+        self,
+        worker_index: int,
+        workers_number: int,
+        strip: slice,
+        units_dimensions: tuple,
+        storage: SharedFieldStorage,
+        population: CellPopulation,
+    ) -> None:
+        """
+        Args:
+          worker_index (int): index of the worker owning the strip
+          workers_number (int): number of strips of the world
+          strip (slice): units along the x axis owned by the worker
+          units_dimensions (tuple): numbers of units along the x and y axes
+          storage (SharedFieldStorage): storage attached to the shared arrays
+          population (CellPopulation): cells whose x coordinate lies on the strip
+        """
+        self.worker_index = worker_index
+        self.workers_number = workers_number
+        self.strip = strip
+        self.environment_grid = EnvironmentGrid(*units_dimensions, storage)
+        self.glucose_grid = GlucoseGrid(*units_dimensions, storage=storage)
+        self.temperature_grid = TemperatureGrid(*units_dimensions, storage=storage)
+        self.halos = {
+            name: storage.createArray(
+                f"{name}_halos", (workers_number, 2, units_dimensions[1]), float
+            )
+            for name in ("glucose", "temperature")
+        }
+        self.cell_population = population
+
+    def getOwners(self, pos_x: np.ndarray) -> np.ndarray:
+        """Returns the indices of the workers owning the units of coordinates pos_x"""
+        units_on_width = self.environment_grid.units_on_width
+        unit_indices = np.floor(pos_x / EnvironmentUnit.width) % units_on_width
+        strip_size = -(-units_on_width // self.workers_number)
+        return (unit_indices // strip_size).astype(np.int64)
+
+    def getHalves(self, pos_x: np.ndarray) -> np.ndarray:
+        """Returns 0 for the cells of coordinates pos_x lying on the first half of the
+        strip, 1 for those lying on its second half
+
+        Args:
+          pos_x (np.ndarray): x coordinates of cells of the strip, in pixels
+        """
+        units_on_width = self.environment_grid.units_on_width
+        unit_indices = np.floor(pos_x / EnvironmentUnit.width) % units_on_width
+        half_size = (self.strip.stop - self.strip.start) // 2
+        return (unit_indices - self.strip.start >= half_size).astype(np.int64)
+
+    def makeFieldDiffuse(
+        self, name: str, diffusion_number: float, barrier: multiprocessing.Barrier
+    ) -> None:
+        """Diffuses the strip of a field with the explicit scheme, in stable sub-steps.
+        At each sub-step the first and last lines of every strip are published in the
+        halos, then every worker diffuses its strip in place. The version of the grid
+        is incremented, the whole field having changed.
+
+        Args:
+          name (str): "glucose" or "temperature"
+          diffusion_number (float): diffusion number of the whole time step
+          barrier (multiprocessing.Barrier): barrier of every worker
+        """
+        grid = getattr(self, f"{name}_grid")
+        field = getattr(grid, f"{name}_array")
+        halos = self.halos[name]
+        previous_worker = (self.worker_index - 1) % self.workers_number
+        next_worker = (self.worker_index + 1) % self.workers_number
+        sub_steps_number = max(
+            1, math.ceil(diffusion_number / diffusion.EXPLICIT_STABILITY_LIMIT)
+        )
+        for _ in range(sub_steps_number):
+            halos[self.worker_index, 0] = field[self.strip.start]
+            halos[self.worker_index, 1] = field[self.strip.stop - 1]
+            barrier.wait()
+            block = np.concatenate(
+                (
+                    halos[previous_worker, 1][None],
+                    field[self.strip],
+                    halos[next_worker, 0][None],
+                )
+            )
+            field[self.strip] = diffusion.computeExplicitStripDiffusion(
+                block, diffusion_number / sub_steps_number
+            )
+            barrier.wait()
+        grid.version += 1
+
+
+def computeWorkerIteration(
+    simulation: Simulation, barrier, inboxes: list, timeout: float
+) -> None:
+    """Computes one iteration of the strip of a worker, with the phases of
+    Simulation.computeIteration due at this iteration :
+      - the fields are diffused for the duration of their periods
+      - the cells die, age and sample their environment, then take up glucose once
+        every worker has sampled the fields
+      - the cells of the first half of every strip, then those of the second half,
+        move and replicate. Two halves moving at once are separated by a whole half,
+        so every worker moves its cells in both phases
+      - the cells having left the strip are sent to the neighbouring workers
+
+    Args:
+      simulation (Simulation): simulation of the Subdomain of the worker
+      barrier (multiprocessing.Barrier): barrier of every worker
+      inboxes (list): queue of each worker receiving the migrating cells
+      timeout (float): number of seconds waited for the migrating cells
+    """
+    subdomain = simulation.world
+    population = subdomain.cell_population
+    scheduler = simulation.scheduler
+    iteration = simulation.iteration
+    unit_thickness = EnvironmentUnit.volume / EnvironmentUnit.surface
+    for name, computeDiffusionNumber in (
+        ("glucose", phy.computeGlucoseDiffusionNumber),
+        ("temperature", phy.computeThermalDiffusionNumber),
+    ):
+        if scheduler.isDue(name, iteration):
+            subdomain.makeFieldDiffuse(
+                name,
+                computeDiffusionNumber(unit_thickness, scheduler.getDuration(name)),
+                barrier,
+            )
+
+    if scheduler.isDue("cells", iteration):
+        replicating_cells = simulation.updateCellStates()
+        # The deaths free units and the sensing reads the fields : no worker moves
+        # its cells or takes up glucose before every worker has done both
+        barrier.wait()
+        if simulation.metabolism is not None:
+            simulation.feedCells()
+            barrier.wait()
+            # The glucose taken up by the other workers changed the grid too
+            subdomain.glucose_grid.version += 1
+
+        # The indices of the cells are kept by the movements and the replications
+        halves = subdomain.getHalves(population.x[: len(population)])
+        replicating_cells = [
+            handle for handle in replicating_cells if population.isAlive(handle)
+        ]
+        replicating_halves = [
+            halves[population.getIndex(handle)] for handle in replicating_cells
+        ]
+        for half in (0, 1):
+            simulation.moveCells(np.flatnonzero(halves == half))
+            simulation.replicateCells(
+                [
+                    handle
+                    for handle, handle_half in zip(
+                        replicating_cells, replicating_halves
+                    )
+                    if handle_half == half
+                ]
+            )
+            if half == 0:
+                barrier.wait()
+
+        # The cells having left the strip are sent to the neighbouring workers.
+        # Receiving from both neighbours also ensures that they have moved their
+        # second halves before the cells of the next iteration change the occupation
+        worker_index = subdomain.worker_index
+        owners = subdomain.getOwners(population.x[: len(population)])
+        migrants = np.flatnonzero(owners != worker_index)
+        destinations = owners[migrants]
+        migrating_cells = population.extractCells(migrants)
+        previous_worker = (worker_index - 1) % subdomain.workers_number
+        next_worker = (worker_index + 1) % subdomain.workers_number
+        for side, neighbour in ((-1, previous_worker), (1, next_worker)):
+            is_sent = destinations == neighbour
+            if side == -1:
+                is_sent &= neighbour != next_worker
+            inboxes[neighbour].put(
+                (
+                    worker_index,
+                    side,
+                    {name: values[is_sent] for name, values in migrating_cells.items()},
+                )
+            )
+        for sender, side, cells in sorted(
+            (inboxes[worker_index].get(timeout=timeout) for _ in range(2)),
+            key=lambda message: message[:2],
+        ):
+            population.insertCells(cells)
+    simulation.iteration += 1
+
+
+def runWorker(
+    worker_index: int,
+    workers_number: int,
+    units_dimensions: tuple,
+    name_prefix: str,
+    cells: dict,
+    population_parameters: dict,
+    simulation_parameters: dict,
+    seed_sequence: np.random.SeedSequence,
+    connection,
+    barrier,
+    inboxes: list,
+    timeout: float,
+) -> None:
+    """Main function of a worker process, stepping the cells and fields of its strip.
+    It executes the commands received on its connection, replying ("ok", result) :
+      ("step", iterations) : computes iterations steps, in lockstep with the other
+        workers, and replies the counters of its simulation, its number of cells and
+        the glucose taken up by its cells
+      ("gather",) : replies the attributes of its cells, as extractCells does
+      ("stop",) : detaches from the shared memory and ends the process
+    A worker failing aborts the barrier, so that the other workers fail instead of
+    waiting for it, replies ("error", traceback) and ends.
+
+    Args:
+      worker_index (int): index of the worker
+      workers_number (int): number of workers
+      units_dimensions (tuple): numbers of units along the x and y axes of the world
+      name_prefix (str): prefix of the shared memory blocks
+      cells (dict): attributes of the initial cells of the strip, from extractCells
+      population_parameters (dict): default_max_age, default_replication_rate and
+        default_speed of the population
+      simulation_parameters (dict): scheduler, metabolism, environment_response and
+        chemotaxis of the simulation of the strip
+      seed_sequence (np.random.SeedSequence): seed of the random generator of the
+        worker
+      connection: end of the pipe receiving the commands
+      barrier (multiprocessing.Barrier): barrier of every worker
+      inboxes (list): queue of each worker receiving the migrating cells
+      timeout (float): number of seconds waited for the migrating cells
+    """
+    storage = SharedFieldStorage(name_prefix, is_owner=False)
+    try:
+        strip_size = -(-units_dimensions[0] // workers_number)
+        strip = slice(
+            worker_index * strip_size,
+            min((worker_index + 1) * strip_size, units_dimensions[0]),
+        )
+        population = CellPopulation(
+            population_parameters["default_max_age"],
+            population_parameters["default_replication_rate"],
+            population_parameters["default_speed"],
+            random_generator=RandomGenerator(seed_sequence),
+        )
+        population.event_wheel.current_step = population_parameters["clock"]
+        population.insertCells(cells)
+        subdomain = Subdomain(
+            worker_index, workers_number, strip, units_dimensions, storage, population
+        )
+        simulation = Simulation(subdomain, **simulation_parameters)
+
+        while True:
+            command = connection.recv()
+            if command[0] == "stop":
+                break
+            if command[0] == "gather":
+                everything = np.arange(len(population))
+                cells = {
+                    name: getattr(population, name)[everything].copy()
+                    for name in list(population.cell_attributes) + ["color"]
+                }
+                cells["age"] = population.getAges()
+                connection.send(("ok", cells))
+                continue
+
+            for _ in range(command[1]):
+                computeWorkerIteration(simulation, barrier, inboxes, timeout)
+            connection.send(
+                (
+                    "ok",
+                    (
+                        simulation.births_number,
+                        simulation.deaths_number,
+                        simulation.successful_moves_number,
+                        simulation.failed_moves_number,
+                        len(population),
+                        simulation.glucose_uptake,
+                    ),
+                )
+            )
+    except Exception:
+        barrier.abort()
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        storage.close()
+
+
+class ParallelSimulation:
+    """Engine stepping a World split into strips along the x axis, each strip being
+    owned by a worker process. The fields and the occupation of the world are in
+    shared memory. Every worker advances its strip with the scheduler, metabolism,
+    environment response and chemotaxis of a Simulation. At each iteration, for the
+    subsystems due :
+      - the glucose and the heat are diffused for the duration of their periods, the
+        workers exchanging the first and last lines of their strips as halos
+      - the cells die, age, sample their environment and take up glucose
+      - the cells of the first half of every strip, then those of the second half,
+        move and replicate. Every worker processes its cells in both phases, two
+        halves processed at once being too far apart for their cells to claim the
+        same units
+      - the cells having left their strip migrate to the worker of the neighbouring
+        strip, the world being a torus
+    The halves of the strips must be wide enough for a cell to move and replicate
+    without reaching a half processed at the same time.
+    A worker failing or getting stuck makes the others fail, and the next reply
+    awaited raises a RuntimeError after stopping the workers. The shared memory is
+    freed by close, also called when leaving a with statement.
+
+    Attributes:
+      world (World): the world, whose arrays are shared with the workers. Its
+        cell_population holds the initial cells, and is only updated by gatherCells
+      workers_number (int): number of worker processes
+      storage (SharedFieldStorage): owner of the shared arrays
+      iteration (int): number of iterations already computed
+      births_number (int): number of cells born by replication since the start
+      deaths_number (int): number of cells dead since the start
+      successful_moves_number (int): number of movements done since the start
+      failed_moves_number (int): number of movements prevented by other cells
+      cells_number (int): number of cells of the world after the last step
+      glucose_uptake (float): mass of glucose taken up by the cells since the start,
+        in kg
+      scheduler (Scheduler): periods of the subsystems
+      metabolism (Metabolism): optional uptake of the glucose by the cells
+      environment_response (EnvironmentResponse): optional dependence of the
+        replications and of the aging on the local temperature and glucose
+      chemotaxis (Chemotaxis): optional bias of the movements towards the glucose
+      processes (list): the worker processes, started by start
+      connections (list): pipes sending the commands to the workers
+      timeout (float): number of seconds an iteration may take, beyond which the
+        workers and the parent consider that a worker is stuck
+    """
+
+    world: World
+    workers_number: int
+    storage: SharedFieldStorage
+    iteration: int
+    glucose_uptake: float  # kg
+    scheduler: Scheduler
+    metabolism: Metabolism
+    environment_response: EnvironmentResponse
+    chemotaxis: Chemotaxis
+    processes: list
+    connections: list
+    timeout: float
+
+    def __init__(
+        self,
+        pixel_side: int,
+        workers_number: int,
+        initial_temperature: float = 298.15,
+        initial_glucose: float = 0,
+        seed: int = None,
+        timeout: float = WORKER_TIMEOUT,
+        scheduler: Scheduler = None,
+        metabolism: Metabolism = None,
+        environment_response: EnvironmentResponse = None,
+        chemotaxis: Chemotaxis = None,
+    ) -> None:
+        """Creates the world in shared memory. Cells can be added to it before start.
+
+        Args:
+          pixel_side (int): number of pixels of the world
+          workers_number (int): number of worker processes
+          initial_temperature (float): initial temperature of the world, in Kelvin
+          initial_glucose (float): initial glucose concentration, in kg.m⁻³
+          seed (int): seed of the random generators of the workers
+          timeout (float): number of seconds an iteration may take
+          scheduler (Scheduler): periods of the subsystems, None to advance them all
+            at every iteration
+          metabolism (Metabolism): uptake of the glucose by the cells, None for cells
+            ignoring the glucose
+          environment_response (EnvironmentResponse): dependence of the replications
+            and of the aging on the local environment, None for cells ignoring it
+          chemotaxis (Chemotaxis): bias of the movements towards the glucose, None for
+            uniform random movements
+        """
+        self.workers_number = workers_number
+        self.seed = seed
+        self.timeout = timeout
+        self.scheduler = Scheduler() if scheduler is None else scheduler
+        self.metabolism = metabolism
+        self.environment_response = environment_response
+        self.chemotaxis = chemotaxis
+        self.storage = SharedFieldStorage(f"ecosystem_{id(self)}_{os.getpid()}")
+        # The blocks created before a failure are freed at once, the caller getting
+        # no object to close
+        try:
+            self.world = World(
+                pixel_side,
+                initial_temperature,
+                initial_glucose,
+                seed,
+                storage=self.storage,
+            )
+            for name in ("glucose", "temperature"):
+                self.storage.createArray(
+                    f"{name}_halos",
+                    (workers_number, 2, self.world.units_on_length),
+                    float,
+                )
+        except BaseException:
+            self.storage.close()
+            raise
+
+        self.iteration = 0
+        self.births_number = 0
+        self.deaths_number = 0
+        self.successful_moves_number = 0
+        self.failed_moves_number = 0
+        self.cells_number = 0
+        self.glucose_uptake = 0.0
+        self.processes = []
+        self.connections = []
+
+    def __enter__(self) -> "ParallelSimulation":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        string = f"Parallel simulation of {self.workers_number} workers "
+        string += f"at iteration {self.iteration}\n"
+        string += f"Number of cells : {self.cells_number}\n"
+        return string
+
+    def getMinimalStripUnits(self) -> int:
+        """Returns the smallest width of a strip, in units, for which the cells of two
+        halves processed at the same time never reach the same units
+        """
+        population = self.world.cell_population
+        speeds = population.speed[: len(population)].tolist()
+        speed = max([population.default_speed] + speeds)
+        # Units reached beyond the strip by a moving or replicating cell
+        reach = math.ceil((2 * Cell.width + speed) / EnvironmentUnit.width)
+        # Each half separates two halves reaching into it from both sides
+        return 4 * reach
+
+    def start(self) -> None:
+        """Distributes the cells of the world to the workers and starts them"""
+        units_on_width = self.world.units_on_width
+        strip_size = -(-units_on_width // self.workers_number)
+        last_strip_size = units_on_width - strip_size * (self.workers_number - 1)
+        if self.workers_number > 1 and min(strip_size, last_strip_size) < (
+            self.getMinimalStripUnits()
+        ):
+            raise ValueError(
+                f"The strips of {units_on_width} units split in {self.workers_number} "
+                + f"are narrower than {self.getMinimalStripUnits()} units"
+            )
+
+        population = self.world.cell_population
+        population_parameters = {
+            "default_max_age": population.default_max_age,
+            "default_replication_rate": population.default_replication_rate,
+            "default_speed": population.default_speed,
+            "clock": population.clock,
+        }
+        simulation_parameters = {
+            "scheduler": self.scheduler,
+            "metabolism": self.metabolism,
+            "environment_response": self.environment_response,
+            "chemotaxis": self.chemotaxis,
+        }
+        owners = (
+            np.floor(population.x[: len(population)] / EnvironmentUnit.width)
+            % units_on_width
+            // strip_size
+        )
+        # The waits of the workers at the barrier raise a BrokenBarrierError after
+        # the timeout, or as soon as a failing worker aborts it
+        barrier = multiprocessing.Barrier(self.workers_number, timeout=self.timeout)
+        inboxes = [multiprocessing.Queue() for _ in range(self.workers_number)]
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(self.workers_number)
+        everything = np.arange(len(population))
+        cells = {
+            name: getattr(population, name)[everything].copy()
+            for name in list(population.cell_attributes) + ["color"]
+        }
+        cells["age"] = population.getAges()
+        self.cells_number = len(population)
+
+        try:
+            for worker_index in range(self.workers_number):
+                is_owned = owners == worker_index
+                connection, worker_connection = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=runWorker,
+                    args=(
+                        worker_index,
+                        self.workers_number,
+                        (units_on_width, self.world.units_on_length),
+                        self.storage.name_prefix,
+                        {name: values[is_owned] for name, values in cells.items()},
+                        population_parameters,
+                        simulation_parameters,
+                        seed_sequences[worker_index],
+                        worker_connection,
+                        barrier,
+                        inboxes,
+                        self.timeout,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                self.processes.append(process)
+                self.connections.append(connection)
+        except BaseException:
+            self.close()
+            raise
+
+    def isPopulationAlive(self) -> bool:
+        """Returns True if there is at least one cell in the world"""
+        return self.cells_number > 0
+
+    def step(self, iterations: int = 1) -> None:
+        """Computes several iterations of the simulation in every worker
+
+        Args:
+          iterations (int): number of iterations to compute
+        """
+        if not self.processes:
+            self.start()
+        for connection in self.connections:
+            connection.send(("step", iterations))
+        replies = self.receiveReplies(self.timeout * max(1, iterations))
+        (
+            self.births_number,
+            self.deaths_number,
+            self.successful_moves_number,
+            self.failed_moves_number,
+            self.cells_number,
+        ) = np.sum([reply[:-1] for reply in replies], axis=0).tolist()
+        self.glucose_uptake = sum(reply[-1] for reply in replies)
+        self.iteration += iterations
+        self.world.glucose_grid.version += 1
+        self.world.temperature_grid.version += 1
+
+    def gatherCells(self) -> CellPopulation:
+        """Copies the cells of every worker into the cell_population of the world,
+        for instance to display or save it.
+
+        Returns:
+          CellPopulation: the new population of the world
+        """
+        population = self.world.cell_population
+        gathered_population = CellPopulation(
+            population.default_max_age,
+            population.default_replication_rate,
+            population.default_speed,
+            random_generator=self.world.random_generator,
+        )
+        gathered_population.event_wheel.current_step = population.clock + self.iteration
+        for connection in self.connections:
+            connection.send(("gather",))
+        for cells in self.receiveReplies(self.timeout):
+            gathered_population.insertCells(cells)
+        self.world.cell_population = gathered_population
+        return gathered_population
+
+    def receiveReplies(self, timeout: float) -> list:
+        """Returns the results replied by every worker to the last command. The
+        workers are stopped if one of them fails.
+
+        Args:
+          timeout (float): number of seconds waited for all the replies
+
+        Returns:
+          list: the result of each worker
+
+        Raises:
+          RuntimeError: if a worker failed, ended or didn't reply in time
+        """
+        deadline = time.monotonic() + timeout
+        results = {}
+        try:
+            while len(results) < len(self.connections):
+                waited_connections = {
+                    connection: worker_index
+                    for worker_index, connection in enumerate(self.connections)
+                    if worker_index not in results
+                }
+                ready_connections = multiprocessing.connection.wait(
+                    list(waited_connections), max(0, deadline - time.monotonic())
+                )
+                if not ready_connections:
+                    raise RuntimeError(
+                        f"The workers {sorted(waited_connections.values())} didn't "
+                        + f"reply within {timeout} s"
+                    )
+                for connection in ready_connections:
+                    worker_index = waited_connections[connection]
+                    try:
+                        status, result = connection.recv()
+                    except EOFError:
+                        raise RuntimeError(f"The worker {worker_index} ended") from None
+                    if status == "error":
+                        raise RuntimeError(
+                            f"The worker {worker_index} failed :\n{result}"
+                        )
+                    results[worker_index] = result
+        except RuntimeError:
+            self.close()
+            raise
+        return [results[worker_index] for worker_index in range(len(results))]
+
+    def close(self) -> None:
+        """Stops the workers and frees the shared memory. The workers still running
+        after the timeout are terminated.
+        """
+        try:
+            for connection in self.connections:
+                try:
+                    connection.send(("stop",))
+                except OSError:
+                    # Worker already ended
+                    pass
+            for process in self.processes:
+                process.join(self.timeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        finally:
+            for connection in self.connections:
+                connection.close()
+            self.processes = []
+            self.connections = []
+            self.storage.close()
+
+
+if __name__ == "__main__":
+    # Same fields as a sequential world
+    sequential_world = World(400)
+    sequential_world.glucose_grid.changeMultipleGlucoseConcentration(
+        [10, 11], [20], 0.004
+    )
+    with ParallelSimulation(400, 2, seed=0) as parallel:
+        parallel.world.glucose_grid.changeMultipleGlucoseConcentration(
+            [10, 11], [20], 0.004
+        )
+        parallel.world.addCellToList(Cell(parallel.world.environment_grid, 200, 200))
+        sequential_world.addCellToList(
+            Cell(sequential_world.environment_grid, 200, 200)
+        )
+        Simulation(sequential_world).step(20)
+        parallel.step(20)
+        print(
+            np.allclose(
+                parallel.world.glucose_grid.glucose_array,
+                sequential_world.glucose_grid.glucose_array,
+            )
+        )  # OK
+        print(parallel.cells_number == 1)  # OK
+
+    # The cells cross the borders of the strips and replicate, with an odd number of
+    # workers
+    with ParallelSimulation(800, 3, seed=1) as parallel:
+        parallel.world.cell_population.default_replication_rate = 1 / 50
+        for x in range(0, 800, 40):
+            parallel.world.cell_population.addCell(
+                parallel.world.environment_grid, x, 300
+            )
+        parallel.step(300)
+        print(parallel)
+        print(
+            parallel.births_number > 0
+            and parallel.cells_number
+            == 20 + parallel.births_number - parallel.deaths_number
+        )  # OK
+        population = parallel.gatherCells()
+        print(len(population) == parallel.cells_number)  # OK
+
+    # Same physics with one worker, with several workers and in a sequential world :
+    # the scheduler periods, the metabolism, the environment response and the
+    # chemotaxis. The cells neither move nor replicate, so that the random draws of
+    # the workers don't matter
+    def prepareWorld(world: World) -> None:
+        population = world.cell_population
+        population.default_speed = 0
+        population.default_replication_rate = 0
+        population.default_max_age = 25
+        # The cell at x = 260 ages faster in the heat
+        world.temperature_grid.temperature_array[40:60, 50:75] = 310.15
+        world.temperature_grid.signalUnitsChange()
+        for x in range(20, 800, 80):
+            population.addCell(world.environment_grid, x, 300)
+
+    def getPhysics() -> dict:
+        return {
+            "scheduler": Scheduler({"glucose": 2, "temperature": 3, "cells": 2}),
+            "metabolism": Metabolism(),
+            "environment_response": EnvironmentResponse(),
+            "chemotaxis": Chemotaxis(),
+        }
+
+    sequential_world = World(800, initial_glucose=0.005, seed=2)
+    prepareWorld(sequential_world)
+    simulation = Simulation(sequential_world, **getPhysics())
+    simulation.step(40)
+    for workers_number in (1, 3):
+        with ParallelSimulation(
+            800, workers_number, initial_glucose=0.005, seed=2, **getPhysics()
+        ) as parallel:
+            prepareWorld(parallel.world)
+            parallel.step(40)
+            print(
+                np.allclose(
+                    parallel.world.glucose_grid.glucose_array,
+                    sequential_world.glucose_grid.glucose_array,
+                )
+                and np.allclose(
+                    parallel.world.temperature_grid.temperature_array,
+                    sequential_world.temperature_grid.temperature_array,
+                )
+            )  # OK
+            print(parallel.deaths_number == simulation.deaths_number > 0)  # OK
+            print(np.isclose(parallel.glucose_uptake, simulation.glucose_uptake))
+            # OK
+
+    # A failing worker makes the others leave the barrier : the step raises at once
+    # and the shared memory is freed
+    with ParallelSimulation(400, 2, seed=0, timeout=10) as parallel:
+        parallel.world.addCellToList(Cell(parallel.world.environment_grid, 200, 200))
+        parallel.step()
+        parallel.connections[0].send(("step", None))
+        parallel.connections[1].send(("step", 5))
+        start_time = time.monotonic()
+        try:
+            parallel.receiveReplies(parallel.timeout)
+            print(False)
+        except RuntimeError as error:
+            print("TypeError" in str(error))  # OK
+        print(time.monotonic() - start_time < parallel.timeout)  # OK
+        print(parallel.processes == [])  # OK
+        name_prefix = parallel.storage.name_prefix
+    try:
+        shared_memory.SharedMemory(f"{name_prefix}_glucose")
+        print(False)
+    except FileNotFoundError:
+        print(True)  # OK
@@ -0,0 +1,470 @@
+from Cell import Cell
+from Chemotaxis import Chemotaxis
+from EnvironmentResponse import EnvironmentResponse
+from Metabolism import Metabolism
+from World import World
+from tools.direction import Direction
+from tools.profiler import Profiler
+from tools.scheduler import Scheduler
+import numpy as np
+
+
+class Simulation:
+    """Headless engine advancing a World one iteration of the game loop at a time.
+    It handles the diffusion of glucose and heat, the aging, the movements, the replications and
+    the deaths of the cells along with the data logging, without any dependency on pygame.
+    Rendering is done by observers notified at the end of every iteration.
+    Each subsystem (glucose, temperature, cells, logging, rendering) is advanced at the
+    period given by the scheduler, every iteration by default.
+
+    Attributes:
+      world (World): object of class World being simulated
+      logger (DataLogger): optional object recording data about the world
+      log_interval (int): number of iterations between two calls to the logger, the
+        logging period of the scheduler
+      iteration (int): number of iterations already computed
+      observers (list): objects having an update(simulation) method, called after
+        every iteration whose rendering is due
+      births_number (int): number of cells born by replication since the beginning
+      deaths_number (int): number of cells dead since the beginning
+      successful_moves_number (int): number of movements done since the beginning
+      failed_moves_number (int): number of movements prevented by other cells since
+        the beginning
+      profiler (Profiler): optional object timing the phases of the iterations, None
+        to compute the phases without any measure
+      scheduler (Scheduler): periods of the subsystems
+      metabolism (Metabolism): optional uptake of the glucose by the cells, done with
+        the other updates of the cells. None for cells ignoring the glucose
+      glucose_uptake (float): mass of glucose taken up by the cells since the
+        beginning, in kg
+      environment_response (EnvironmentResponse): optional dependence of the
+        replications and of the aging on the local temperature and glucose, sampled
+        with the other updates of the cells. None for cells ignoring their environment
+      replication_factors (np.ndarray): fraction of its replication_rate each cell
+        replicates at, from the last sampling. None without environment_response
+      chemotaxis (Chemotaxis): optional bias of the movements towards the glucose,
+        None for uniform random movements
+    """
+
+    world: World
+    logger: object
+    iteration: int
+    observers: list
+
+    births_number: int
+    deaths_number: int
+    successful_moves_number: int
+    failed_moves_number: int
+
+    profiler: Profiler
+    scheduler: Scheduler
+
+    metabolism: Metabolism
+    glucose_uptake: float  # kg
+
+    environment_response: EnvironmentResponse
+    replication_factors: np.ndarray
+
+    chemotaxis: Chemotaxis
+
+    def __init__(
+        self,
+        world: World,
+        logger=None,
+        log_interval: int = 1,
+        profiler: Profiler = None,
+        scheduler: Scheduler = None,
+        metabolism: Metabolism = None,
+        environment_response: EnvironmentResponse = None,
+        chemotaxis: Chemotaxis = None,
+    ) -> None:
+        """
+        Args:
+          world (World): object of class World to simulate
+          logger (DataLogger): object having a record(simulation) method, None to log
+            nothing
+          log_interval (int): number of iterations between two calls to the logger,
+            ignored if a scheduler is given
+          profiler (Profiler): object timing the phases of the iterations, None to
+            disable profiling
+          scheduler (Scheduler): periods of the subsystems, None to advance them all
+            at every iteration except the logging
+          metabolism (Metabolism): uptake of the glucose by the cells, None for cells
+            ignoring the glucose
+          environment_response (EnvironmentResponse): dependence of the replications
+            and of the aging on the local environment, None for cells ignoring it
+          chemotaxis (Chemotaxis): bias of the movements towards the glucose, None for
+            uniform random movements
+        """
+        self.world = world
+        self.logger = logger
+        self.iteration = 0
+        self.observers = []
+
+        self.births_number = 0
+        self.deaths_number = 0
+        self.successful_moves_number = 0
+        self.failed_moves_number = 0
+
+        self.profiler = profiler
+        if scheduler is None:
+            scheduler = Scheduler({"logging": log_interval})
+        self.scheduler = scheduler
+
+        self.metabolism = metabolism
+        self.glucose_uptake = 0.0
+
+        self.environment_response = environment_response
+        self.replication_factors = None
+
+        self.chemotaxis = chemotaxis
+
+    def __str__(self) -> str:
+        string = f"Simulation at iteration {self.iteration}\n"
+        string += f"Number of cells : {len(self.world.cell_population)}\n"
+        return string
+
+    @property
+    def log_interval(self) -> int:
+        return self.scheduler.periods["logging"]
+
+    def addObserver(self, observer) -> None:
+        """Registers an observer notified at the end of every iteration.
+
+        Args:
+          observer: object having an update(simulation) method
+        """
+        self.observers.append(observer)
+
+    def isPopulationAlive(self) -> bool:
+        """Returns True if there is at least one cell in the world"""
+        return len(self.world.cell_population) > 0
+
+    def step(self, iterations: int = 1) -> None:
+        """Computes several iterations of the simulation.
+        It stops earlier if every cell of the world is dead.
+
+        Args:
+          iterations (int): number of iterations to compute
+        """
+        for _ in range(iterations):
+            if not self.isPopulationAlive():
+                break
+            if self.profiler is not None:
+                self.profiler.countStep(len(self.world.cell_population))
+            self.runPhase("step", self.computeIteration)
+
+    def runPhase(self, name: str, function, *args):
+        """Calls function(*args), timed as the phase name by the profiler if any
+
+        Args:
+          name (str): name of the phase
+          function: function computing the phase
+          args: arguments of the function
+
+        Returns:
+          the result of the function
+        """
+        if self.profiler is None:
+            return function(*args)
+        return self.profiler.timePhase(name, function, *args)
+
+    def computeIteration(self) -> None:
+        """Computes one iteration : fields, cells, logging and observers, each one
+        only if it is due at this iteration
+        """
+        iteration = self.iteration
+        self.runPhase("diffusion", self.updateFields)
+        if self.scheduler.isDue("cells", iteration):
+            self.updateCells()
+
+        if self.logger is not None and self.scheduler.isDue("logging", iteration):
+            self.runPhase("logging", self.logger.record, self)
+        self.iteration += 1
+
+        if self.scheduler.isDue("rendering", iteration):
+            for observer in self.observers:
+                self.runPhase("rendering", observer.update, self)
+
+    def updateFields(self) -> None:
+        """Diffuses the glucose and the heat of the world when they are due, for the
+        duration of their period
+        """
+        scheduler = self.scheduler
+        if scheduler.isDue("glucose", self.iteration):
+            self.world.glucose_grid.makeGlucoseDiffuse(scheduler.getDuration("glucose"))
+        if scheduler.isDue("temperature", self.iteration):
+            self.world.temperature_grid.makeTemperatureDiffuse(
+                scheduler.getDuration("temperature")
+            )
+
+    def updateCells(self) -> None:
+        """Removes the cells too old from the world, then ages and moves every surviving
+        cell and makes replicate the cells whose replication attempt is due.
+        Deaths and replication attempts are events scheduled by the population, so only
+        the cells having an event due at this iteration are visited for them. Aging is
+        the advance of the population's clock. With a metabolism, the cells take up
+        the glucose under them for the period of the cells before moving. With an
+        environment response, the cells sample their environment after aging, to
+        age at their local aging rates and to replicate at their local rates.
+        """
+        replicating_cells = self.updateCellStates()
+        self.feedCells()
+        self.runPhase("moving", self.moveCells)
+        self.runPhase("replicating", self.replicateCells, replicating_cells)
+
+    def updateCellStates(self) -> list:
+        """Removes the dying cells, ages the others and makes them sample their
+        environment, the first phases of updateCells
+
+        Returns:
+          list: handles of the cells whose replication attempt is due
+        """
+        population = self.world.cell_population
+        dying_cells, replicating_cells = self.runPhase(
+            "events", population.popDueEvents
+        )
+        if self.environment_response is not None:
+            # Cells aging faster than one loop per loop die before their scheduled death
+            dying_cells = np.union1d(dying_cells, population.getTooOldCells())
+        self.runPhase("deaths", self.removeDyingCells, dying_cells)
+        self.runPhase("aging", population.advanceClock)
+        if self.environment_response is not None:
+            self.runPhase("sensing", self.senseEnvironment)
+        return replicating_cells
+
+    def feedCells(self) -> None:
+        """Makes the cells take up glucose for the period of the cells, if they have a
+        metabolism
+        """
+        if self.metabolism is not None:
+            self.glucose_uptake += self.runPhase(
+                "metabolism",
+                self.metabolism.takeUpGlucose,
+                self.world.cell_population,
+                self.world.glucose_grid,
+                self.scheduler.getDuration("cells"),
+            )
+
+    def senseEnvironment(self) -> None:
+        """Samples the temperature and the glucose under every cell at once, makes the
+        cells age at their local aging rates during the last loop and computes the
+        factors of their replication rates
+        """
+        response = self.environment_response
+        population = self.world.cell_population
+        temperatures, concentrations = response.sampleEnvironment(
+            population, self.world.temperature_grid, self.world.glucose_grid
+        )
+        population.ageCells(response.computeAgingRates(temperatures))
+        self.replication_factors = response.computeReplicationFactors(
+            temperatures, concentrations
+        )
+
+    def removeDyingCells(self, dying_cells: np.ndarray) -> None:
+        """Removes cells from the population and from the environment
+
+        Args:
+          dying_cells (np.ndarray): indices of the cells to remove
+        """
+        environment = self.world.environment_grid
+        population = self.world.cell_population
+        for index in dying_cells.tolist():
+            population.deleteCellFromEnvironment(environment, index)
+        population.removeCells(dying_cells)
+        self.deaths_number += len(dying_cells)
+
+    def moveCells(self, indices: np.ndarray = None) -> None:
+        """Moves every cell in a random direction, biased towards the glucose with a
+        chemotaxis.
+        The movements are applied cell by cell since they depend on the occupation of
+        the environment, but every random number is drawn at once.
+
+        Args:
+          indices (np.ndarray): indices of the cells to move, every cell if None
+        """
+        environment = self.world.environment_grid
+        population = self.world.cell_population
+        if indices is None:
+            indices = np.arange(len(population))
+        if self.chemotaxis is None:
+            direction_indices = population.random_generator.drawDirectionIndices(
+                len(indices)
+            )
+        else:
+            direction_indices = self.chemotaxis.drawDirectionIndices(
+                population, self.world.glucose_grid
+            )[indices]
+        successful_moves_number = 0
+        for index, direction_index in zip(indices.tolist(), direction_indices.tolist()):
+            successful_moves_number += population.moveCell(
+                environment, index, Direction.DIRECTIONS[direction_index]
+            )
+        self.successful_moves_number += successful_moves_number
+        self.failed_moves_number += len(direction_indices) - successful_moves_number
+
+    def replicateCells(self, replicating_cells: list) -> None:
+        """Makes replicate the cells still alive among replicating_cells, in a random
+        direction, and schedules their next replication attempts.
+        With an environment response, the attempts are drawn at replication_rate and
+        each one succeeds with the probability given by the replication factor of the
+        cell, which makes the cells replicate at their local rates.
+
+        Args:
+          replicating_cells (list): handles of the cells attempting to replicate
+        """
+        environment = self.world.environment_grid
+        population = self.world.cell_population
+        replicating_indices = np.array(
+            [
+                population.getIndex(handle)
+                for handle in replicating_cells
+                if population.isAlive(handle)
+            ],
+            dtype=np.int64,
+        )
+        replicated_indices = replicating_indices
+        if self.replication_factors is not None:
+            replicated_indices = replicating_indices[
+                population.random_generator.drawReplications(
+                    self.replication_factors[replicating_indices]
+                )
+            ]
+        replication_direction_indices = (
+            population.random_generator.drawReplicationDirectionIndices(
+                len(replicated_indices)
+            )
+        )
+        for index, direction_index in zip(
+            replicated_indices.tolist(), replication_direction_indices.tolist()
+        ):
+            new_index = population.replicateCell(
+                environment, index, Direction.REPLICATION_DIRECTIONS[direction_index]
+            )
+            if new_index is not None:
+                self.births_number += 1
+        population.scheduleReplications(replicating_indices)
+
+
+if __name__ == "__main__":
+    from environment.unit.EnvironmentUnit import EnvironmentUnit
+    import environment.diffusion as diffusion
+    import environment.physical_data as phy
+
+    the_world = World(100, seed=0)
+    the_world.addCellToList(Cell(the_world.environment_grid, 50, 50))
+    simulation = Simulation(the_world)
+
+    simulation.step(100)
+    print(simulation.iteration == 100)  # OK
+    print(simulation)
+
+    # Reproducibility test : two worlds of the same seed evolve the same way
+    first_world, second_world = World(200, seed=3), World(200, seed=3)
+    for world in (first_world, second_world):
+        world.cell_population.default_replication_rate = 1 / 10
+        world.addCellToList(
+            Cell(world.environment_grid, 100, 100, world.cell_population)
+        )
+        Simulation(world).step(50)
+    print(
+        (first_world.cell_population.x == second_world.cell_population.x).all()
+        and len(first_world.cell_population) > 1
+    )  # OK
+
+    # Death tests : every cell too old is removed in the same iteration
+    for x in (10, 40, 70):
+        the_world.addCellToList(Cell(the_world.environment_grid, x, 10))
+    for a_cell in the_world.cells_list[:2]:
+        a_cell.age = Cell.max_age + 1
+    survivor = the_world.cell_population[2]
+    simulation.step()
+    print(len(the_world.cell_population) == 2)  # OK
+    print(survivor.age == 1)  # OK
+    for a_cell in the_world.cells_list:
+        a_cell.age = Cell.max_age + 1
+    simulation.step()
+    print(simulation.isPopulationAlive() == False)  # OK
+    print(the_world.environment_grid.occupation_array.any() == False)  # OK
+
+    # Profiling test : every phase is timed, the others being inside "step"
+    profiled_world = World(200, seed=3)
+    profiled_world.addCellToList(Cell(profiled_world.environment_grid, 100, 100))
+    profiled_simulation = Simulation(profiled_world, profiler=Profiler())
+    profiled_simulation.step(20)
+    profiler = profiled_simulation.profiler
+    print(
+        profiler.calls_numbers["step"] == profiler.calls_numbers["moving"] == 20
+    )  # OK
+    print(profiler.steps_per_second > 0)  # OK
+    print(profiler)
+
+    # Multi-rate test : a field of period 10 diffuses for 10 iterations at once
+    multi_rate_world = World(100, seed=0)
+    multi_rate_world.addCellToList(Cell(multi_rate_world.environment_grid, 50, 50))
+    temperature_grid = multi_rate_world.temperature_grid
+    temperature_grid.changeMultipleTemperature([3], [4], 400)
+    expected_temperatures = temperature_grid.temperature_array.copy()
+    for _ in range(2):
+        diffusion.makeExplicitDiffusion(
+            expected_temperatures,
+            phy.computeThermalDiffusionNumber(
+                EnvironmentUnit.volume / EnvironmentUnit.surface, 0.1
+            ),
+        )
+    simulation = Simulation(
+        multi_rate_world, scheduler=Scheduler({"temperature": 10, "glucose": 10})
+    )
+    simulation.step(15)
+    print(np.allclose(temperature_grid.temperature_array, expected_temperatures))
+    # OK
+    print(simulation.log_interval == 1)  # OK
+
+    # Metabolism test : the glucose taken up is removed from the grid
+    fed_world = World(100, initial_glucose=0.005, seed=0)
+    fed_world.addCellToList(Cell(fed_world.environment_grid, 50, 50))
+    initial_glucose = fed_world.glucose_grid.glucose_array.sum()
+    simulation = Simulation(fed_world, metabolism=Metabolism())
+    simulation.step(10)
+    print(simulation.glucose_uptake > 0)  # OK
+    print(
+        abs(
+            (initial_glucose - fed_world.glucose_grid.glucose_array.sum())
+            * EnvironmentUnit.volume
+            - simulation.glucose_uptake
+        )
+        < 10 ** (-30)
+    )  # OK
+    print(fed_world.cell_population.energy[0] > 0)  # OK
+
+    # Environment response test : no replication in the cold, faster aging in the heat
+    for temperature, replication_rate, max_age in ((270, 1, 6000), (308.15, 0, 100)):
+        sensing_world = World(200, initial_temperature=temperature, seed=0)
+        sensing_world.cell_population.default_replication_rate = replication_rate
+        sensing_world.cell_population.default_max_age = max_age
+        sensing_world.addCellToList(
+            Cell(
+                sensing_world.environment_grid, 100, 100, sensing_world.cell_population
+            )
+        )
+        simulation = Simulation(
+            sensing_world, environment_response=EnvironmentResponse()
+        )
+        simulation.step(60)
+        print(simulation.births_number == 0)  # OK
+    print(simulation.deaths_number == 1 and simulation.iteration < 60)  # OK
+
+    # Chemotaxis test : a cell climbs a glucose gradient
+    gradient_world = World(200, seed=0)
+    gradient_world.glucose_grid.glucose_array[...] = (
+        0.001 * np.minimum(np.arange(40), 40 - np.arange(40))[:, None]
+    )
+    gradient_world.glucose_grid.signalUnitsChange()
+    gradient_world.addCellToList(Cell(gradient_world.environment_grid, 20, 100))
+    simulation = Simulation(
+        gradient_world,
+        scheduler=Scheduler({"glucose": 10**6}),
+        chemotaxis=Chemotaxis(),
+    )
+    simulation.step(20)
+    print(gradient_world.cell_population.x[0] > 60)  # OK
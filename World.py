@@ -1,9 +1,13 @@
 from Cell import Cell
+from CellPopulation import CellPopulation
+from environment.field_storage import FieldStorage
 from environment.grid.EnvironmentGrid import EnvironmentGrid
 from environment.grid.GlucoseGrid import GlucoseGrid
 from environment.grid.TemperatureGrid import TemperatureGrid
 from environment.unit.EnvironmentUnit import EnvironmentUnit
-import pygame
+from tools.async_writer import AsyncWriter
+from tools.random_generator import RandomGenerator
+import numpy as np
 
 
 class World:
@@ -18,6 +22,11 @@ class World:
       environment_grid (EnvironmentGrid) : object of class EnvironmentGrid
       temperature_grid (TemperatureGrid) : object of class TemperatureGrid
       glucose_grid (GlucoseGrid) : object of class GlucoseGrid
+      cell_population (CellPopulation) : object of class CellPopulation storing the cells of the world
+      cells_list (list) : list of views of the cells of cell_population
+      random_generator (RandomGenerator) : source of every random draw of the world
+      map_cache (dict) : for each grid displayed as a map, the grid version the map was
+        built at, its pixels and its pygame surface
     """
 
     calculus_width: int  # m
@@ -28,12 +37,14 @@ class World:
     units_on_width: int
     units_on_length: int
 
-    cells_list: list[Cell] = []
+    cell_population: CellPopulation
 
     environment_grid: EnvironmentGrid
     temperature_grid: TemperatureGrid
     glucose_grid: GlucoseGrid
 
+    map_cache: dict
+
     bg_color: tuple = (255, 255, 255)
 
     def __init__(
@@ -41,12 +52,18 @@ class World:
         pixel_side: int,
         initial_temperature: float = 298.15,
         initial_glucose: float = 0,
+        seed: int = None,
+        storage: FieldStorage = None,
     ) -> None:
         """Initialize an environment as a rectangle of nb_units_width x nb_units_length units
         Args:
           pixel_side (int): number of pixels of the world
           initial_temperature (float): initial value of temperature of the environment in Kelvin
           initial_glucose (float): initial value of glucose concentration in the environment in kg.m⁻³
+          seed (int): seed of the random generator of the world, two worlds of the same
+            seed evolve the same way. None for an unpredictable world
+          storage (FieldStorage): backend of the arrays of the grids, memory mapped
+            and processed by tiles for worlds larger than the memory. In memory if None
         """
         self.units_on_width = round(pixel_side / EnvironmentUnit.width)
         self.units_on_length = round(pixel_side / EnvironmentUnit.length)
@@ -60,25 +77,77 @@ class World:
         )
 
         self.environment_grid = EnvironmentGrid(
-            self.units_on_width, self.units_on_length
+            self.units_on_width, self.units_on_length, storage
         )
         self.temperature_grid = TemperatureGrid(
-            self.units_on_width, self.units_on_length, initial_temperature
+            self.units_on_width, self.units_on_length, initial_temperature, storage
         )
         self.glucose_grid = GlucoseGrid(
-            self.units_on_width, self.units_on_length, initial_glucose
+            self.units_on_width, self.units_on_length, initial_glucose, storage
         )
 
+        # Each world has its own cells, several worlds can be simulated side by side
+        self.random_generator = RandomGenerator(seed)
+        self.cell_population = CellPopulation(random_generator=self.random_generator)
+
+        self.map_cache = {}
+
     def __str__(self) -> str:
         string = f"Evironment dimension ({self.width},{self.length}) \n"
         string += str(self.environment_grid)
         return string
 
+    @property
+    def cells_list(self) -> list[Cell]:
+        return list(self.cell_population)
+
     def addCellToList(self, cell: Cell) -> None:
-        self.cells_list.append(cell)
+        """Adds a cell to the population of the world. A cell coming from another
+        population is copied into the world's one, the cell object becoming a view of
+        the copy.
+
+        Args:
+          cell (Cell): object of class Cell
+        """
+        if cell.population is not self.cell_population:
+            new_index = self.cell_population.copyCell(cell.population, cell.index)
+            cell.population = self.cell_population
+            cell.handle = self.cell_population.getHandle(new_index)
 
     def removeCellFromList(self, cell: Cell):
-        self.cells_list.remove(cell)
+        self.cell_population.removeCell(cell.index)
+
+    def saveCheckpoint(self, path: str, writer: AsyncWriter = None) -> bool:
+        """Saves the complete state of the world in a binary checkpoint file, see
+        tools.checkpoint.saveCheckpoint
+
+        Args:
+          path (str): path of the checkpoint file
+          writer (AsyncWriter): thread writing a copy of the state, None to write it
+            in the caller's thread
+
+        Returns:
+          bool: False if the snapshot has been dropped by the writer
+        """
+        from tools.checkpoint import saveCheckpoint
+
+        return saveCheckpoint(self, path, writer)
+
+    @staticmethod
+    def loadCheckpoint(path: str, in_memory: bool = False) -> "World":
+        """Restores a world saved by saveCheckpoint, its arrays being memory mapped
+        copy-on-write, see tools.checkpoint.loadCheckpoint
+
+        Args:
+          path (str): path of the checkpoint file
+          in_memory (bool): True to copy every array in memory instead of mapping it
+
+        Returns:
+          World: the restored world
+        """
+        from tools.checkpoint import loadCheckpoint
+
+        return loadCheckpoint(path, in_memory)
 
     def createUnitDisplayRectangle(self, x_position: int, y_position: int) -> tuple:
         """_summary_
@@ -97,47 +166,74 @@ class World:
             EnvironmentUnit.length,
         )
 
-    def displayTemperatureMap(self) -> None:
-        """Display the temperature map of the world using pygame"""
+    def getMapPixels(self, grid) -> np.ndarray:
+        """Returns the map of a glucose or temperature grid as an RGB pixel array, each
+        unit being a rectangle of its color. The map is cached and only built again
+        when the version of the grid has changed.
+
+        Args:
+          grid (GlucoseGrid or TemperatureGrid): grid of the world to display
+
+        Returns:
+          np.ndarray: array of shape pixel_dimensions + (3,) of unsigned bytes, in the
+            layout of pygame.surfarray
+        """
+        version, pixels, surface = self.map_cache.get(grid, (None, None, None))
+        if version != grid.version:
+            pixels = np.repeat(
+                np.repeat(grid.computeMapColors(), EnvironmentUnit.width, axis=0),
+                EnvironmentUnit.length,
+                axis=1,
+            )
+            self.map_cache[grid] = (grid.version, pixels, None)
+        return pixels
+
+    def getMapSurface(self, grid):
+        """Returns the map of a glucose or temperature grid as a pygame surface, built
+        again only when the version of the grid has changed.
+
+        Args:
+          grid (GlucoseGrid or TemperatureGrid): grid of the world to display
+
+        Returns:
+          pygame.Surface: surface of the size of the world
+        """
+        import pygame
+
+        pixels = self.getMapPixels(grid)
+        version, pixels, surface = self.map_cache[grid]
+        if surface is None:
+            surface = pygame.surfarray.make_surface(pixels)
+            self.map_cache[grid] = (version, pixels, surface)
+        return surface
+
+    def displayMap(self, grid) -> None:
+        """Display the map of a glucose or temperature grid of the world using pygame,
+        until the user closes the window. Each frame is a single blit of the cached map.
+
+        Args:
+          grid (GlucoseGrid or TemperatureGrid): grid of the world to display
+        """
+        import pygame
+
         pygame.init()
-        temperature_map = pygame.display.set_mode(self.pixel_dimensions)
-        self.temperature_grid.computeAllTemperatureColors()
-        while True:
-            event = pygame.event.poll()  # Collecting an event from the user
-            if event.type == pygame.QUIT:  # End loop if user click on cross butun
-                break
-
-            x, y = 0, 0
-            for row in self.temperature_grid.temperature_units_list:
-                for temp_unit in row:
-                    temp_unit_rectangle = self.createUnitDisplayRectangle(x, y)
-                    temperature_map.fill(temp_unit.color, temp_unit_rectangle)
-                    x += temp_unit_rectangle[2]
-                x = 0
-                y += temp_unit_rectangle[3]
+        field_map = pygame.display.set_mode(self.pixel_dimensions)
+        is_running = True
+        while is_running:
+            for event in pygame.event.get():  # Collecting the events from the user
+                if event.type == pygame.QUIT:  # End loop if user click on cross butun
+                    is_running = False
+            field_map.blit(self.getMapSurface(grid), (0, 0))
             pygame.display.flip()
         pygame.quit()
 
+    def displayTemperatureMap(self) -> None:
+        """Display the temperature map of the world using pygame"""
+        self.displayMap(self.temperature_grid)
+
     def displayGlucoseConcentrationMap(self) -> None:
         """Display the glucose concentration map of the world using pygame"""
-        pygame.init()
-        glucose_map = pygame.display.set_mode(self.pixel_dimensions)
-        self.glucose_grid.computeAllGlucoseColor()
-        while True:
-            event = pygame.event.poll()  # Collecting an event from the user
-            if event.type == pygame.QUIT:  # End loop if user click on cross butun
-                break
-
-            x, y = 0, 0
-            for row in self.glucose_grid.glucose_units_list:
-                for glucose_unit in row:
-                    glucose_unit_rectangle = self.createUnitDisplayRectangle(x, y)
-                    glucose_map.fill(glucose_unit.color, glucose_unit_rectangle)
-                    x += glucose_unit_rectangle[2]
-                x = 0
-                y += glucose_unit_rectangle[3]
-            pygame.display.flip()
-        pygame.quit()
+        self.displayMap(self.glucose_grid)
 
 
 if __name__ == "__main__":
@@ -152,4 +248,25 @@ if __name__ == "__main__":
     the_world.glucose_grid.changeMultipleGlucoseConcentration(
         [3, 4, 5, 6], [3, 4, 5, 6], 0.004
     )
+    # The hottest units are colored as 2000 K, the colormap reaching 2500 K
+    temperature_pixels = the_world.getMapPixels(the_world.temperature_grid)
+    print(temperature_pixels[15, 15].tolist() == [255, 0, 0])  # OK
+    # The map is built again after a change through a temperature unit, or in the
+    # array of the grid once signaled
+    the_world.temperature_grid.getTemperatureUnit(7, 7).changeTemperature(600)
+    print(
+        the_world.getMapPixels(the_world.temperature_grid) is not temperature_pixels
+    )  # OK
+    temperature_pixels = the_world.getMapPixels(the_world.temperature_grid)
+    the_world.temperature_grid.temperature_array[2, 2] = 600
+    the_world.temperature_grid.signalUnitsChange([2], [2])
+    print(
+        the_world.getMapPixels(the_world.temperature_grid) is not temperature_pixels
+    )  # OK
+    # Map cache test : the map is built again only after a change of the grid
+    glucose_pixels = the_world.getMapPixels(the_world.glucose_grid)
+    print(glucose_pixels.shape == the_world.pixel_dimensions + (3,))  # OK
+    print(the_world.getMapPixels(the_world.glucose_grid) is glucose_pixels)  # OK
+    the_world.glucose_grid.makeGlucoseDiffuse()
+    print(the_world.getMapPixels(the_world.glucose_grid) is not glucose_pixels)  # OK
     the_world.displayGlucoseConcentrationMap()  # OK
@@ -0,0 +1,213 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+import math
+import numpy as np
+from environment.diffusion import EXPLICIT_STABILITY_LIMIT, computePeriodicLaplacian
+
+
+class ActiveTiles:
+    """Activity of the square tiles of a periodic 2D field, used to diffuse only the
+    regions of the field which are still changing.
+    A tile is active when its values changed by more than tolerance during the last
+    diffusion step, or when it has been activated by a change of the field. A
+    diffusion step updates the active tiles and their 8 neighbours, the others being
+    left untouched : the error of skipping a tile is at most tolerance per step.
+    Every tile is active at the creation, the state of the field being unknown.
+
+    Attributes:
+      field_shape (tuple): shape of the field
+      tile_size (int): number of units of the side of a tile, the tiles of the last
+        row and column being smaller if the field isn't a multiple of it
+      tolerance (float): change of a value during a step below which a tile is
+        considered converged
+      full_step_fraction (float): fraction of updated tiles above which the whole
+        field is diffused at once, which is faster than gathering the tiles
+      active (np.ndarray): boolean array of the active tiles, indexed [x, y]
+    """
+
+    field_shape: tuple
+    tile_size: int
+    tolerance: float
+    full_step_fraction: float
+    active: np.ndarray
+
+    def __init__(
+        self,
+        field_shape: tuple,
+        tile_size: int = 32,
+        tolerance: float = 0,
+        full_step_fraction: float = 0.5,
+    ) -> None:
+        """
+        Args:
+          field_shape (tuple): shape of the field
+          tile_size (int): number of units of the side of a tile
+          tolerance (float): change of a value during a step below which a tile is
+            considered converged
+          full_step_fraction (float): fraction of updated tiles above which the whole
+            field is diffused at once
+        """
+        self.field_shape = tuple(field_shape)
+        self.tile_size = tile_size
+        self.tolerance = tolerance
+        self.full_step_fraction = full_step_fraction
+        self.active = np.ones(
+            [math.ceil(side / tile_size) for side in self.field_shape], dtype=bool
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.active.sum()} active tiles out of {self.active.size} "
+            + f"({self.tile_size} x {self.tile_size} units)\n"
+        )
+
+    def activateAll(self) -> None:
+        """Activates every tile, after a change of the field not located by
+        activateUnits
+        """
+        self.active[...] = True
+
+    def activateUnits(self, x_indices, y_indices) -> None:
+        """Activates the tiles containing the units of every x index combined with
+        every y index
+
+        Args:
+          x_indices: indices of the units along the x axis
+          y_indices: indices of the units along the y axis
+        """
+        self.active[
+            np.ix_(
+                np.asarray(x_indices, dtype=int) // self.tile_size,
+                np.asarray(y_indices, dtype=int) // self.tile_size,
+            )
+        ] = True
+
+    def activateUnitPairs(self, x_indices, y_indices) -> None:
+        """Activates the tiles containing the units (x_indices[i], y_indices[i])
+
+        Args:
+          x_indices: indices of the units along the x axis
+          y_indices: indices of the units along the y axis, as many as x_indices
+        """
+        self.active[
+            np.asarray(x_indices, dtype=int) // self.tile_size,
+            np.asarray(y_indices, dtype=int) // self.tile_size,
+        ] = True
+
+    def getUpdatedTiles(self) -> np.ndarray:
+        """Returns the boolean array of the active tiles and of their neighbours"""
+        updated = self.active.copy()
+        for axis in (0, 1):
+            updated |= np.roll(updated, 1, axis) | np.roll(updated, -1, axis)
+        return updated
+
+    def computeTileChanges(self, changes: np.ndarray) -> np.ndarray:
+        """Returns the largest absolute change of each tile of the field
+
+        Args:
+          changes (np.ndarray): change of every value of the field
+        """
+        starts = [np.arange(0, side, self.tile_size) for side in self.field_shape]
+        return np.maximum.reduceat(
+            np.maximum.reduceat(np.abs(changes), starts[0], axis=0), starts[1], axis=1
+        )
+
+    def makeDiffusionStep(
+        self, field: np.ndarray, diffusion_number: float, laplacian_buffer=None
+    ) -> None:
+        """Diffuses the updated tiles of a periodic 2D field in place for one explicit
+        time step, then keeps active the tiles whose values changed by more than
+        tolerance.
+
+        Args:
+          field (np.ndarray): 2D array of the values of the field
+          diffusion_number (float): diffusion number of the time step, lower than 1/4
+          laplacian_buffer (np.ndarray): array of the same shape as field used to store
+            the laplacian of a full step, a new array is allocated if None
+        """
+        updated = self.getUpdatedTiles()
+        tiles = np.argwhere(updated)
+        if len(tiles) == 0:
+            return
+        if len(tiles) > self.full_step_fraction * updated.size:
+            changes = computePeriodicLaplacian(field, laplacian_buffer)
+            changes *= diffusion_number
+            field += changes
+            self.active = self.computeTileChanges(changes) > self.tolerance
+            return
+
+        # Indices of the units of each tile with one halo line on both sides, the
+        # lines beyond the last row or column of the field being wrapped
+        lines = np.arange(-1, self.tile_size + 1)
+        x_lines = tiles[:, 0, None] * self.tile_size + lines
+        y_lines = tiles[:, 1, None] * self.tile_size + lines
+        block = field[
+            (x_lines % self.field_shape[0])[:, :, None],
+            (y_lines % self.field_shape[1])[:, None, :],
+        ]
+        values = block[:, 1:-1, 1:-1]
+        changes = block[:, :-2, 1:-1] + block[:, 2:, 1:-1] - 4 * values
+        changes += block[:, 1:-1, :-2] + block[:, 1:-1, 2:]
+        changes *= diffusion_number
+
+        # The wrapped lines of the smaller tiles belong to other tiles
+        x_units = np.broadcast_to(x_lines[:, 1:-1, None], changes.shape)
+        y_units = np.broadcast_to(y_lines[:, None, 1:-1], changes.shape)
+        inside = (x_units < self.field_shape[0]) & (y_units < self.field_shape[1])
+        field[x_units[inside], y_units[inside]] += changes[inside]
+
+        changes[~inside] = 0
+        tile_changes = np.abs(changes).max(axis=(1, 2))
+        self.active[...] = False
+        self.active[tuple(tiles[tile_changes > self.tolerance].T)] = True
+
+    def makeDiffusion(
+        self, field: np.ndarray, diffusion_number: float, laplacian_buffer=None
+    ) -> None:
+        """Diffuses the updated tiles of a periodic 2D field, the time step being
+        split in as many sub-steps as needed to stay stable.
+
+        Args:
+          field (np.ndarray): 2D array of the values of the field
+          diffusion_number (float): diffusion number of the whole time step
+          laplacian_buffer (np.ndarray): array of the same shape as field used to store
+            the laplacian of a full step, a new array is allocated if None
+        """
+        sub_steps_number = max(
+            1, math.ceil(diffusion_number / EXPLICIT_STABILITY_LIMIT)
+        )
+        for _ in range(sub_steps_number):
+            self.makeDiffusionStep(
+                field, diffusion_number / sub_steps_number, laplacian_buffer
+            )
+
+
+if __name__ == "__main__":
+    from environment.diffusion import makeExplicitDiffusionStep
+
+    # With a null tolerance, the result is the one of the whole field
+    field = np.zeros((50, 45))
+    field[3, 40] = 1
+    expected = field.copy()
+    tiles = ActiveTiles(field.shape, tile_size=8)
+    tiles.active[...] = False
+    tiles.activateUnits([3], [40])
+    for _ in range(10):
+        tiles.makeDiffusionStep(field, 0.2)
+        makeExplicitDiffusionStep(expected, 0.2)
+    print(np.allclose(field, expected, rtol=0, atol=10 ** (-15)))  # OK
+    print(abs(field.sum() - 1) < 10 ** (-12))  # OK
+    print(tiles.active.sum() < tiles.active.size)  # OK
+
+    # Converged tiles are deactivated, a full step leaving a uniform field unchanged
+    uniform = np.full((64, 64), 298.15)
+    tiles = ActiveTiles(uniform.shape, tile_size=16)
+    tiles.makeDiffusionStep(uniform, 0.2)
+    print(not tiles.active.any() and (uniform == 298.15).all())  # OK
+    print(tiles)
@@ -0,0 +1,608 @@
+import functools
+import math
+import warnings
+
+import numpy as np
+
+# Largest diffusion number for which the explicit scheme is stable
+EXPLICIT_STABILITY_LIMIT: float = 1 / 4
+
+
+def computePeriodicLaplacian(field: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Computes the 5-point discrete laplacian of a 2D field on a torus, each value
+    being replaced by the sum of its 4 neighbours minus 4 times itself.
+    The field is only read and the result is written in another buffer, so the result
+    doesn't depend on any iteration order.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        out (np.ndarray): array of the same shape as field where the laplacian is
+            written, a new array is allocated if None
+
+    Returns:
+        np.ndarray: the laplacian of the field
+    """
+    if out is None:
+        out = np.empty_like(field)
+    np.multiply(field, -4, out=out)
+
+    # Neighbours along the x axis, the first and last rows being neighbours
+    out[1:] += field[:-1]
+    out[0] += field[-1]
+    out[:-1] += field[1:]
+    out[-1] += field[0]
+
+    # Neighbours along the y axis
+    out[:, 1:] += field[:, :-1]
+    out[:, 0] += field[:, -1]
+    out[:, :-1] += field[:, 1:]
+    out[:, -1] += field[:, 0]
+    return out
+
+
+def makeExplicitDiffusionStep(
+    field: np.ndarray, diffusion_number: float, laplacian_buffer: np.ndarray = None
+) -> None:
+    """Diffuses a periodic 2D field in place for one explicit (forward Euler) time step.
+    The scheme is stable as long as diffusion_number is lower than 1/4.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): fraction of the difference between two neighbouring
+            values exchanged during the time step
+        laplacian_buffer (np.ndarray): array of the same shape as field used to store
+            the laplacian, a new array is allocated if None
+    """
+    laplacian = computePeriodicLaplacian(field, laplacian_buffer)
+    laplacian *= diffusion_number
+    field += laplacian
+
+
+def makeExplicitDiffusion(
+    field: np.ndarray, diffusion_number: float, laplacian_buffer: np.ndarray = None
+) -> None:
+    """Diffuses a periodic 2D field in place with the explicit scheme, the time step
+    being split in as many sub-steps as needed to stay stable.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the whole time step
+        laplacian_buffer (np.ndarray): array of the same shape as field used to store
+            the laplacian, a new array is allocated if None
+    """
+    sub_steps_number = max(1, math.ceil(diffusion_number / EXPLICIT_STABILITY_LIMIT))
+    for _ in range(sub_steps_number):
+        makeExplicitDiffusionStep(
+            field, diffusion_number / sub_steps_number, laplacian_buffer
+        )
+
+
+def computePeriodicSecondDifference(field: np.ndarray, axis: int) -> np.ndarray:
+    """Computes the discrete second difference of a periodic 2D field along one axis.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        axis (int): 0 for the x axis, 1 for the y axis
+
+    Returns:
+        np.ndarray: a new array containing the second difference
+    """
+    return np.roll(field, 1, axis) + np.roll(field, -1, axis) - 2 * field
+
+
+@functools.lru_cache(maxsize=16)
+def factorizePeriodicTridiagonal(
+    size: int, diagonal: float, off_diagonal: float
+) -> tuple:
+    """Prepares the resolution of a cyclic tridiagonal system of constant coefficients
+    with the Thomas algorithm and the Sherman-Morrison formula. The factorization only
+    depends on the matrix, so it is shared by every right-hand side.
+
+    Args:
+        size (int): size of the system, at least 3
+        diagonal (float): coefficient of the diagonal
+        off_diagonal (float): coefficient of the sub and super diagonals, including the
+            two corners of the matrix
+
+    Returns:
+        tuple: (pivots, upper_coefficients, correction, correction_factor) arrays used by
+            solvePeriodicTridiagonal
+    """
+    # The corners are removed from the matrix through a rank one correction u.v^T
+    gamma = -diagonal
+    modified_diagonal = np.full(size, diagonal)
+    modified_diagonal[0] -= gamma
+    modified_diagonal[-1] -= off_diagonal * off_diagonal / gamma
+
+    pivots = np.empty(size)
+    upper_coefficients = np.empty(size)
+    pivots[0] = modified_diagonal[0]
+    upper_coefficients[0] = off_diagonal / pivots[0]
+    for i in range(1, size):
+        pivots[i] = modified_diagonal[i] - off_diagonal * upper_coefficients[i - 1]
+        upper_coefficients[i] = off_diagonal / pivots[i]
+
+    u = np.zeros(size)
+    u[0], u[-1] = gamma, off_diagonal
+    correction = solveTridiagonal(u[:, None], off_diagonal, pivots, upper_coefficients)[
+        :, 0
+    ]
+    correction_factor = 1 + correction[0] + off_diagonal * correction[-1] / gamma
+    return pivots, upper_coefficients, correction, correction_factor, gamma
+
+
+def solveTridiagonal(
+    rhs: np.ndarray,
+    off_diagonal: float,
+    pivots: np.ndarray,
+    upper_coefficients: np.ndarray,
+) -> np.ndarray:
+    """Solves a factorized tridiagonal system with the Thomas algorithm, for every
+    column of rhs at once.
+
+    Args:
+        rhs (np.ndarray): 2D array, each column being a right-hand side
+        off_diagonal (float): coefficient of the sub diagonal
+        pivots (np.ndarray): pivots of the factorization
+        upper_coefficients (np.ndarray): normalized super diagonal of the factorization
+
+    Returns:
+        np.ndarray: a new array containing the solutions
+    """
+    solution = np.empty(rhs.shape)
+    solution[0] = rhs[0] / pivots[0]
+    for i in range(1, rhs.shape[0]):
+        solution[i] = (rhs[i] - off_diagonal * solution[i - 1]) / pivots[i]
+    for i in range(rhs.shape[0] - 2, -1, -1):
+        solution[i] -= upper_coefficients[i] * solution[i + 1]
+    return solution
+
+
+def solvePeriodicTridiagonal(
+    rhs: np.ndarray, diagonal: float, off_diagonal: float, axis: int = 0
+) -> np.ndarray:
+    """Solves A.x = rhs along one axis of a 2D array, A being the cyclic tridiagonal
+    matrix with diagonal on its diagonal and off_diagonal on its sub and super diagonals
+    and corners.
+
+    Args:
+        rhs (np.ndarray): 2D array of right-hand sides
+        diagonal (float): coefficient of the diagonal
+        off_diagonal (float): coefficient of the off diagonals
+        axis (int): axis along which the systems are solved
+
+    Returns:
+        np.ndarray: a new array of the same shape as rhs containing the solutions
+    """
+    rhs = np.moveaxis(rhs, axis, 0)
+    size = rhs.shape[0]
+    if size < 3:
+        # Both neighbours of a unit are the other unit, or the unit itself
+        identity = np.eye(size)
+        if size == 1:
+            matrix = identity * (diagonal + 2 * off_diagonal)
+        else:
+            matrix = identity * diagonal + (1 - identity) * 2 * off_diagonal
+        return np.moveaxis(np.linalg.solve(matrix, rhs), 0, axis)
+
+    pivots, upper_coefficients, correction, correction_factor, gamma = (
+        factorizePeriodicTridiagonal(size, diagonal, off_diagonal)
+    )
+    solution = solveTridiagonal(rhs, off_diagonal, pivots, upper_coefficients)
+    factor = (solution[0] + off_diagonal * solution[-1] / gamma) / correction_factor
+    solution -= correction[:, None] * factor
+    return np.moveaxis(solution, 0, axis)
+
+
+def makeImplicitDiffusionStep(field: np.ndarray, diffusion_number: float) -> None:
+    """Diffuses a periodic 2D field in place for one time step with the
+    Peaceman-Rachford alternating direction implicit (ADI) scheme.
+    Each half step is implicit along one axis and explicit along the other, so it only
+    needs cyclic tridiagonal solves. The scheme is unconditionally stable, whatever the
+    diffusion number.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the whole time step
+    """
+    half = diffusion_number / 2
+    # Implicit along x, explicit along y
+    intermediate = solvePeriodicTridiagonal(
+        field + half * computePeriodicSecondDifference(field, 1), 1 + 2 * half, -half, 0
+    )
+    # Implicit along y, explicit along x
+    field[...] = solvePeriodicTridiagonal(
+        intermediate + half * computePeriodicSecondDifference(intermediate, 0),
+        1 + 2 * half,
+        -half,
+        1,
+    )
+
+
+def makeSplitImplicitDiffusionStep(field: np.ndarray, diffusion_number: float) -> None:
+    """Diffuses a periodic 2D field in place for one time step with a backward Euler
+    scheme split along the two axes, solving one cyclic tridiagonal system per row and
+    then per column. The scheme is unconditionally stable and damps every oscillation,
+    so it can jump towards the equilibrium with time steps as large as wanted, at the
+    cost of a first order accuracy in time.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the whole time step
+    """
+    intermediate = solvePeriodicTridiagonal(
+        field, 1 + 2 * diffusion_number, -diffusion_number, 0
+    )
+    field[...] = solvePeriodicTridiagonal(
+        intermediate, 1 + 2 * diffusion_number, -diffusion_number, 1
+    )
+
+
+def iterateStripsWithHalo(field: np.ndarray, axis: int, strip_size: int):
+    """Yields the strips of a periodic 2D field along one axis, each with one halo line
+    on both sides, so that the caller can write the new values of each strip in place
+    before getting the next one. The halos always contain the values the field had
+    before the first strip was written.
+
+    Args:
+      field (np.ndarray): 2D array of the values of the field
+      axis (int): 0 for strips of lines along the x axis, 1 along the y axis
+      strip_size (int): number of lines of a strip
+
+    Yields:
+      tuple: (strip, block), strip being the slice of the lines of the strip along
+        axis and block an in-memory copy of them with a halo line on both sides
+    """
+    field = np.moveaxis(field, axis, 0)
+    lines_number = field.shape[0]
+    # Lines overwritten before they are needed as halos of another strip
+    first_line = np.array(field[0])
+    previous_line = np.array(field[-1])
+    for start in range(0, lines_number, strip_size):
+        end = min(start + strip_size, lines_number)
+        next_line = first_line if end == lines_number else field[end]
+        block = np.concatenate(
+            (previous_line[None], field[start:end], np.asarray(next_line)[None])
+        )
+        previous_line = np.array(block[-2])
+        yield slice(start, end), np.moveaxis(block, 0, axis)
+
+
+def makeTiledExplicitDiffusionStep(
+    field: np.ndarray, diffusion_number: float, strip_size: int
+) -> None:
+    """Diffuses a periodic 2D field in place for one explicit time step, strip by strip
+    of strip_size lines along the x axis, as makeExplicitDiffusionStep does for the
+    whole field. Only one strip and its halo are in memory at once, so the field can
+    be an np.memmap larger than the memory.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the time step, lower than 1/4
+        strip_size (int): number of lines of a strip
+    """
+    for strip, block in iterateStripsWithHalo(field, 0, strip_size):
+        field[strip] = computeExplicitStripDiffusion(block, diffusion_number)
+
+
+def computeExplicitStripDiffusion(
+    block: np.ndarray, diffusion_number: float
+) -> np.ndarray:
+    """Computes one explicit diffusion step of a strip of lines along the x axis of a
+    field periodic along the y axis, from the strip surrounded by its two halo lines.
+
+    Args:
+        block (np.ndarray): 2D array of the strip with one halo line on both sides
+            along the x axis
+        diffusion_number (float): diffusion number of the time step, lower than 1/4
+
+    Returns:
+        np.ndarray: a new array of the values of the strip after the time step
+    """
+    values = block[1:-1]
+    laplacian = block[:-2] + block[2:] - 4 * values
+    laplacian += np.roll(values, 1, 1) + np.roll(values, -1, 1)
+    return values + diffusion_number * laplacian
+
+
+def makeTiledExplicitDiffusion(
+    field: np.ndarray, diffusion_number: float, strip_size: int
+) -> None:
+    """Diffuses a periodic 2D field in place with the tiled explicit scheme, the time
+    step being split in as many sub-steps as needed to stay stable.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the whole time step
+        strip_size (int): number of lines of a strip
+    """
+    sub_steps_number = max(1, math.ceil(diffusion_number / EXPLICIT_STABILITY_LIMIT))
+    for _ in range(sub_steps_number):
+        makeTiledExplicitDiffusionStep(
+            field, diffusion_number / sub_steps_number, strip_size
+        )
+
+
+def makeTiledImplicitDiffusionStep(
+    field: np.ndarray, diffusion_number: float, strip_size: int
+) -> None:
+    """Peaceman-Rachford ADI step of makeImplicitDiffusionStep, computed strip by
+    strip : the half step implicit along x is solved for strips of columns, the one
+    implicit along y for strips of rows.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the whole time step
+        strip_size (int): number of lines of a strip
+    """
+    half = diffusion_number / 2
+    for axis in (1, 0):
+        for strip, block in iterateStripsWithHalo(field, axis, strip_size):
+            block = np.moveaxis(block, axis, 0)
+            values = block[1:-1]
+            rhs = values + half * (block[:-2] + block[2:] - 2 * values)
+            solution = solvePeriodicTridiagonal(
+                np.moveaxis(rhs, 0, axis), 1 + 2 * half, -half, 1 - axis
+            )
+            field[(slice(None),) * axis + (strip,)] = solution
+
+
+def makeTiledSplitImplicitDiffusionStep(
+    field: np.ndarray, diffusion_number: float, strip_size: int
+) -> None:
+    """Split backward Euler step of makeSplitImplicitDiffusionStep, computed strip by
+    strip : the systems along x are solved for strips of columns, then the systems
+    along y for strips of rows.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        diffusion_number (float): diffusion number of the whole time step
+        strip_size (int): number of lines of a strip
+    """
+    for axis in (0, 1):
+        lines_number = field.shape[1 - axis]
+        for start in range(0, lines_number, strip_size):
+            strip = (slice(None),) * (1 - axis) + (
+                slice(start, min(start + strip_size, lines_number)),
+            )
+            field[strip] = solvePeriodicTridiagonal(
+                np.asarray(field[strip]),
+                1 + 2 * diffusion_number,
+                -diffusion_number,
+                axis,
+            )
+
+
+def solvePeriodicPoisson(rhs: np.ndarray, mean: float = 0) -> np.ndarray:
+    """Solves the discrete Poisson equation laplacian(u) = rhs on a torus with the fast
+    Fourier transform, the 5-point laplacian of computePeriodicLaplacian being
+    diagonal in the Fourier basis. The solution of a torus is only defined up to a
+    constant, and only exists for a right-hand side of null mean : the mean of rhs is
+    ignored and the mean of the solution is set to mean.
+
+    Args:
+        rhs (np.ndarray): 2D array of the right-hand side
+        mean (float): mean value of the solution
+
+    Returns:
+        np.ndarray: a new array containing the solution
+    """
+    width, length = rhs.shape
+    eigenvalues = (
+        2 * np.cos(2 * np.pi * np.fft.fftfreq(width))[:, None]
+        + 2 * np.cos(2 * np.pi * np.fft.rfftfreq(length))[None, :]
+        - 4
+    )
+    eigenvalues[0, 0] = 1
+    coefficients = np.fft.rfft2(rhs) / eigenvalues
+    coefficients[0, 0] = mean * width * length
+    return np.fft.irfft2(coefficients, s=rhs.shape)
+
+
+# Number of units under which the coarsest multigrid level is solved directly
+MULTIGRID_DIRECT_SIZE: int = 1024
+
+
+def relaxFixedValuePoisson(
+    field: np.ndarray,
+    fixed: np.ndarray,
+    rhs: np.ndarray,
+    sweeps_number: int,
+    reverse: bool = False,
+) -> None:
+    """Red-black Gauss-Seidel sweeps of laplacian(field) = rhs on a torus, in place,
+    the units where fixed is True keeping their values.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        fixed (np.ndarray): boolean array of the units of fixed value
+        rhs (np.ndarray): 2D array of the right-hand side
+        sweeps_number (int): number of sweeps over both colors
+        reverse (bool): True to relax the black units before the red ones, which
+            makes a relaxation followed by a reversed one symmetric
+    """
+    checkerboard = np.add.outer(np.arange(field.shape[0]), np.arange(field.shape[1]))
+    colors = (1, 0) if reverse else (0, 1)
+    free_units = [(checkerboard % 2 == color) & ~fixed for color in colors]
+    # The laplacian plus 4 times the field is the sum of the neighbours
+    neighbours = np.empty(field.shape)
+    for _ in range(sweeps_number):
+        for free in free_units:
+            computePeriodicLaplacian(field, neighbours)
+            neighbours += 4 * field
+            neighbours -= rhs
+            neighbours /= 4
+            np.copyto(field, neighbours, where=free)
+
+
+@functools.lru_cache(maxsize=8)
+def invertFixedValueLaplacian(shape: tuple, fixed_bytes: bytes) -> np.ndarray:
+    """Returns the inverse of the matrix of the periodic 5-point laplacian of a small
+    grid, whose rows of the fixed units are replaced by the identity.
+
+    Args:
+        shape (tuple): shape of the grid
+        fixed_bytes (bytes): bytes of the boolean array of the fixed units, hashable
+            so that the inverse of each mask is computed once
+
+    Returns:
+        np.ndarray: the inverse matrix, of side the number of units
+    """
+    fixed = np.frombuffer(fixed_bytes, dtype=bool).reshape(shape)
+    units = np.arange(fixed.size).reshape(shape)
+    matrix = -4 * np.eye(fixed.size)
+    for axis in (0, 1):
+        for shift in (1, -1):
+            np.add.at(matrix, (units, np.roll(units, shift, axis)), 1)
+    fixed_units = units[fixed]
+    matrix[fixed_units] = 0
+    matrix[fixed_units, fixed_units] = 1
+    return np.linalg.inv(matrix)
+
+
+def solveFixedValuePoissonDirectly(
+    field: np.ndarray, fixed: np.ndarray, rhs: np.ndarray
+) -> None:
+    """Solves laplacian(field) = rhs on a small torus in place with the inverse of its
+    matrix, the units where fixed is True keeping their values. At least one unit must
+    be fixed.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        fixed (np.ndarray): boolean array of the units of fixed value
+        rhs (np.ndarray): 2D array of the right-hand side
+    """
+    vector = np.where(fixed, field, rhs).ravel()
+    inverse = invertFixedValueLaplacian(
+        field.shape, np.ascontiguousarray(fixed).tobytes()
+    )
+    field[...] = (inverse @ vector).reshape(field.shape)
+
+
+def getCoarseLineCounts(lines_number: int) -> np.ndarray:
+    """Returns the number of fine lines of each line of a coarse multigrid level,
+    lines_number // 2 coarse lines of 2 fine lines, the last one taking 3 fine lines
+    when lines_number is odd
+
+    Args:
+        lines_number (int): number of lines of the fine level, at least 2
+    """
+    counts = np.full(lines_number // 2, 2)
+    counts[-1] += lines_number % 2
+    return counts
+
+
+def makeMultigridCycle(
+    field: np.ndarray, fixed: np.ndarray, rhs: np.ndarray, sweeps_number: int = 2
+) -> None:
+    """Improves a solution of laplacian(field) = rhs on a torus in place with one
+    multigrid V-cycle, the units where fixed is True keeping their values.
+    The residual left by the relaxation is restricted to a grid of half resolution,
+    each coarse unit summing 2 x 2 units, where its correction is computed
+    recursively, then prolonged back. Along an odd side, the last coarse line sums 3
+    fine lines, so every level is coarsened down to a grid of at most
+    MULTIGRID_DIRECT_SIZE units, solved directly. Only a level too thin to be halved
+    but larger than MULTIGRID_DIRECT_SIZE is relaxed instead.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field
+        fixed (np.ndarray): boolean array of the units of fixed value
+        rhs (np.ndarray): 2D array of the right-hand side
+        sweeps_number (int): number of relaxation sweeps before and after the
+            coarse correction
+    """
+    if field.size <= MULTIGRID_DIRECT_SIZE:
+        solveFixedValuePoissonDirectly(field, fixed, rhs)
+        return
+    if min(field.shape) < 4:
+        relaxFixedValuePoisson(field, fixed, rhs, 4 * sweeps_number)
+        relaxFixedValuePoisson(field, fixed, rhs, 4 * sweeps_number, True)
+        return
+
+    relaxFixedValuePoisson(field, fixed, rhs, sweeps_number)
+    residual = rhs - computePeriodicLaplacian(field)
+    residual[fixed] = 0
+
+    # The laplacian of units twice as large is 4 times smaller, so the coarse
+    # right-hand side is 4 times the mean of a 2 x 2 block, its sum
+    line_counts = [getCoarseLineCounts(side) for side in field.shape]
+    line_starts = [np.cumsum(counts) - counts for counts in line_counts]
+    coarse_rhs = np.add.reduceat(
+        np.add.reduceat(residual, line_starts[0], 0), line_starts[1], 1
+    )
+    coarse_fixed = np.logical_or.reduceat(
+        np.logical_or.reduceat(fixed, line_starts[0], 0), line_starts[1], 1
+    )
+    correction = np.zeros(coarse_rhs.shape)
+    makeMultigridCycle(correction, coarse_fixed, coarse_rhs, sweeps_number)
+
+    correction = np.repeat(np.repeat(correction, line_counts[0], 0), line_counts[1], 1)
+    correction[fixed] = 0
+    field += correction
+    relaxFixedValuePoisson(field, fixed, rhs, sweeps_number, True)
+
+
+def solveFixedValuePoisson(
+    field: np.ndarray,
+    fixed: np.ndarray,
+    rhs: np.ndarray = None,
+    tolerance: float = 10 ** (-10),
+    max_iterations_number: int = 100,
+) -> int:
+    """Solves laplacian(field) = rhs on a torus in place, the units where fixed is
+    True keeping their values, until the largest residual is lower than tolerance.
+    The system is solved by conjugate gradients preconditioned by one multigrid
+    V-cycle of makeMultigridCycle per iteration. At least one unit must be fixed.
+
+    Args:
+        field (np.ndarray): 2D array of the values of the field, the initial guess
+        fixed (np.ndarray): boolean array of the units of fixed value
+        rhs (np.ndarray): 2D array of the right-hand side, null if None
+        tolerance (float): largest residual accepted
+        max_iterations_number (int): number of iterations after which the solve stops,
+            with a RuntimeWarning if the residual is still larger than tolerance
+
+    Returns:
+        int: number of iterations done
+    """
+    if not fixed.any():
+        raise ValueError("At least one unit must have a fixed value")
+    rhs = np.zeros(field.shape) if rhs is None else np.broadcast_to(rhs, field.shape)
+
+    def applyOperator(values: np.ndarray) -> np.ndarray:
+        # Opposite of the laplacian, positive definite on the free units
+        result = -computePeriodicLaplacian(values)
+        result[fixed] = 0
+        return result
+
+    def precondition(values: np.ndarray) -> np.ndarray:
+        correction = np.zeros(field.shape)
+        makeMultigridCycle(correction, fixed, -values)
+        return correction
+
+    # Correction of field, null on the fixed units
+    correction = np.zeros(field.shape)
+    residual = computePeriodicLaplacian(field) - rhs
+    residual[fixed] = 0
+    preconditioned = precondition(residual)
+    direction = preconditioned.copy()
+    product = np.vdot(residual, preconditioned)
+    iteration = 0
+    while np.abs(residual).max() >= tolerance and iteration < max_iterations_number:
+        iteration += 1
+        operator_direction = applyOperator(direction)
+        step = product / np.vdot(direction, operator_direction)
+        correction += step * direction
+        residual -= step * operator_direction
+        preconditioned = precondition(residual)
+        new_product = np.vdot(residual, preconditioned)
+        direction = preconditioned + new_product / product * direction
+        product = new_product
+    field += correction
+    if np.abs(residual).max() >= tolerance:
+        warnings.warn(
+            f"The solver stopped after {iteration} iterations with a residual of "
+            + f"{np.abs(residual).max():.2e}, larger than the tolerance {tolerance}",
+            RuntimeWarning,
+        )
+    return iteration
@@ -0,0 +1,114 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+import os
+import numpy as np
+
+
+class FieldStorage:
+    """Backend creating the arrays of the fields of a world (occupation, temperature,
+    glucose and their colors).
+    Without directory, the arrays are ordinary numpy arrays in memory. With a
+    directory, each array is an np.memmap file of this directory, so the size of a
+    world is bounded by the disk rather than by the memory.
+    With a tile_size, the grids process their fields strip by strip, a strip being
+    tile_size lines of units along one axis : only a few strips are in memory at once.
+
+    Attributes:
+      directory (str): directory of the memory mapped files, None to keep the arrays
+        in memory
+      tile_size (int): number of lines of units of the strips the fields are processed
+        by, None to process every field at once
+    """
+
+    directory: str
+    tile_size: int
+
+    def __init__(self, directory: str = None, tile_size: int = None) -> None:
+        """
+        Args:
+          directory (str): directory of the memory mapped files, created if needed.
+            None to keep the arrays in memory
+          tile_size (int): number of lines of units of the strips the fields are
+            processed by, None to process every field at once
+        """
+        self.directory = directory
+        self.tile_size = tile_size
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __str__(self) -> str:
+        place = "memory" if self.directory is None else self.directory
+        return f"Field storage in {place}, tiles of {self.tile_size} lines\n"
+
+    @property
+    def is_tiled(self) -> bool:
+        return self.tile_size is not None
+
+    def getArrayPath(self, name: str) -> str:
+        """Returns the path of the file of a memory mapped array"""
+        return os.path.join(self.directory, f"{name}.dat")
+
+    def containsArray(self, name: str) -> bool:
+        """Returns True if the array name already holds its values, createArray
+        returning it as is : the grids then don't compute its content again"""
+        return False
+
+    def createArray(self, name: str, shape: tuple, dtype, fill_value=0) -> np.ndarray:
+        """Creates an array filled with fill_value
+
+        Args:
+          name (str): name of the array, used for its file
+          shape (tuple): shape of the array, the first axis being the x axis
+          dtype: type of the elements
+          fill_value: initial value of the elements
+
+        Returns:
+          np.ndarray: the array, an np.memmap if the storage has a directory
+        """
+        if self.directory is None:
+            return np.full(shape, fill_value, dtype=dtype)
+        array = np.memmap(self.getArrayPath(name), dtype=dtype, mode="w+", shape=shape)
+        if fill_value != 0:
+            for strip in self.iterateStrips(shape[0]):
+                array[strip] = fill_value
+        return array
+
+    def iterateStrips(self, lines_number: int):
+        """Yields the slices of the strips of tile_size lines covering lines_number lines
+
+        Args:
+          lines_number (int): number of lines along the axis of the strips
+
+        Yields:
+          slice: lines of a strip
+        """
+        strip_size = lines_number if self.tile_size is None else self.tile_size
+        for start in range(0, lines_number, strip_size):
+            yield slice(start, min(start + strip_size, lines_number))
+
+
+if __name__ == "__main__":
+    import tempfile
+    from environment.diffusion import iterateStripsWithHalo
+
+    # Memory mapped arrays
+    storage = FieldStorage(tempfile.mkdtemp(), tile_size=3)
+    array = storage.createArray("test", (7, 5), float, 2.5)
+    print(isinstance(array, np.memmap) and (array == 2.5).all())  # OK
+    print([strip.start for strip in storage.iterateStrips(7)] == [0, 3, 6])  # OK
+
+    # The halos contain the values before the first write
+    field = np.arange(35.0).reshape(7, 5)
+    original = field.copy()
+    for axis in (0, 1):
+        field[...] = original
+        for strip, block in iterateStripsWithHalo(field, axis, 3):
+            lines = np.arange(strip.start - 1, strip.stop + 1) % field.shape[axis]
+            print((block == np.take(original, lines, axis)).all())  # OK
+            field[(slice(None),) * axis + (strip,)] = -1
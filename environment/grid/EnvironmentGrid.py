@@ -9,13 +9,17 @@ if __name__ == "__main__":
     grandparentdir = os.path.dirname(parentdir)
     sys.path.append(grandparentdir)
 
-from environment.unit.EnvironmentUnit import EnvironmentUnit
+from environment.unit.EnvironmentUnit import EnvironmentUnit, UnitsView
+from environment.field_storage import FieldStorage
+import numpy as np
 
 
 class EnvironmentGrid:
     """This class represents a units_on_width x units_on_length grid where an
     environmental unit is stored at each coordinates.
     The x axis goes from left to right. The y axis goes from top to bottom.
+    The occupation states of the units are stored in a 2D boolean array, environmental
+    units being created on demand as views of this array.
 
     Attributes :
         units_on_width (int): the number of columns, or environmental units along
@@ -23,7 +27,11 @@ class EnvironmentGrid:
         units_on_length (int): the number of rows, or environmental units along the y axis.
         width (float): width of the environment grid, in meters
         length (float): length of the environment grid, in meters
-        environment_units_list (list): list containing the environmental units
+        occupation_array (np.ndarray): boolean array of shape
+            (units_on_width, units_on_length), True where a unit is occupied
+        storage (FieldStorage): backend of occupation_array
+        environment_units_list (UnitsView): nested sequence of the environmental units,
+            created on access
     """
 
     units_on_width: int
@@ -35,9 +43,12 @@ class EnvironmentGrid:
     calculus_width: float  # m
     calculus_length: float  # m
 
-    environment_units_list: list[list[EnvironmentUnit]]
+    occupation_array: np.ndarray
+    storage: FieldStorage
 
-    def __init__(self, nb_units_width: int, nb_units_length: int) -> None:
+    def __init__(
+        self, nb_units_width: int, nb_units_length: int, storage: FieldStorage = None
+    ) -> None:
         self.units_on_width, self.units_on_length = nb_units_width, nb_units_length
 
         self.calculus_width = self.units_on_width * EnvironmentUnit.calculus_width
@@ -46,10 +57,10 @@ class EnvironmentGrid:
         self.width = self.units_on_width * EnvironmentUnit.width
         self.length = self.units_on_length * EnvironmentUnit.length
 
-        self.environment_units_list = [
-            [EnvironmentUnit() for i in range(self.units_on_width)]
-            for j in range(self.units_on_length)
-        ]
+        self.storage = FieldStorage() if storage is None else storage
+        self.occupation_array = self.storage.createArray(
+            "occupation", (self.units_on_width, self.units_on_length), bool
+        )
 
     def __str__(self) -> str:
         index = 0
@@ -59,10 +70,10 @@ class EnvironmentGrid:
         for n in range(0, self.units_on_width - 1):
             string += f"{n},"
         string += f"{self.units_on_width-1}]\n"
-        for row in self.environment_units_list:
+        for row in self.occupation_array:
             string += "["
-            for unit in row:
-                if unit.is_occupied:
+            for is_occupied in row:
+                if is_occupied:
                     string += "X "
                 else:
                     string += ". "
@@ -71,6 +82,17 @@ class EnvironmentGrid:
 
         return string
 
+    @property
+    def environment_units_list(self) -> UnitsView:
+        """Nested sequence of environmental units, indexed as [x][y], the units being
+        views of occupation_array created on access.
+        """
+        return UnitsView(
+            lambda x, y: EnvironmentUnit(self.occupation_array, x, y),
+            self.units_on_width,
+            self.units_on_length,
+        )
+
     def getEnvironmentUnit(
         self, position_x: float, position_y: float
     ) -> EnvironmentUnit:
@@ -85,9 +107,65 @@ class EnvironmentGrid:
         Returns:
           EnvironmentUnit: object of class EnvironmentUnit
         """
-        return self.environment_units_list[
-            position_x // EnvironmentUnit.width % self.units_on_width
-        ][position_y // EnvironmentUnit.length % self.units_on_length]
+        x_index = int(position_x // EnvironmentUnit.width % self.units_on_width)
+        y_index = int(position_y // EnvironmentUnit.length % self.units_on_length)
+        return EnvironmentUnit(self.occupation_array, x_index, y_index)
+
+    @staticmethod
+    def getWrappedSlices(
+        starting_position: float,
+        ending_position: float,
+        unit_size: int,
+        units_number: int,
+    ) -> list[slice]:
+        """Converts an interval of coordinates along one axis into slices of unit indices.
+        Because the environment is a topological 2-Sphere, an interval crossing the
+        border of the grid is split into two slices.
+
+        Args:
+          starting_position (float): coordinate where the interval begins
+          ending_position (float): coordinate where the interval ends
+          unit_size (int): size of one unit along the axis, in pixels
+          units_number (int): number of units along the axis
+
+        Returns:
+          list: zero, one or two slices of unit indices
+        """
+        start = math.floor(starting_position)
+        # Number of units met by range(start, ceil(ending_position), unit_size)
+        units_count = -(-(math.ceil(ending_position) - start) // unit_size)
+        if units_count <= 0:
+            return []
+        if units_count >= units_number:
+            return [slice(0, units_number)]
+
+        first_index = start // unit_size % units_number
+        last_index = first_index + units_count
+        if last_index <= units_number:
+            return [slice(first_index, last_index)]
+        return [slice(first_index, units_number), slice(0, last_index - units_number)]
+
+    def getRegionSlices(self, starting_coor: tuple, ending_coor: tuple) -> list[tuple]:
+        """Returns the rectangular blocks of occupation_array lying between the starting
+        and ending coordinates.
+
+        Args:
+            starting_coor (tuple): contains the (x, y) coordinates of an entity
+            ending_coor (tuple): contains the (ending_x, ending_y) coordinates of and entity
+
+        Returns:
+            list: (x_slice, y_slice) tuples indexing occupation_array
+        """
+        x_slices = self.getWrappedSlices(
+            starting_coor[0], ending_coor[0], EnvironmentUnit.width, self.units_on_width
+        )
+        y_slices = self.getWrappedSlices(
+            starting_coor[1],
+            ending_coor[1],
+            EnvironmentUnit.length,
+            self.units_on_length,
+        )
+        return [(x_slice, y_slice) for x_slice in x_slices for y_slice in y_slices]
 
     def changeMultipleOccupationStates(
         self,
@@ -103,27 +181,16 @@ class EnvironmentGrid:
             ending_coor (tuple): contains the (ending_x, ending_y) coordinates of and entity
             occupation_state (bool): the final value of the is_occupied attribute of the concerned environmental units
         """
-        for x in range(
-            math.floor(starting_coor[0]),
-            math.ceil(ending_coor[0]),
-            EnvironmentUnit.width,
-        ):
-            for y in range(
-                math.floor(starting_coor[1]),
-                math.ceil(ending_coor[1]),
-                EnvironmentUnit.length,
-            ):
-                self.getEnvironmentUnit(x, y).changeOccupationState(occupation_state)
+        for x_slice, y_slice in self.getRegionSlices(starting_coor, ending_coor):
+            self.occupation_array[x_slice, y_slice] = occupation_state
 
     def areAllUnitsNotOccupied(
         self,
         starting_coor: tuple,
         ending_coor: tuple,
     ) -> bool:
-        """Navigates through all the environmental units of the environment grid between the starting x and y coordinates
-        and the ending x and y.
-        For each environmental unit encountered, it checks its is_occupied attribute.
-        If one is set on True, then the function returns False.
+        """Checks the is_occupied attribute of all the environmental units of the environment grid
+        between the starting x and y coordinates and the ending x and y.
         The function returns True if and only if every environmental units have their is_occupied attribute sets on False.
 
         Args:
@@ -133,20 +200,9 @@ class EnvironmentGrid:
         Returns:
             bool: True if every environmental units have their is_occupied attribute set on False, False otherwise.
         """
-        for x in range(
-            math.floor(starting_coor[0]),
-            math.ceil(ending_coor[0]),
-            EnvironmentUnit.width,
-        ):
-            for y in range(
-                math.floor(starting_coor[1]),
-                math.ceil(ending_coor[1]),
-                EnvironmentUnit.length,
-            ):
-                if self.getEnvironmentUnit(x, y).is_occupied:
-                    return False
-                else:
-                    pass
+        for x_slice, y_slice in self.getRegionSlices(starting_coor, ending_coor):
+            if self.occupation_array[x_slice, y_slice].any():
+                return False
         return True
 
     def isSpace(
@@ -231,6 +287,11 @@ if __name__ == "__main__":
     print(environment_grid)
 
     # Occupation tests
-    # print(environment_grid.areAllUnitsNotOccupied(0,10,0,10) == False) # OK
-    # print(environment_grid.areAllUnitsNotOccupied(3,4,3,4) == True) # OK
-    # print(environment_grid.areAllUnitsNotOccupied(4,7,4,7) == False) # OK
+    print(environment_grid.areAllUnitsNotOccupied((0, 0), (50, 50)) == False)  # OK
+    print(environment_grid.areAllUnitsNotOccupied((20, 20), (25, 25)) == True)  # OK
+    print(environment_grid.getEnvironmentUnit(3, 3).is_occupied)  # OK
+
+    # Wrapping test : the region crosses the right and bottom borders of the grid
+    environment_grid.changeMultipleOccupationStates((45, 45), (55, 55), True)
+    print(environment_grid.getEnvironmentUnit(0, 0).is_occupied)  # OK
+    print(environment_grid.areAllUnitsNotOccupied((50, 50), (55, 55)) == False)  # OK
@@ -7,20 +7,48 @@ if __name__ == "__main__":
     grandparentdir = os.path.dirname(parentdir)
     sys.path.append(grandparentdir)
 
-from environment.unit.GlucoseUnit import EnvironmentUnit, GlucoseUnit, math
+from environment.unit.GlucoseUnit import (
+    EnvironmentUnit,
+    UnitsView,
+    GlucoseUnit,
+    glucose_colormap,
+    math,
+    np,
+)
+from environment.field_storage import FieldStorage
+import environment.diffusion as diffusion
+from environment.active_tiles import ActiveTiles
 import environment.physical_data as phy
 
 
 class GlucoseGrid:
     """This class represents a units_on_width x units_on_length grid where an glucose unit is stored at each coordinates.
     The x axis goes from left to right. The y axis goes from top to bottom.
+    The glucose concentrations are stored in a 2D array, glucose units being created
+    on demand as views of this array.
 
     Attributes :
       units_on_width (int): the number of columns, or environmental units along the x axis.
       units_on_length (int): the number of rows, or environmental units along the y axis.
       width (float): width of the environment grid, in meters
       length (float): length of the environment grid, in meters
-      glucose_units_list (list): list containing the glucose units
+      glucose_array (np.ndarray): array of shape (units_on_width, units_on_length)
+        containing the glucose concentrations, in kg/m³
+      color_array (np.ndarray): array of shape (units_on_width, units_on_length, 3)
+        containing the RGB colors of the glucose units
+      glucose_units_list (UnitsView): nested sequence of the glucose units,
+        created on access
+      storage (FieldStorage): backend of glucose_array, color_array and
+        occupation_array, whose tile_size makes the diffusion and the colors computed
+        strip by strip
+      occupation_array (np.ndarray): boolean array of shape (units_on_width,
+        units_on_length) of the occupation states of the glucose units, True where
+        a unit is occupied
+      version (int): counter incremented at every change of the concentrations, to
+        know when the colors of a glucose map must be computed again
+      active_tiles (ActiveTiles): activity of the tiles of glucose_array, only the
+        active tiles being diffused by the explicit scheme. None to diffuse the whole
+        grid
     """
 
     units_on_width: int
@@ -29,17 +57,48 @@ class GlucoseGrid:
     width: float  # m
     length: float  # m
 
-    glucose_units_list: list[list[GlucoseUnit]]
+    glucose_array: np.ndarray
+    color_array: np.ndarray
 
-    def __init__(self, col_nb: int, row_nb: int, initial_glucose: float = 0) -> None:
+    storage: FieldStorage
+    occupation_array: np.ndarray
+    version: int
+    active_tiles: ActiveTiles
+
+    def __init__(
+        self,
+        col_nb: int,
+        row_nb: int,
+        initial_glucose: float = 0,
+        storage: FieldStorage = None,
+    ) -> None:
         self.units_on_width, self.units_on_length = col_nb, row_nb
         self.width = self.units_on_width * EnvironmentUnit.width
         self.length = self.units_on_length * EnvironmentUnit.length
 
-        self.glucose_units_list = [
-            [GlucoseUnit(initial_glucose) for i in range(self.units_on_width)]
-            for j in range(self.units_on_length)
-        ]
+        self.storage = FieldStorage() if storage is None else storage
+        shape = (self.units_on_width, self.units_on_length)
+        self.glucose_array = self.storage.createArray(
+            "glucose", shape, float, initial_glucose
+        )
+        self.color_array = self.storage.createArray(
+            "glucose_color", shape + (3,), float
+        )
+        if not self.storage.containsArray("glucose_color"):
+            self.computeAllGlucoseColor()
+        self.version = 0
+        self.active_tiles = None
+        # Separate from the occupation of the EnvironmentGrid, which the cells update
+        self.occupation_array = self.storage.createArray(
+            "glucose_occupation", shape, bool
+        )
+
+        # Written by the diffusion while glucose_array is read, the tiled diffusion
+        # only needs buffers of the size of a strip
+        if self.storage.is_tiled:
+            self.laplacian_buffer = None
+        else:
+            self.laplacian_buffer = np.empty_like(self.glucose_array)
 
     def __str__(self) -> str:
         index = 0
@@ -48,15 +107,22 @@ class GlucoseGrid:
         for n in range(0, self.units_on_width - 1):
             string += f"{n},"
         string += f"{self.units_on_width-1}]\n"
-        for row in self.glucose_units_list:
+        for row in self.glucose_array:
             string += "["
-            for unit in row:
-                string += f"{unit.glucose_concentration:.2e} "
+            for glucose_concentration in row:
+                string += f"{glucose_concentration:.2e} "
             string += f"]{str(index)}\n"
             index += 1
 
         return string
 
+    @property
+    def glucose_units_list(self) -> UnitsView:
+        """Nested sequence of glucose units, indexed as [x][y], the units being views
+        of glucose_array created on access.
+        """
+        return UnitsView(self.getGlucoseUnit, self.units_on_width, self.units_on_length)
+
     def getGlucoseUnit(self, position_x: int, position_y: int) -> GlucoseUnit:
         """Returns the temperature unit at the specified position
 
@@ -67,9 +133,16 @@ class GlucoseGrid:
         Returns:
           GlucoseUnit: object of class GlucoseUnit
         """
-        return self.glucose_units_list[math.floor(position_x) % self.units_on_width][
-            math.floor(position_y) % self.units_on_length
-        ]
+        x_index = math.floor(position_x) % self.units_on_width
+        y_index = math.floor(position_y) % self.units_on_length
+        return GlucoseUnit(
+            glucose_array=self.glucose_array,
+            color_array=self.color_array,
+            x_index=x_index,
+            y_index=y_index,
+            grid=self,
+            occupation_array=self.occupation_array,
+        )
 
     def changeMultipleGlucoseConcentration(
         self, xlist, ylist, new_glucose_concentration: float
@@ -83,48 +156,202 @@ class GlucoseGrid:
           to be affected by the change of glucose concentration
           new_concentration (float): new glucose concentration to be set in Kelvin
         """
-        for x in xlist:
-            for y in ylist:
-                self.getGlucoseUnit(x, y).changeGlucoseConcentration(
-                    new_glucose_concentration
-                )
+        x_indices = np.floor(np.asarray(xlist)).astype(int) % self.units_on_width
+        y_indices = np.floor(np.asarray(ylist)).astype(int) % self.units_on_length
+        self.glucose_array[np.ix_(x_indices, y_indices)] = new_glucose_concentration
+        self.activateUnits(x_indices, y_indices)
+        self.version += 1
+
+    def consumeGlucose(self, x_indices, y_indices, demands) -> np.ndarray:
+        """Removes glucose from units, several demands being allowed on the same unit.
+        The demands on each unit are summed by a single scatter-add over the grid, so
+        the cost is about one pass over the concentrations. A unit having less glucose
+        than demanded is emptied, its glucose being shared between the demands in
+        proportion to them, so no concentration becomes negative.
+
+        Args:
+          x_indices (np.ndarray): indices along the x axis of the unit of each demand
+          y_indices (np.ndarray): indices along the y axis of the unit of each demand
+          demands (np.ndarray): concentration demanded by each demand, in kg/m³
+
+        Returns:
+          np.ndarray: concentration actually removed for each demand, in kg/m³
+        """
+        demands = np.asarray(demands, dtype=float)
+        x_indices = np.asarray(x_indices, dtype=np.int64)
+        y_indices = np.asarray(y_indices, dtype=np.int64)
+        flat_indices = x_indices * self.units_on_length + y_indices
+        # Sum of the demands on the unit of each demand, the demanded units being
+        # numbered first for a grid too large for the memory
+        if self.storage.is_tiled:
+            flat_indices = np.unique(flat_indices, return_inverse=True)[1]
+        unit_demands = np.bincount(
+            flat_indices,
+            weights=demands,
+            minlength=0 if self.storage.is_tiled else self.glucose_array.size,
+        )[flat_indices]
+        available = np.maximum(self.glucose_array[x_indices, y_indices], 0)
+
+        is_short = unit_demands > available
+        supplied_fractions = np.ones(len(demands))
+        np.divide(available, unit_demands, out=supplied_fractions, where=is_short)
+        # The demands on the same unit write the same concentration
+        self.glucose_array[x_indices, y_indices] = np.where(
+            is_short, 0, available - unit_demands
+        )
+        if self.active_tiles is not None:
+            self.active_tiles.activateUnitPairs(x_indices, y_indices)
+        self.version += 1
+        return demands * supplied_fractions
+
+    def trackActiveTiles(
+        self, tile_size: int = 32, tolerance: float = 10 ** (-12)
+    ) -> None:
+        """Makes the explicit diffusion update only the tiles whose concentrations are still
+        changing, and their neighbours. The tiles are reactivated by the changes of
+        the grid and of its glucose units, changes made directly in glucose_array
+        must be followed by a call to signalUnitsChange.
+
+        Args:
+          tile_size (int): number of units of the side of a tile
+          tolerance (float): change of a value during a step below which a tile is
+            considered converged, in kg/m³
+
+        Raises:
+          ValueError: if the storage of the grid is tiled, the active tiles being
+            gathered from the whole array
+        """
+        if self.storage.is_tiled:
+            raise ValueError("Active tiles can't be tracked with a tiled storage")
+        self.active_tiles = ActiveTiles(self.glucose_array.shape, tile_size, tolerance)
+
+    def activateUnits(self, x_indices, y_indices) -> None:
+        """Signals a change of the units of every x index combined with every y index,
+        so that they are diffused again if active tiles are tracked
+
+        Args:
+          x_indices: indices of the units along the x axis
+          y_indices: indices of the units along the y axis
+        """
+        if self.active_tiles is not None:
+            self.active_tiles.activateUnits(x_indices, y_indices)
+
+    def signalUnitsChange(self, x_indices=None, y_indices=None) -> None:
+        """Signals a change of the units (x_indices[i], y_indices[i]) made outside of
+        the methods of the grid, by a glucose unit or directly in glucose_array :
+        their tiles are diffused again if active tiles are tracked, and version is
+        incremented so that the map is drawn again
+
+        Args:
+          x_indices: indices of the units along the x axis, None for a change of
+            every unit
+          y_indices: indices of the units along the y axis, as many as x_indices
+        """
+        if self.active_tiles is not None:
+            if x_indices is None:
+                self.active_tiles.activateAll()
+            else:
+                self.active_tiles.activateUnitPairs(x_indices, y_indices)
+        self.version += 1
 
     def computeAllGlucoseColor(self) -> None:
-        """Adapt the color of every glucose units in the grid using their adaptGlucoseColor function"""
-        for row in self.glucose_units_list:
-            for glu_unit in row:
-                glu_unit.adaptGlucoseColor()
-
-    def makeGlucoseDiffuse(self) -> None:
-        """Cross every glucose unit in the glucose grid and diffuses the glucose.
-        For each glucose unit, it computes 4 massic flux, one for each glucose units around it,
-        and modifies the glucose concentration in the glucose unit in consequence.
+        """Adapt the color of every glucose units in the grid, as their adaptGlucoseColor function does"""
+        for strip in self.storage.iterateStrips(self.units_on_width):
+            self.color_array[strip] = self.computeMapColors(strip)
+
+    def computeMapColors(
+        self, x_slice: slice = slice(None), y_slice: slice = slice(None)
+    ) -> np.ndarray:
+        """Returns the colors of the glucose units of a region of the grid, looked up
+        in glucose_colormap
+
+        Args:
+          x_slice (slice): columns of the region, every column by default
+          y_slice (slice): rows of the region, every row by default
+
+        Returns:
+          np.ndarray: array of shape (columns, rows, 3) of the RGB colors, as unsigned
+            bytes
+        """
+        return glucose_colormap.apply(self.glucose_array[x_slice, y_slice])
+
+    def makeGlucoseDiffuse(self, time_step: float = phy.TIME_ITERATION) -> None:
+        """Diffuses the glucose of the whole grid for one time step.
+        For each glucose unit, the sum of the 4 massic flux exchanged with the glucose
+        units around it is proportional to the discrete laplacian of the concentration,
+        which is computed for the whole grid at once from the concentrations before
+        the diffusion. A time step too large for the explicit scheme is split in stable
+        sub-steps. When active tiles are tracked, only the active tiles are diffused.
+
+        Args:
+          time_step (float): duration of the diffusion, in seconds
+        """
+        diffusion_number = phy.computeGlucoseDiffusionNumber(
+            EnvironmentUnit.volume / EnvironmentUnit.surface, time_step
+        )
+        if self.active_tiles is not None:
+            self.active_tiles.makeDiffusion(
+                self.glucose_array, diffusion_number, self.laplacian_buffer
+            )
+        elif self.storage.is_tiled:
+            diffusion.makeTiledExplicitDiffusion(
+                self.glucose_array, diffusion_number, self.storage.tile_size
+            )
+        else:
+            diffusion.makeExplicitDiffusion(
+                self.glucose_array, diffusion_number, self.laplacian_buffer
+            )
+        self.version += 1
+
+    def makeGlucoseSteady(
+        self,
+        fixed_units: np.ndarray = None,
+        production_rates: np.ndarray = None,
+        tolerance: float = 10 ** (-12),
+    ) -> int:
+        """Replaces the concentrations by the steady state of the diffusion, reached after
+        an infinite time :
+          without fixed units, the steady state of the torus is computed by the fast
+          Fourier transform. The mean of the concentrations is kept, the mean of the rates
+          being ignored since it raises every unit evenly forever.
+          with fixed units, which keep their concentrations like sources held at a
+          constant value, the steady state is computed by a multigrid solver, which
+          warns with a RuntimeWarning when it stops before reaching the tolerance.
+
+        Args:
+          fixed_units (np.ndarray): boolean array of shape (units_on_width,
+            units_on_length), True for the units keeping their concentrations. None for
+            the steady state of the whole torus
+          production_rates (np.ndarray): glucose production rate of every unit, in kg/m³/s, None for no source term
+          tolerance (float): largest error on the laplacian accepted by the multigrid
+            solver, in kg/m³
+
+        Returns:
+          int: number of iterations of the multigrid solver, 0 for the steady state
+            of the torus
         """
-        for x in range(self.units_on_width):
-            for y in range(self.units_on_length):
-                print(f"coor : ({x},{y})")
-                leftward_flux = phy.computeGlucoseFlux(
-                    self.getGlucoseUnit(x, y).glucose_concentration,
-                    self.getGlucoseUnit(x - 1, y).glucose_concentration,
-                )
-                rigthward_flux = phy.computeGlucoseFlux(
-                    self.getGlucoseUnit(x, y).glucose_concentration,
-                    self.getGlucoseUnit(x + 1, y).glucose_concentration,
-                )
-                upward_flux = phy.computeGlucoseFlux(
-                    self.getGlucoseUnit(x, y).glucose_concentration,
-                    self.getGlucoseUnit(x, y - 1).glucose_concentration,
-                )
-                downward_flux = phy.computeGlucoseFlux(
-                    self.getGlucoseUnit(x, y).glucose_concentration,
-                    self.getGlucoseUnit(x, y + 1).glucose_concentration,
-                )
-                print(
-                    f"Total flux : {leftward_flux+rigthward_flux+upward_flux+downward_flux}"
-                )
-                self.getGlucoseUnit(x, y).changeGlucoseConcentrationFromFlux(
-                    leftward_flux + rigthward_flux + upward_flux + downward_flux
-                )
+        # Steady state of dglucose/dt = rate * laplacian + source
+        diffusion_rate = phy.computeGlucoseDiffusionNumber(
+            EnvironmentUnit.volume / EnvironmentUnit.surface, 1
+        )
+        rhs = np.zeros(self.glucose_array.shape)
+        if production_rates is not None:
+            rhs -= np.asarray(production_rates) / diffusion_rate
+        iterations_number = 0
+        if fixed_units is None:
+            self.glucose_array[...] = diffusion.solvePeriodicPoisson(
+                rhs, self.glucose_array.mean()
+            )
+        else:
+            field = np.array(self.glucose_array)
+            iterations_number = diffusion.solveFixedValuePoisson(
+                field, np.asarray(fixed_units, dtype=bool), rhs, tolerance
+            )
+            self.glucose_array[...] = field
+        if self.active_tiles is not None:
+            self.active_tiles.activateAll()
+        self.version += 1
+        return iterations_number
 
 
 if __name__ == "__main__":
@@ -142,9 +369,73 @@ if __name__ == "__main__":
     print(gluc_grid.getGlucoseUnit(1, 1))
 
     # Glucose diffusion test
-    # gluc_grid.makeGlucoseDiffuse()
-    # print(gluc_grid)
+    total_glucose = gluc_grid.glucose_array.sum()
+    gluc_grid.makeGlucoseDiffuse()
+    print(gluc_grid)
+    print(abs(gluc_grid.glucose_array.sum() - total_glucose) < 10 ** (-12))  # OK
+
+    # Diffusion with a large time step, converging towards a uniform concentration
+    for i in range(100):
+        gluc_grid.makeGlucoseDiffuse(10)
+    print(gluc_grid)  # OK
+
+    # Tiled diffusion test : same result as the diffusion of the whole grid
+    tiled_grid = GlucoseGrid(7, 5, 0, FieldStorage(tile_size=2))
+    gluc_grid = GlucoseGrid(7, 5)
+    for grid in (gluc_grid, tiled_grid):
+        grid.changeMultipleGlucoseConcentration([1, 2], [3], 7 * 10 ** (-3))
+        grid.makeGlucoseDiffuse()
+    print(np.allclose(tiled_grid.glucose_array, gluc_grid.glucose_array))  # OK
+
+    # The units are views writing into the arrays of the grid
+    tiled_grid.glucose_units_list[6][-1].changeGlucoseConcentration(0.002)
+    print(tiled_grid.glucose_array[6, 4] == 0.002)  # OK
+    print(len(tiled_grid.glucose_units_list[0]) == 5)  # OK
+    # Their occupation is kept by the grid, apart from the one of the cells
+    tiled_grid.getGlucoseUnit(2, 3).changeOccupationState(True)
+    print(tiled_grid.glucose_units_list[2][3].is_occupied)  # OK
+    print(tiled_grid.occupation_array.sum() == 1)  # OK
+
+    # Point source : only the tiles around it are diffused
+    tracked_grid, gluc_grid = GlucoseGrid(200, 200), GlucoseGrid(200, 200)
+    tracked_grid.trackActiveTiles(tile_size=16)
+    tracked_grid.active_tiles.active[...] = False
+    for grid in (tracked_grid, gluc_grid):
+        grid.changeMultipleGlucoseConcentration([100], [100], 0.01)
+        for i in range(20):
+            grid.makeGlucoseDiffuse(100)
+    print(np.allclose(tracked_grid.glucose_array, gluc_grid.glucose_array))  # OK
+    print(tracked_grid.active_tiles.active.sum() <= 9)  # OK
+
+    # Uptake test : the demands on a unit are shared when it has too little glucose
+    gluc_grid = GlucoseGrid(10, 10, 0.005)
+    gluc_grid.trackActiveTiles(tile_size=4)
+    gluc_grid.active_tiles.active[...] = False
+    removed = gluc_grid.consumeGlucose([1, 1, 9], [2, 2, 3], [0.004, 0.004, 0.001])
+    print(np.allclose(removed, [0.0025, 0.0025, 0.001]))  # OK
+    print(gluc_grid.glucose_array[1, 2] == 0 and gluc_grid.glucose_array.min() >= 0)
+    # OK
+    print(abs(gluc_grid.glucose_array.sum() + removed.sum() - 0.5) < 10 ** (-12))
+    # OK
+    print(gluc_grid.active_tiles.active.sum() == 2)  # OK
+    tiled_grid = GlucoseGrid(10, 10, 0.005, FieldStorage(tile_size=4))
+    tiled_removed = tiled_grid.consumeGlucose(
+        [1, 1, 9], [2, 2, 3], [0.004] * 2 + [0.001]
+    )
+    print(np.allclose(tiled_removed, removed))  # OK
+
+    # A change through a glucose unit reactivates its tile
+    tracked_grid, gluc_grid = GlucoseGrid(64, 64), GlucoseGrid(64, 64)
+    tracked_grid.trackActiveTiles(tile_size=16)
+    tracked_grid.active_tiles.active[...] = False
+    for grid in (tracked_grid, gluc_grid):
+        version = grid.version
+        grid.getGlucoseUnit(30, 30).changeGlucoseConcentration(0.01)
+        print(grid.version > version)  # OK
+        grid.makeGlucoseDiffuse(100)
+    print(0 < tracked_grid.glucose_array[31, 30] < 0.01)  # OK
+    print(np.allclose(tracked_grid.glucose_array, gluc_grid.glucose_array))  # OK
 
-    # while gluc_grid.getGlucoseUnit(0,1).glucose_concentration != gluc_grid.getGlucoseUnit(1,1).glucose_concentration:
-    #  gluc_grid.makeGlucoseDiffuse()
-    #  print(gluc_grid) # OK
+    # Without source, the steady state of the torus is the uniform mean concentration
+    gluc_grid.makeGlucoseSteady()
+    print(np.allclose(gluc_grid.glucose_array, gluc_grid.glucose_array.mean()))  # OK
@@ -7,19 +7,48 @@ if __name__ == "__main__":
     grandparentdir = os.path.dirname(parentdir)
     sys.path.append(grandparentdir)
 
-from environment.unit.TemperatureUnit import EnvironmentUnit, TemperatureUnit, math, phy
+from environment.unit.TemperatureUnit import (
+    EnvironmentUnit,
+    UnitsView,
+    TemperatureUnit,
+    temperature_colormap,
+    math,
+    np,
+    phy,
+)
+from environment.field_storage import FieldStorage
+import environment.diffusion as diffusion
+from environment.active_tiles import ActiveTiles
 
 
 class TemperatureGrid:
     """This class represents a units_on_width x units_on_length grid where an temperature unit is stored at each coordinates.
     The x axis goes from left to right. The y axis goes from top to bottom.
+    The temperatures are stored in a 2D array, temperature units being created on
+    demand as views of this array.
 
     Attributes :
       units_on_width (int): the number of columns, or environmental units along the x axis.
       units_on_length (int): the number of rows, or environmental units along the y axis.
       width (float): width of the environment grid, in meters
       length (float): length of the environment grid, in meters
-      temperature_units_list (list): list containing the temperature units
+      temperature_array (np.ndarray): array of shape (units_on_width, units_on_length)
+        containing the temperatures, in Kelvin
+      color_array (np.ndarray): array of shape (units_on_width, units_on_length, 3)
+        containing the RGB colors of the temperature units
+      temperature_units_list (UnitsView): nested sequence of the temperature units,
+        created on access
+      storage (FieldStorage): backend of temperature_array, color_array and
+        occupation_array, whose tile_size makes the diffusion and the colors computed
+        strip by strip
+      occupation_array (np.ndarray): boolean array of shape (units_on_width,
+        units_on_length) of the occupation states of the temperature units, True where
+        a unit is occupied
+      version (int): counter incremented at every change of the temperatures, to
+        know when the colors of a temperature map must be computed again
+      active_tiles (ActiveTiles): activity of the tiles of temperature_array, only the
+        active tiles being diffused by the explicit scheme. None to diffuse the whole
+        grid
     """
 
     units_on_width: int
@@ -28,19 +57,51 @@ class TemperatureGrid:
     width: float  # m
     length: float  # m
 
-    temperature_units_list: list[list[TemperatureUnit]]
+    temperature_array: np.ndarray
+    color_array: np.ndarray
+
+    storage: FieldStorage
+    occupation_array: np.ndarray
+    version: int
+    active_tiles: ActiveTiles
+
+    # Solvers usable by makeTemperatureDiffuse
+    diffusion_methods: tuple = ("explicit", "adi", "implicit")
 
     def __init__(
-        self, col_nb: int, row_nb: int, initial_temperature: float = 298.15
+        self,
+        col_nb: int,
+        row_nb: int,
+        initial_temperature: float = 298.15,
+        storage: FieldStorage = None,
     ) -> None:
         self.units_on_width, self.units_on_length = col_nb, row_nb
         self.width = self.units_on_width * EnvironmentUnit.width
         self.length = self.units_on_length * EnvironmentUnit.length
 
-        self.temperature_units_list = [
-            [TemperatureUnit(initial_temperature) for i in range(self.units_on_width)]
-            for j in range(self.units_on_length)
-        ]
+        self.storage = FieldStorage() if storage is None else storage
+        shape = (self.units_on_width, self.units_on_length)
+        self.temperature_array = self.storage.createArray(
+            "temperature", shape, float, initial_temperature
+        )
+        self.color_array = self.storage.createArray(
+            "temperature_color", shape + (3,), float
+        )
+        if not self.storage.containsArray("temperature_color"):
+            self.computeAllTemperatureColors()
+        self.version = 0
+        self.active_tiles = None
+        # Separate from the occupation of the EnvironmentGrid, which the cells update
+        self.occupation_array = self.storage.createArray(
+            "temperature_occupation", shape, bool
+        )
+
+        # Written by the explicit diffusion while temperature_array is read, the tiled
+        # diffusion only needs buffers of the size of a strip
+        if self.storage.is_tiled:
+            self.laplacian_buffer = None
+        else:
+            self.laplacian_buffer = np.empty_like(self.temperature_array)
 
     def __str__(self) -> str:
         index = 0
@@ -50,15 +111,24 @@ class TemperatureGrid:
         for n in range(0, self.units_on_width - 1):
             string += f"{n},"
         string += f"{self.units_on_width-1}]\n"
-        for row in self.temperature_units_list:
+        for row in self.temperature_array:
             string += "["
-            for unit in row:
-                string += f"{unit.temperature:.0f} "
+            for temperature in row:
+                string += f"{temperature:.0f} "
             string += f"]{str(index)}\n"
             index += 1
 
         return string
 
+    @property
+    def temperature_units_list(self) -> UnitsView:
+        """Nested sequence of temperature units, indexed as [x][y], the units being views
+        of temperature_array created on access.
+        """
+        return UnitsView(
+            self.getTemperatureUnit, self.units_on_width, self.units_on_length
+        )
+
     def getTemperatureUnit(self, position_x: int, position_y: int) -> TemperatureUnit:
         """Returns the temperature unit at the wanted wanted position
 
@@ -69,15 +139,37 @@ class TemperatureGrid:
         Returns:
           TemperatureUnit: object of class TemperatureUnit
         """
-        return self.temperature_units_list[
-            math.floor(position_x) % self.units_on_width
-        ][math.floor(position_y) % self.units_on_length]
+        x_index = math.floor(position_x) % self.units_on_width
+        y_index = math.floor(position_y) % self.units_on_length
+        return TemperatureUnit(
+            temperature_array=self.temperature_array,
+            color_array=self.color_array,
+            x_index=x_index,
+            y_index=y_index,
+            grid=self,
+            occupation_array=self.occupation_array,
+        )
 
     def computeAllTemperatureColors(self) -> None:
-        """Adapt the color of every temperature units in the grid using their adaptTemperatureColor function"""
-        for row in self.temperature_units_list:
-            for unit in row:
-                unit.adaptTemperatureColor()
+        """Adapt the color of every temperature units in the grid, as their adaptTemperatureColor function does"""
+        for strip in self.storage.iterateStrips(self.units_on_width):
+            self.color_array[strip] = self.computeMapColors(strip)
+
+    def computeMapColors(
+        self, x_slice: slice = slice(None), y_slice: slice = slice(None)
+    ) -> np.ndarray:
+        """Returns the colors of the temperature units of a region of the grid, looked
+        up in temperature_colormap
+
+        Args:
+          x_slice (slice): columns of the region, every column by default
+          y_slice (slice): rows of the region, every row by default
+
+        Returns:
+          np.ndarray: array of shape (columns, rows, 3) of the RGB colors, as unsigned
+            bytes
+        """
+        return temperature_colormap.apply(self.temperature_array[x_slice, y_slice])
 
     def changeMultipleTemperature(self, xlist, ylist, new_temperature: float) -> None:
         """Sets the concerned temperature units's temperature on new_temperature.
@@ -89,33 +181,173 @@ class TemperatureGrid:
           to be affected by the change of temperature
           new_temperature (float): new temperature to be set in Kelvin
         """
-        for x in xlist:
-            for y in ylist:
-                self.getTemperatureUnit(x, y).changeTemperature(new_temperature)
-
-    def makeTemperatureDiffuse(self) -> None:
-        """Cross every temperature unit and diffuses the temperature by thermal conduction."""
-        for x in range(self.units_on_width):
-            for y in range(self.units_on_length):
-                leftward_flux = phy.computeThermalFlux(
-                    self.getTemperatureUnit(x, y).temperature,
-                    self.getTemperatureUnit(x - 1, y).temperature,
-                )
-                rigthward_flux = phy.computeThermalFlux(
-                    self.getTemperatureUnit(x, y).temperature,
-                    self.getTemperatureUnit(x + 1, y).temperature,
-                )
-                upward_flux = phy.computeThermalFlux(
-                    self.getTemperatureUnit(x, y).temperature,
-                    self.getTemperatureUnit(x, y - 1).temperature,
-                )
-                downward_flux = phy.computeThermalFlux(
-                    self.getTemperatureUnit(x, y).temperature,
-                    self.getTemperatureUnit(x, y + 1).temperature,
-                )
-                self.getTemperatureUnit(x, y).changeTemperatureFromFlux(
-                    leftward_flux + rigthward_flux + upward_flux + downward_flux
-                )
+        x_indices = np.floor(np.asarray(xlist)).astype(int) % self.units_on_width
+        y_indices = np.floor(np.asarray(ylist)).astype(int) % self.units_on_length
+        self.temperature_array[np.ix_(x_indices, y_indices)] = new_temperature
+        self.activateUnits(x_indices, y_indices)
+        self.version += 1
+
+    def trackActiveTiles(
+        self, tile_size: int = 32, tolerance: float = 10 ** (-9)
+    ) -> None:
+        """Makes the explicit diffusion update only the tiles whose temperatures are still
+        changing, and their neighbours. The tiles are reactivated by the changes of
+        the grid and of its temperature units, changes made directly in temperature_array
+        must be followed by a call to signalUnitsChange.
+
+        Args:
+          tile_size (int): number of units of the side of a tile
+          tolerance (float): change of a value during a step below which a tile is
+            considered converged, in Kelvin
+
+        Raises:
+          ValueError: if the storage of the grid is tiled, the active tiles being
+            gathered from the whole array
+        """
+        if self.storage.is_tiled:
+            raise ValueError("Active tiles can't be tracked with a tiled storage")
+        self.active_tiles = ActiveTiles(
+            self.temperature_array.shape, tile_size, tolerance
+        )
+
+    def activateUnits(self, x_indices, y_indices) -> None:
+        """Signals a change of the units of every x index combined with every y index,
+        so that they are diffused again if active tiles are tracked
+
+        Args:
+          x_indices: indices of the units along the x axis
+          y_indices: indices of the units along the y axis
+        """
+        if self.active_tiles is not None:
+            self.active_tiles.activateUnits(x_indices, y_indices)
+
+    def signalUnitsChange(self, x_indices=None, y_indices=None) -> None:
+        """Signals a change of the units (x_indices[i], y_indices[i]) made outside of
+        the methods of the grid, by a temperature unit or directly in temperature_array :
+        their tiles are diffused again if active tiles are tracked, and version is
+        incremented so that the map is drawn again
+
+        Args:
+          x_indices: indices of the units along the x axis, None for a change of
+            every unit
+          y_indices: indices of the units along the y axis, as many as x_indices
+        """
+        if self.active_tiles is not None:
+            if x_indices is None:
+                self.active_tiles.activateAll()
+            else:
+                self.active_tiles.activateUnitPairs(x_indices, y_indices)
+        self.version += 1
+
+    def makeTemperatureDiffuse(
+        self, time_step: float = phy.TIME_ITERATION, method: str = "explicit"
+    ) -> None:
+        """Diffuses the temperature of the whole grid by thermal conduction for one time step.
+        The thermal flux between two neighbouring units follows phy.computeThermalFlux.
+        When active tiles are tracked, the explicit scheme only diffuses the active
+        tiles.
+
+        Args:
+          time_step (float): duration of the diffusion, in seconds
+          method (str): solver used for the diffusion :
+            "explicit" : vectorized forward Euler scheme, split in stable sub-steps when
+              time_step is too large
+            "adi" : Peaceman-Rachford alternating direction implicit scheme, second order
+              accurate and unconditionally stable
+            "implicit" : backward Euler scheme split along the axes, unconditionally
+              stable and damped, for time steps orders of magnitude larger than
+              phy.TIME_ITERATION
+        """
+        diffusion_number = phy.computeThermalDiffusionNumber(
+            EnvironmentUnit.volume / EnvironmentUnit.surface, time_step
+        )
+        tile_size = self.storage.tile_size
+        if method == "explicit" and self.active_tiles is not None:
+            self.active_tiles.makeDiffusion(
+                self.temperature_array, diffusion_number, self.laplacian_buffer
+            )
+        elif method == "explicit" and self.storage.is_tiled:
+            diffusion.makeTiledExplicitDiffusion(
+                self.temperature_array, diffusion_number, tile_size
+            )
+        elif method == "explicit":
+            diffusion.makeExplicitDiffusion(
+                self.temperature_array, diffusion_number, self.laplacian_buffer
+            )
+        elif method == "adi" and self.storage.is_tiled:
+            diffusion.makeTiledImplicitDiffusionStep(
+                self.temperature_array, diffusion_number, tile_size
+            )
+        elif method == "adi":
+            diffusion.makeImplicitDiffusionStep(
+                self.temperature_array, diffusion_number
+            )
+        elif method == "implicit" and self.storage.is_tiled:
+            diffusion.makeTiledSplitImplicitDiffusionStep(
+                self.temperature_array, diffusion_number, tile_size
+            )
+        elif method == "implicit":
+            diffusion.makeSplitImplicitDiffusionStep(
+                self.temperature_array, diffusion_number
+            )
+        else:
+            raise ValueError(
+                f"Unknown diffusion method {method}, expected one of {self.diffusion_methods}"
+            )
+        # The implicit schemes change every unit
+        if method != "explicit" and self.active_tiles is not None:
+            self.active_tiles.activateAll()
+        self.version += 1
+
+    def makeTemperatureSteady(
+        self,
+        fixed_units: np.ndarray = None,
+        heating_rates: np.ndarray = None,
+        tolerance: float = 10 ** (-8),
+    ) -> int:
+        """Replaces the temperatures by the steady state of the diffusion, reached after
+        an infinite time :
+          without fixed units, the steady state of the torus is computed by the fast
+          Fourier transform. The mean of the temperatures is kept, the mean of the rates
+          being ignored since it raises every unit evenly forever.
+          with fixed units, which keep their temperatures like sources held at a
+          constant value, the steady state is computed by a multigrid solver, which
+          warns with a RuntimeWarning when it stops before reaching the tolerance.
+
+        Args:
+          fixed_units (np.ndarray): boolean array of shape (units_on_width,
+            units_on_length), True for the units keeping their temperatures. None for
+            the steady state of the whole torus
+          heating_rates (np.ndarray): heating rate of every unit, in K/s, None for no source term
+          tolerance (float): largest error on the laplacian accepted by the multigrid
+            solver, in K
+
+        Returns:
+          int: number of iterations of the multigrid solver, 0 for the steady state
+            of the torus
+        """
+        # Steady state of dtemperature/dt = rate * laplacian + source
+        diffusion_rate = phy.computeThermalDiffusionNumber(
+            EnvironmentUnit.volume / EnvironmentUnit.surface, 1
+        )
+        rhs = np.zeros(self.temperature_array.shape)
+        if heating_rates is not None:
+            rhs -= np.asarray(heating_rates) / diffusion_rate
+        iterations_number = 0
+        if fixed_units is None:
+            self.temperature_array[...] = diffusion.solvePeriodicPoisson(
+                rhs, self.temperature_array.mean()
+            )
+        else:
+            field = np.array(self.temperature_array)
+            iterations_number = diffusion.solveFixedValuePoisson(
+                field, np.asarray(fixed_units, dtype=bool), rhs, tolerance
+            )
+            self.temperature_array[...] = field
+        if self.active_tiles is not None:
+            self.active_tiles.activateAll()
+        self.version += 1
+        return iterations_number
 
 
 if __name__ == "__main__":
@@ -136,5 +368,48 @@ if __name__ == "__main__":
     print(temp_grid.getTemperatureUnit(2, 2))  # OK
 
     # Diffusing temperature test
-    temp_grid.makeTemperatureDiffuse()  # NOT OK
+    total_temperature = temp_grid.temperature_array.sum()
+    temp_grid.makeTemperatureDiffuse()  # OK
     print(temp_grid)
+    print(abs(temp_grid.temperature_array.sum() - total_temperature) < 10 ** (-9))
+
+    # Reaching the thermal equilibrium in a few large implicit time steps
+    for i in range(3):
+        temp_grid.makeTemperatureDiffuse(10**4, "implicit")
+    print(temp_grid)  # OK
+    print(temp_grid.temperature_array.std() < 10 ** (-6))  # OK
+
+    # Steady state between a hot and a cold source, which keep their temperatures
+    temp_grid = TemperatureGrid(32, 32)
+    temp_grid.changeMultipleTemperature([4], [4], 350)
+    temp_grid.changeMultipleTemperature([20], [20], 280)
+    fixed_units = np.zeros((32, 32), dtype=bool)
+    fixed_units[[4, 20], [4, 20]] = True
+    temp_grid.makeTemperatureSteady(fixed_units)
+    laplacian = diffusion.computePeriodicLaplacian(temp_grid.temperature_array)
+    print(np.abs(laplacian[~fixed_units]).max() < 10 ** (-7))  # OK
+    print(temp_grid.temperature_array[fixed_units].tolist() == [350, 280])  # OK
+
+    # Odd sides are coarsened too, the solver converging in as few iterations
+    temp_grid = TemperatureGrid(333, 333)
+    temp_grid.changeMultipleTemperature([40], [40], 350)
+    fixed_units = np.zeros((333, 333), dtype=bool)
+    fixed_units[40, 40] = fixed_units[250, 160] = True
+    print(temp_grid.makeTemperatureSteady(fixed_units) <= 20)  # OK
+
+    # Steady state of the torus with a heated and a cooled unit
+    temp_grid = TemperatureGrid(32, 32)
+    heating_rates = np.zeros((32, 32))
+    heating_rates[4, 4], heating_rates[20, 20] = 1, -1
+    temp_grid.makeTemperatureSteady(heating_rates=heating_rates)
+    temperatures = temp_grid.temperature_array
+    print(temperatures[4, 4] > 298.15 > temperatures[20, 20])  # OK
+    print(abs(temperatures.mean() - 298.15) < 10 ** (-9))  # OK
+
+    # A change through a temperature unit reactivates its tile
+    temp_grid = TemperatureGrid(64, 64)
+    temp_grid.trackActiveTiles(tile_size=16)
+    temp_grid.active_tiles.active[...] = False
+    temp_grid.temperature_units_list[30][30].changeTemperature(350)
+    temp_grid.makeTemperatureDiffuse(10 ** (-5))
+    print(298.15 < temp_grid.temperature_array[31, 30] < 350)  # OK
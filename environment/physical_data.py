@@ -12,6 +12,9 @@ KB: float = 1.380649 * 10 ** (-23)  # Boltzmann constant -> J/mol
 GLUCOSE_DIFFUSION_COEFFICIENT: float = 0.651 * 10 ** (-9)
 GLUCOSE_DENSITY: float = 1.54 * 10**3  # kg/m³
 GLUCOSE_MOLAR_MASS: float = 0.180156  # kg/mol
+GLUCOSE_COMBUSTION_ENTHALPY: float = 2.805 * 10**6  # J/mol
+# Energy released by the complete oxidation of glucose
+GLUCOSE_ENERGY_DENSITY: float = GLUCOSE_COMBUSTION_ENTHALPY / GLUCOSE_MOLAR_MASS  # J/kg
 
 # Water constants
 WATER_DENSITY: float = 1.0 * 10**3  # kg/m³
@@ -67,6 +70,92 @@ def computeGlucoseFlux(mass_concentration1: float, mass_concentration2: float) -
     )
 
 
+def computeGlucoseDiffusionNumber(
+    unit_thickness: float, time_step: float = TIME_ITERATION
+) -> float:
+    """Computes the fraction of the glucose concentration difference between two
+    neighbouring units exchanged during one time step, following the flux of
+    computeGlucoseFlux spread over a unit of thickness unit_thickness.
+    Since the flux of computeGlucoseFlux ignores the distance between the units, this
+    number, D * time_step / unit_thickness, is the one of units 1 m apart. The
+    dimensionless number of units of side dx, D * time_step / dx², is 1 / dx times
+    larger, 4 * 10⁶ times for an EnvironmentUnit : the fields of the simulation
+    diffuse that much slower than real glucose, whose explicit diffusion between
+    EnvironmentUnits would only be stable for time steps of about 2.4 * 10⁻⁵ s.
+
+    Args:
+        unit_thickness (float): volume of a unit divided by its exchange surface, in m
+        time_step (float): duration of the time step, in seconds
+
+    Returns:
+        float: the diffusion number of the model, factor of the discrete laplacian
+    """
+    return GLUCOSE_DIFFUSION_COEFFICIENT * time_step / unit_thickness
+
+
+def computeThermalDiffusionNumber(
+    unit_thickness: float, time_step: float = TIME_ITERATION
+) -> float:
+    """Computes the fraction of the temperature difference between two neighbouring
+    units of water exchanged during one time step, following the flux of
+    computeThermalFlux spread over a unit of thickness unit_thickness.
+    Like computeGlucoseDiffusionNumber, this number is the one of units 1 m apart,
+    1 / dx times smaller than the dimensionless number of units of side dx.
+
+    Args:
+        unit_thickness (float): volume of a unit divided by its exchange surface, in m
+        time_step (float): duration of the time step, in seconds
+
+    Returns:
+        float: the diffusion number of the model, factor of the discrete laplacian
+    """
+    return (
+        WATER_THERMAL_CONDUCTIVITY
+        * time_step
+        / (WATER_DENSITY * WATER_HEAT_CAPACITY * unit_thickness)
+    )
+
+
+def computeGlucoseStableTimeStep(
+    unit_thickness: float, stability_limit: float
+) -> float:
+    """Computes the longest time step of the glucose diffusion whose diffusion number
+    stays below the stability limit of a numerical scheme, for the diffusion number
+    of the model of computeGlucoseDiffusionNumber.
+
+    Args:
+        unit_thickness (float): volume of a unit divided by its exchange surface, in m
+        stability_limit (float): largest diffusion number the scheme is stable for
+
+    Returns:
+        float: the time step, in seconds
+    """
+    return stability_limit * unit_thickness / GLUCOSE_DIFFUSION_COEFFICIENT
+
+
+def computeThermalStableTimeStep(
+    unit_thickness: float, stability_limit: float
+) -> float:
+    """Computes the longest time step of the thermal diffusion whose diffusion number
+    stays below the stability limit of a numerical scheme, for the diffusion number
+    of the model of computeThermalDiffusionNumber.
+
+    Args:
+        unit_thickness (float): volume of a unit divided by its exchange surface, in m
+        stability_limit (float): largest diffusion number the scheme is stable for
+
+    Returns:
+        float: the time step, in seconds
+    """
+    return (
+        stability_limit
+        * WATER_DENSITY
+        * WATER_HEAT_CAPACITY
+        * unit_thickness
+        / WATER_THERMAL_CONDUCTIVITY
+    )
+
+
 def convertMetersToPixels(meters: float) -> int:
     """Conversion from a value in meters to a value in pixels, using
     the constant PIXEL_METER_SCALE
@@ -103,3 +192,23 @@ if __name__ == "__main__":
     print(computeGlucoseFlux(5, 5) == 0)  # OK
     print(computeGlucoseFlux(0.001, 0.006) - 5.0127 < 10 ** (-6))  # OK
     print(computeGlucoseFlux(5 * 10 ** (-3), 7 * 10 ** (-3)))
+
+    # Stable time steps tests
+    print(
+        abs(
+            computeGlucoseDiffusionNumber(
+                1e-7, computeGlucoseStableTimeStep(1e-7, 0.25)
+            )
+            - 0.25
+        )
+        < 10 ** (-12)
+    )  # OK
+    print(
+        abs(
+            computeThermalDiffusionNumber(
+                1e-7, computeThermalStableTimeStep(1e-7, 0.25)
+            )
+            - 0.25
+        )
+        < 10 ** (-12)
+    )  # OK
@@ -8,6 +8,7 @@ if __name__ == "__main__":
     sys.path.append(grandparentdir)
 
 import environment.physical_data as phy
+import numpy as np
 
 
 class EnvironmentUnit:
@@ -30,8 +31,18 @@ class EnvironmentUnit:
         length (int): length of the unit on the display windows in pixels
         is_occupied (bool): True if the unit is occupated by an entity of the environment,
             False if nothing lays in it
+        occupation_array (np.ndarray): boolean array storing the is_occupied value, the
+            occupation array of the grid the unit belongs to. None for a unit always
+            unoccupied
+        x_index (int): index of the unit in the arrays along the x axis
+        y_index (int): index of the unit in the arrays along the y axis
+
+    The units are flyweight views without __dict__ : they only store their arrays and
+    their indexes, every value being read from and written to the arrays.
     """
 
+    __slots__ = ("occupation_array", "x_index", "y_index")
+
     calculus_width: int = 0.25 * 10 ** (-6)  # m
     calculus_length: int = 0.25 * 10 ** (-6)  # m
     calculus_height: int = 0.25 * 10 ** (-6)  # m
@@ -42,10 +53,37 @@ class EnvironmentUnit:
     width: int = 5  # pixels
     length: int = 5  # pixels
 
-    is_occupied: bool = False
+    occupation_array: np.ndarray
+    x_index: int
+    y_index: int
+
+    def __init__(
+        self, occupation_array: np.ndarray = None, x_index: int = 0, y_index: int = 0
+    ) -> None:
+        """
+        occupation_array (np.ndarray): occupation array of an EnvironmentGrid. A
+            standalone unit owns an array of one element.
+        x_index (int): index of the unit in the arrays along the x axis
+        y_index (int): index of the unit in the arrays along the y axis
+        """
+        if occupation_array is None:
+            occupation_array = np.zeros((1, 1), dtype=bool)
+        self.occupation_array = occupation_array
+        self.x_index = x_index
+        self.y_index = y_index
+
+    @property
+    def is_occupied(self) -> bool:
+        if self.occupation_array is None:
+            return False
+        return bool(self.occupation_array[self.x_index, self.y_index])
 
-    def __init__(self) -> None:
-        pass
+    @is_occupied.setter
+    def is_occupied(self, new_occupation_state: bool) -> None:
+        # A unit without occupation array stays unoccupied
+        if self.occupation_array is None:
+            return
+        self.occupation_array[self.x_index, self.y_index] = new_occupation_state
 
     def __str__(self) -> str:
         string = f"Unit of volume {self.volume}m³\n"
@@ -62,11 +100,68 @@ class EnvironmentUnit:
         self.is_occupied = new_occupation_state
 
 
+class UnitsView:
+    """Nested sequence of the units of a grid, indexed as units[x][y] like a list of
+    lists. The units are created only when accessed.
+
+    Attributes:
+        get_unit: function returning the unit of indexes (x, y)
+        units_on_width (int): number of units along the x axis
+        units_on_length (int): number of units along the y axis
+    """
+
+    __slots__ = ("get_unit", "units_on_width", "units_on_length", "x_index")
+
+    def __init__(
+        self, get_unit, units_on_width: int, units_on_length: int, x_index: int = None
+    ) -> None:
+        """
+        get_unit: function returning the unit of indexes (x, y)
+        units_on_width (int): number of units along the x axis
+        units_on_length (int): number of units along the y axis
+        x_index (int): index of the column along the x axis, None for the whole grid
+        """
+        self.get_unit = get_unit
+        self.units_on_width = units_on_width
+        self.units_on_length = units_on_length
+        self.x_index = x_index
+
+    def __len__(self) -> int:
+        if self.x_index is None:
+            return self.units_on_width
+        return self.units_on_length
+
+    def __getitem__(self, index: int):
+        if not -len(self) <= index < len(self):
+            raise IndexError("unit index out of range")
+        index %= len(self)
+        if self.x_index is None:
+            return UnitsView(
+                self.get_unit, self.units_on_width, self.units_on_length, index
+            )
+        return self.get_unit(self.x_index, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
 if __name__ == "__main__":
     test_occupation_unit = EnvironmentUnit()
     # Print tests
     print(test_occupation_unit)  # OK
 
+    # Occupation change test
+    test_occupation_unit.changeOccupationState(True)
+    print(test_occupation_unit.is_occupied)  # OK
+
     # Display parameters verification
     print(test_occupation_unit.width == 2.5)
     print(test_occupation_unit.length == 2.5)
+
+    # The units are views without __dict__
+    occupation_array = np.zeros((3, 2), dtype=bool)
+    units = UnitsView(lambda x, y: EnvironmentUnit(occupation_array, x, y), 3, 2)
+    units[2][1].changeOccupationState(True)
+    print(occupation_array[2, 1] and not hasattr(units[0][0], "__dict__"))  # OK
+    print(sum(unit.is_occupied for column in units for unit in column) == 1)  # OK
@@ -7,33 +7,113 @@ if __name__ == "__main__":
     grandparentdir = os.path.dirname(parentdir)
     sys.path.append(grandparentdir)
 
-from environment.unit.EnvironmentUnit import EnvironmentUnit
+from environment.unit.EnvironmentUnit import EnvironmentUnit, UnitsView, np
+from tools.colormap import Colormap, vectorized_erf
 import math
 
 
+def computeGlucoseColor(glucose_concentration):
+    """Computes the display color of one or several glucose concentrations.
+    When the concentration is equal to zéro, the color is mainly red. When the
+    concetration is hight, the color becames green.
+
+    Args:
+      glucose_concentration (float or np.ndarray): glucose concentrations, in kg/m³
+
+    Returns:
+      np.ndarray: RGB colors, the last axis of size 3 being the color channels
+    """
+    glucose_concentration = np.asarray(glucose_concentration, dtype=float)
+    return np.stack(
+        (
+            -255 / 2 * vectorized_erf(glucose_concentration * 2000 - 3) + 255 / 2,
+            255 / 2 * vectorized_erf(glucose_concentration * 1000 - 5) + 255 / 2,
+            np.full(glucose_concentration.shape, 45.0),
+        ),
+        axis=-1,
+    )
+
+
+# Colors of the concentrations from 0 to 10 g/L, both color channels being saturated
+# above it
+glucose_colormap = Colormap(computeGlucoseColor, 0, 10 ** (-2))
+
+
 class GlucoseUnit(EnvironmentUnit):
     """An environmental unit used to store and modify the glucose concentration of the
     environment.
 
+    The unit is a flyweight view of one element of the arrays of a GlucoseGrid.
+
     Attributes :
         glucose_concentration (float): glucose concetration of the unit, in kg/m³
         color (tuple): tuple in RGB format, used to display a glucose map of the environment
+        glucose_array (np.ndarray): array storing the glucose concentrations
+        color_array (np.ndarray): array storing the RGB colors, the last axis of size 3
+            being the color channels
+        grid (GlucoseGrid): grid the unit is a view of, signaled of the changes of
+            the unit so that it diffuses them again and redraws its map. None for a
+            standalone unit
 
     Functions :
         changeGlucoseConcentration
         adaptGlucoseColor
     """
 
-    glucose_concentration: float
-    color: tuple
-
-    def __init__(self, initial_concentration: float) -> None:
+    __slots__ = ("glucose_array", "color_array", "grid")
+
+    glucose_array: np.ndarray
+    color_array: np.ndarray
+    grid: object
+
+    def __init__(
+        self,
+        initial_concentration: float = 0,
+        glucose_array: np.ndarray = None,
+        color_array: np.ndarray = None,
+        x_index: int = 0,
+        y_index: int = 0,
+        grid=None,
+        occupation_array: np.ndarray = None,
+    ) -> None:
         """
-        initial_concentration (float): initial glucose concentration, in kg/m³
+        initial_concentration (float): initial glucose concentration, in kg/m³.
+            Only used by a standalone unit, owning arrays of one element.
+        glucose_array (np.ndarray): glucose array of a GlucoseGrid
+        color_array (np.ndarray): color array of the GlucoseGrid
+        x_index (int): index of the unit in the arrays along the x axis
+        y_index (int): index of the unit in the arrays along the y axis
+        grid (GlucoseGrid): grid owning the arrays, signaled of the changes of the
+            unit
+        occupation_array (np.ndarray): occupation array of the grid, None for a
+            unit always unoccupied
         """
-        super().__init__()
-        self.glucose_concentration = initial_concentration
-        self.adaptGlucoseColor()
+        self.grid = grid
+        if glucose_array is None:
+            super().__init__()
+            self.glucose_array = np.full((1, 1), initial_concentration, dtype=float)
+            self.color_array = np.zeros((1, 1, 3))
+            self.adaptGlucoseColor()
+        else:
+            self.occupation_array = occupation_array
+            self.x_index = x_index
+            self.y_index = y_index
+            self.glucose_array = glucose_array
+            self.color_array = color_array
+
+    @property
+    def glucose_concentration(self) -> float:
+        return float(self.glucose_array[self.x_index, self.y_index])
+
+    @glucose_concentration.setter
+    def glucose_concentration(self, new_glucose_concentration: float) -> None:
+        self.glucose_array[self.x_index, self.y_index] = new_glucose_concentration
+        if self.grid is not None:
+            self.grid.signalUnitsChange([self.x_index], [self.y_index])
+
+    @property
+    def color(self) -> tuple:
+        return tuple(self.color_array[self.x_index, self.y_index].tolist())
 
     def __str__(self) -> str:
         string = (
@@ -72,11 +152,10 @@ class GlucoseUnit(EnvironmentUnit):
         """Modifies the unit's color following a linear relationship with it's glucose
         concentration. When the concentration is equal to zéro, the color of the unit is
         mainly red. When the concetration is hight, the color becames green.
+        The color is looked up in glucose_colormap.
         """
-        self.color = (
-            -255 / 2 * math.erf(self.glucose_concentration * 2000 - 3) + 255 / 2,
-            255 / 2 * math.erf(self.glucose_concentration * 1000 - 5) + 255 / 2,
-            45,
+        self.color_array[self.x_index, self.y_index] = glucose_colormap.apply(
+            self.glucose_concentration
         )
 
 
@@ -7,33 +7,114 @@ if __name__ == "__main__":
     grandparentdir = os.path.dirname(parentdir)
     sys.path.append(grandparentdir)
 
-from environment.unit.EnvironmentUnit import EnvironmentUnit, phy
+from environment.unit.EnvironmentUnit import EnvironmentUnit, UnitsView, np, phy
+from tools.colormap import Colormap, vectorized_erf
 import math
 
 
+def computeTemperatureColor(temperature):
+    """Computes the display color of one or several temperatures.
+    The color should be blue when the temperature is low, green when it is optimal
+    and red when it's too high.
+
+    Args:
+      temperature (float or np.ndarray): temperatures, in Kelvin
+
+    Returns:
+      np.ndarray: RGB colors, the last axis of size 3 being the color channels
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    return np.stack(
+        (
+            255 / 2 * vectorized_erf((temperature - 350) / 50) + 255 / 2,
+            255 * np.exp(-1 / 1000 * (temperature - 320) ** 2),
+            255 * np.exp(-temperature / 300),
+        ),
+        axis=-1,
+    )
+
+
+# Colors of the temperatures from 0 to 2500 K, higher temperatures taking the color
+# of 2500 K, pure red like every temperature above about 1500 K. The entries are
+# 0.15 K apart, finer than the color gradients
+temperature_colormap = Colormap(computeTemperatureColor, 0, 2500, 16384)
+
+
 class TemperatureUnit(EnvironmentUnit):
     """An environmental unit used to store and modify the temperature of the environment.
 
+    The unit is a flyweight view of one element of the arrays of a TemperatureGrid.
+
     Attributes :
         temperature (float): temperature of the unit, in Kelvin
         color (tuple): tuple in RGB format, used to display a temperature map of the
         environment
+        temperature_array (np.ndarray): array storing the temperatures
+        color_array (np.ndarray): array storing the RGB colors, the last axis of size 3
+            being the color channels
+        grid (TemperatureGrid): grid the unit is a view of, signaled of the changes of
+            the unit so that it diffuses them again and redraws its map. None for a
+            standalone unit
 
     Functions :
         changeTemperature
         adaptTemperatureColor
     """
 
-    temperature: float
-    color: tuple
-
-    def __init__(self, initial_temperature: float) -> None:
+    __slots__ = ("temperature_array", "color_array", "grid")
+
+    temperature_array: np.ndarray
+    color_array: np.ndarray
+    grid: object
+
+    def __init__(
+        self,
+        initial_temperature: float = 298.15,
+        temperature_array: np.ndarray = None,
+        color_array: np.ndarray = None,
+        x_index: int = 0,
+        y_index: int = 0,
+        grid=None,
+        occupation_array: np.ndarray = None,
+    ) -> None:
         """
-        initial_temperature (float): initial temperature of the unit, in Kelvin
+        initial_temperature (float): initial temperature of the unit, in Kelvin.
+            Only used by a standalone unit, owning arrays of one element.
+        temperature_array (np.ndarray): temperature array of a TemperatureGrid
+        color_array (np.ndarray): color array of the TemperatureGrid
+        x_index (int): index of the unit in the arrays along the x axis
+        y_index (int): index of the unit in the arrays along the y axis
+        grid (TemperatureGrid): grid owning the arrays, signaled of the changes of the
+            unit
+        occupation_array (np.ndarray): occupation array of the grid, None for a
+            unit always unoccupied
         """
-        super().__init__()
-        self.temperature = initial_temperature
-        self.adaptTemperatureColor()
+        self.grid = grid
+        if temperature_array is None:
+            super().__init__()
+            self.temperature_array = np.full((1, 1), initial_temperature, dtype=float)
+            self.color_array = np.zeros((1, 1, 3))
+            self.adaptTemperatureColor()
+        else:
+            self.occupation_array = occupation_array
+            self.x_index = x_index
+            self.y_index = y_index
+            self.temperature_array = temperature_array
+            self.color_array = color_array
+
+    @property
+    def temperature(self) -> float:
+        return float(self.temperature_array[self.x_index, self.y_index])
+
+    @temperature.setter
+    def temperature(self, new_temperature: float) -> None:
+        self.temperature_array[self.x_index, self.y_index] = new_temperature
+        if self.grid is not None:
+            self.grid.signalUnitsChange([self.x_index], [self.y_index])
+
+    @property
+    def color(self) -> tuple:
+        return tuple(self.color_array[self.x_index, self.y_index].tolist())
 
     def __str__(self) -> str:
         string = (
@@ -76,11 +157,10 @@ class TemperatureUnit(EnvironmentUnit):
         """Modifies the unit's temperature color according to its temperature.
         The color should be blue when the temperature is low, green when it is optimal
         and red when it's too high.
+        The color is looked up in temperature_colormap.
         """
-        self.color = (
-            255 / 2 * math.erf((self.temperature - 350) / 50) + 255 / 2,
-            255 * math.exp(-1 / 1000 * (self.temperature - 320) ** 2),
-            255 * math.exp(-self.temperature / 300),
+        self.color_array[self.x_index, self.y_index] = temperature_colormap.apply(
+            self.temperature
         )
 
 
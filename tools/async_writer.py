@@ -0,0 +1,189 @@
+import queue
+import threading
+
+# Behaviours of AsyncWriter.submit when the queue is full
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "sample")
+
+
+class AsyncWriter:
+    """Background thread executing the writing tasks (log flushes, snapshots...) of a
+    simulation, so that disk accesses don't stall the game loop.
+    The tasks go through a bounded queue. When it is full, submit follows a
+    backpressure policy :
+      "block" : waits for a free place, no task is ever lost
+      "drop_oldest" : drops the oldest task of the queue to make room for the new one
+      "sample" : keeps one submitted task out of sampling_interval, which waits for a
+        free place, the others are dropped
+
+    Attributes:
+      policy (str): backpressure policy, one of BACKPRESSURE_POLICIES
+      sampling_interval (int): one task out of sampling_interval is kept by the
+        "sample" policy while the queue is full
+      task_queue (queue.Queue): bounded queue of the tasks not executed yet
+      thread (threading.Thread): the writer thread
+      submitted_tasks_number (int): number of tasks given to submit
+      written_tasks_number (int): number of tasks executed by the thread
+      dropped_tasks_number (int): number of tasks dropped by the policy
+      max_queue_depth (int): largest number of tasks waiting in the queue
+      full_queue_submissions_number (int): number of tasks submitted since the queue
+        is full, counted by the "sample" policy
+      error (Exception): first exception raised by a task, raised again by close
+    """
+
+    policy: str
+    sampling_interval: int
+    task_queue: queue.Queue
+    thread: threading.Thread
+    submitted_tasks_number: int
+    written_tasks_number: int
+    dropped_tasks_number: int
+    max_queue_depth: int
+    full_queue_submissions_number: int
+    error: Exception
+
+    def __init__(
+        self,
+        max_queue_size: int = 64,
+        policy: str = "block",
+        sampling_interval: int = 10,
+    ) -> None:
+        """Starts the writer thread
+
+        Args:
+          max_queue_size (int): number of tasks the queue can store
+          policy (str): backpressure policy, one of BACKPRESSURE_POLICIES
+          sampling_interval (int): one task out of sampling_interval is kept by the
+            "sample" policy while the queue is full
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown policy {policy}, expected one of {BACKPRESSURE_POLICIES}"
+            )
+        self.policy = policy
+        self.sampling_interval = sampling_interval
+        self.task_queue = queue.Queue(max_queue_size)
+        self.submitted_tasks_number = 0
+        self.written_tasks_number = 0
+        self.dropped_tasks_number = 0
+        self.max_queue_depth = 0
+        self.error = None
+        self.full_queue_submissions_number = 0
+
+        self.thread = threading.Thread(target=self.executeTasks, daemon=True)
+        self.thread.start()
+
+    def __str__(self) -> str:
+        string = f"Asynchronous writer ({self.policy})\n"
+        string += f"Queue depth : {self.queue_depth} (max {self.max_queue_depth})\n"
+        string += f"Tasks written : {self.written_tasks_number}, "
+        string += f"dropped : {self.dropped_tasks_number}\n"
+        return string
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting in the queue"""
+        return self.task_queue.qsize()
+
+    def submit(self, function, *args) -> bool:
+        """Queues the call of function(*args) in the writer thread.
+        The arguments must not be modified afterwards by the caller, arrays being
+        copied beforehand if needed.
+
+        Args:
+          function: function writing something
+          args: arguments of the function
+
+        Returns:
+          bool: False if the task has been dropped by the backpressure policy
+        """
+        self.submitted_tasks_number += 1
+        task = (function, args)
+        if self.policy == "block" or not self.task_queue.full():
+            self.full_queue_submissions_number = 0
+            self.task_queue.put(task)
+        elif self.policy == "drop_oldest":
+            try:
+                self.task_queue.get_nowait()
+                self.task_queue.task_done()
+                self.dropped_tasks_number += 1
+            except queue.Empty:
+                pass
+            self.task_queue.put(task)
+        else:
+            self.full_queue_submissions_number += 1
+            if self.full_queue_submissions_number % self.sampling_interval != 0:
+                self.dropped_tasks_number += 1
+                return False
+            self.task_queue.put(task)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        return True
+
+    def executeTasks(self) -> None:
+        """Loop of the writer thread, executing the queued tasks until it gets None"""
+        while True:
+            task = self.task_queue.get()
+            if task is None:
+                self.task_queue.task_done()
+                break
+            function, args = task
+            try:
+                function(*args)
+            except Exception as exception:
+                if self.error is None:
+                    self.error = exception
+            self.written_tasks_number += 1
+            self.task_queue.task_done()
+
+    def waitForTasks(self) -> None:
+        """Waits until every queued task has been executed"""
+        self.task_queue.join()
+
+    def close(self) -> None:
+        """Executes the remaining tasks and stops the writer thread.
+
+        Raises:
+          Exception: the first exception raised by a task, if any
+        """
+        self.task_queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+if __name__ == "__main__":
+    import time
+
+    written = []
+    writer = AsyncWriter(max_queue_size=4)
+    for i in range(20):
+        writer.submit(written.append, i)
+    writer.close()
+    print(written == list(range(20)))  # OK
+    print(writer.dropped_tasks_number == 0)  # OK
+
+    # Slow disk : with drop_oldest the newest tasks are kept
+    written = []
+    writer = AsyncWriter(max_queue_size=4, policy="drop_oldest")
+    writer.submit(time.sleep, 0.2)
+    for i in range(20):
+        writer.submit(written.append, i)
+    writer.close()
+    print(written[-4:] == [16, 17, 18, 19])  # OK
+    print(
+        writer.written_tasks_number + writer.dropped_tasks_number
+        == writer.submitted_tasks_number
+    )  # OK
+    print(writer.max_queue_depth == 4)  # OK
+
+    # With sample, one task out of 5 is kept once the queue is full
+    written = []
+    writer = AsyncWriter(max_queue_size=2, policy="sample", sampling_interval=5)
+    writer.submit(time.sleep, 0.1)
+    for i in range(12):
+        writer.submit(written.append, i)
+    writer.close()
+    print(
+        writer.written_tasks_number + writer.dropped_tasks_number
+        == writer.submitted_tasks_number
+    )  # OK
+    print(writer)
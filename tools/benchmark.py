@@ -0,0 +1,405 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import numpy as np
+from Cell import Cell
+from Chemotaxis import Chemotaxis
+from Metabolism import Metabolism
+from Simulation import Simulation
+from World import World
+from tools.direction import Direction
+
+# Distance in pixels between two cells placed by makeBenchmarkWorld, leaving room
+# for the movements and the replications
+CELL_SPACING = 2 * Cell.width
+
+
+def makeBenchmarkWorld(world_side: int, cells_number: int, seed: int = 0) -> World:
+    """Returns a world whose cells are placed on a regular lattice, row after row.
+    The number of cells is limited by the number of places of the lattice.
+
+    Args:
+      world_side (int): number of pixels of the side of the world
+      cells_number (int): number of cells to add
+      seed (int): seed of the world
+    """
+    the_world = World(world_side, initial_glucose=0.005, seed=seed)
+    places_on_side = max(1, world_side // CELL_SPACING)
+    for place in range(min(cells_number, places_on_side**2)):
+        the_world.cell_population.addCell(
+            the_world.environment_grid,
+            place % places_on_side * CELL_SPACING,
+            place // places_on_side * CELL_SPACING,
+        )
+    return the_world
+
+
+def setupIsSpace(the_world: World):
+    """Checks the space around every cell in a random direction"""
+    environment = the_world.environment_grid
+    population = the_world.cell_population
+    direction_indices = population.random_generator.drawDirectionIndices(
+        len(population)
+    )
+
+    def checkSpaces() -> None:
+        for index, direction_index in enumerate(direction_indices.tolist()):
+            direction = Direction.DIRECTIONS[direction_index]
+            environment.isSpace(
+                (population.x[index], population.y[index]),
+                (population.ending_x[index], population.ending_y[index]),
+                (
+                    population.speed[index] * direction[0],
+                    population.speed[index] * direction[1],
+                ),
+            )
+
+    return checkSpaces
+
+
+def setupOccupationStates(the_world: World):
+    """Frees then occupies again the units of every cell"""
+    environment = the_world.environment_grid
+    population = the_world.cell_population
+
+    def changeOccupationStates() -> None:
+        for index in range(len(population)):
+            for occupation_state in (False, True):
+                environment.changeMultipleOccupationStates(
+                    (population.x[index], population.y[index]),
+                    (population.ending_x[index], population.ending_y[index]),
+                    occupation_state,
+                )
+
+    return changeOccupationStates
+
+
+def setupMoving(the_world: World):
+    """Moves every cell through its Cell view"""
+    cells = the_world.cells_list
+
+    def moveCells() -> None:
+        for cell in cells:
+            cell.moving(the_world.environment_grid)
+
+    return moveCells
+
+
+def setupReplicating(the_world: World):
+    """Makes every cell attempt a replication through its Cell view"""
+    population = the_world.cell_population
+    population.replication_rate[: len(population)] = 1
+    cells = the_world.cells_list
+
+    def replicateCells() -> None:
+        for cell in cells:
+            cell.replicating(the_world.environment_grid)
+
+    return replicateCells
+
+
+def setupGlucoseDiffusion(the_world: World):
+    """Diffuses the glucose for one iteration"""
+    return the_world.glucose_grid.makeGlucoseDiffuse
+
+
+def setupTemperatureDiffusion(the_world: World):
+    """Diffuses the heat for one iteration"""
+    return the_world.temperature_grid.makeTemperatureDiffuse
+
+
+def setupMapColors(the_world: World):
+    """Computes the colors of the glucose and temperature maps"""
+
+    def computeMapColors() -> None:
+        the_world.glucose_grid.computeAllGlucoseColor()
+        the_world.temperature_grid.computeAllTemperatureColors()
+
+    return computeMapColors
+
+
+def setupMetabolism(the_world: World):
+    """Makes every cell take up the glucose under it"""
+    metabolism = Metabolism()
+
+    def takeUpGlucose() -> None:
+        metabolism.takeUpGlucose(the_world.cell_population, the_world.glucose_grid)
+
+    return takeUpGlucose
+
+
+def setupChemotaxis(the_world: World):
+    """Computes the preferences of the directions, then draws the direction of every
+    cell
+    """
+    chemotaxis = Chemotaxis()
+
+    def drawDirections() -> None:
+        chemotaxis.drawDirectionIndices(
+            the_world.cell_population, the_world.glucose_grid
+        )
+
+    return drawDirections
+
+
+def setupStep(the_world: World):
+    """Computes one iteration of a headless simulation"""
+    return Simulation(the_world).step
+
+
+# Function preparing each benchmark on a new world and returning the timed function
+BENCHMARKS = {
+    "is_space": setupIsSpace,
+    "occupation_states": setupOccupationStates,
+    "cell_moving": setupMoving,
+    "cell_replicating": setupReplicating,
+    "glucose_diffusion": setupGlucoseDiffusion,
+    "temperature_diffusion": setupTemperatureDiffusion,
+    "map_colors": setupMapColors,
+    "metabolism": setupMetabolism,
+    "chemotaxis": setupChemotaxis,
+    "headless_step": setupStep,
+}
+
+
+def timeCalls(
+    name: str, world_side: int, cells_number: int, loops_number: int, seed: int
+) -> tuple:
+    """Times several calls of a benchmark of BENCHMARKS, each call being done on a
+    new world so that the benchmarks changing the world are always timed from the
+    same state. Only the calls are timed, not the creation of the worlds.
+
+    Args:
+      name (str): name of the benchmark
+      world_side (int): number of pixels of the side of the worlds
+      cells_number (int): number of cells asked to makeBenchmarkWorld
+      loops_number (int): number of calls
+      seed (int): seed of the worlds
+
+    Returns:
+      tuple: (duration, actual_cells_number), the mean duration of a call in
+        seconds and the number of cells of the worlds before the calls
+    """
+    duration = 0
+    for loop in range(loops_number):
+        the_world = makeBenchmarkWorld(world_side, cells_number, seed)
+        actual_cells_number = len(the_world.cell_population)
+        function = BENCHMARKS[name](the_world)
+        start = time.perf_counter()
+        function()
+        duration += time.perf_counter() - start
+    return duration / loops_number, actual_cells_number
+
+
+def findLoopsNumber(
+    name: str,
+    world_side: int,
+    cells_number: int,
+    min_duration: float = 0.01,
+    max_loops_number: int = 50,
+) -> int:
+    """Returns the number of calls of a benchmark to time together, autoranged as by
+    timeit : the smallest number of the sequence 1, 2, 5, 10, 20, 50... whose calls
+    last at least min_duration, so that the short benchmarks are not dominated by
+    the resolution and the noise of the timer.
+
+    Args:
+      name (str): name of the benchmark
+      world_side (int): number of pixels of the side of the worlds
+      cells_number (int): number of cells asked to makeBenchmarkWorld
+      min_duration (float): duration of the timed calls to reach, in seconds
+      max_loops_number (int): largest number of calls, a new world being created
+        for each of them
+    """
+    factor = 1
+    while True:
+        for loops_number in (factor, 2 * factor, 5 * factor):
+            if loops_number >= max_loops_number:
+                return max_loops_number
+            duration = timeCalls(name, world_side, cells_number, loops_number, 0)[0]
+            if duration * loops_number >= min_duration:
+                return loops_number
+        factor *= 10
+
+
+def timeBenchmark(
+    name: str, world_side: int, cells_number: int, repeats: int = 5
+) -> dict:
+    """Times a benchmark of BENCHMARKS. Each repetition times the number of calls
+    given by findLoopsNumber, every call being done on a new world.
+
+    Args:
+      name (str): name of the benchmark
+      world_side (int): number of pixels of the side of the world
+      cells_number (int): number of cells asked to makeBenchmarkWorld
+      repeats (int): number of timed repetitions
+
+    Returns:
+      dict: the parameters, the actual number of cells before the calls, the number
+        of calls of each repetition, and the median and minimal durations of a call
+        in seconds
+    """
+    loops_number = findLoopsNumber(name, world_side, cells_number)
+    durations = []
+    for repeat in range(repeats):
+        duration, actual_cells_number = timeCalls(
+            name, world_side, cells_number, loops_number, repeat
+        )
+        durations.append(duration)
+    return {
+        "benchmark": name,
+        "world_side": world_side,
+        "cells_number": cells_number,
+        "actual_cells_number": actual_cells_number,
+        "repeats": repeats,
+        "loops_number": loops_number,
+        "median_time": statistics.median(durations),
+        "min_time": min(durations),
+    }
+
+
+def runBenchmarks(
+    world_sides: list = (500, 2000),
+    cells_numbers: list = (100, 1000),
+    names: list = None,
+    repeats: int = 5,
+) -> list[dict]:
+    """Times benchmarks for every combination of world side and number of cells
+
+    Args:
+      world_sides (list): numbers of pixels of the side of the worlds
+      cells_numbers (list): numbers of cells of the worlds
+      names (list): names of the benchmarks of BENCHMARKS, all of them if None
+      repeats (int): number of timed repetitions of each benchmark
+
+    Returns:
+      list: results of timeBenchmark
+    """
+    names = list(BENCHMARKS) if names is None else names
+    return [
+        timeBenchmark(name, world_side, cells_number, repeats)
+        for name in names
+        for world_side in world_sides
+        for cells_number in cells_numbers
+    ]
+
+
+def getCommit() -> str:
+    """Returns the hash of the current git commit, None outside of a repository"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def saveResults(results: list[dict], path: str) -> None:
+    """Saves benchmark results in a JSON file, along with the commit and the machine
+    they were measured on.
+
+    Args:
+      results (list): results of runBenchmarks
+      path (str): path of the JSON file
+    """
+    document = {
+        "commit": getCommit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "results": results,
+    }
+    with open(path, "w") as results_file:
+        json.dump(document, results_file, indent=2)
+
+
+def loadResults(path: str) -> list[dict]:
+    """Returns the results saved in a JSON file by saveResults"""
+    with open(path) as results_file:
+        return json.load(results_file)["results"]
+
+
+def compareResults(
+    baseline: list[dict], results: list[dict], tolerance: float = 0.1
+) -> str:
+    """Returns a table comparing the median durations of two sets of results.
+    Only the benchmarks present in both sets are compared.
+
+    Args:
+      baseline (list): reference results, from loadResults
+      results (list): new results
+      tolerance (float): relative change of duration below which a benchmark is
+        considered unchanged
+
+    Returns:
+      str: one line per benchmark with both durations in milliseconds, their ratio
+        and "slower" or "faster" when the ratio exceeds the tolerance
+    """
+    baseline_times = {
+        (result["benchmark"], result["world_side"], result["cells_number"]): result[
+            "median_time"
+        ]
+        for result in baseline
+    }
+    string = f"{'benchmark':<22}{'side':>6}{'cells':>7}{'before':>11}{'after':>11}{'ratio':>8}\n"
+    for result in results:
+        key = (result["benchmark"], result["world_side"], result["cells_number"])
+        if key not in baseline_times:
+            continue
+        ratio = result["median_time"] / baseline_times[key]
+        if ratio > 1 + tolerance:
+            verdict = "  slower"
+        elif ratio < 1 - tolerance:
+            verdict = "  faster"
+        else:
+            verdict = ""
+        string += f"{key[0]:<22}{key[1]:>6}{key[2]:>7}"
+        string += f"{1000 * baseline_times[key]:>9.3f}ms{1000 * result['median_time']:>9.3f}ms"
+        string += f"{ratio:>8.2f}{verdict}\n"
+    return string
+
+
+if __name__ == "__main__":
+    # python -m tools.benchmark [results.json [baseline.json]]
+    import tempfile
+
+    results = runBenchmarks(world_sides=[200], cells_numbers=[10, 25], repeats=3)
+    print(len(results) == 2 * len(BENCHMARKS))  # OK
+    print(all(result["median_time"] > 0 for result in results))  # OK
+    print([result["actual_cells_number"] for result in results[:2]] == [10, 25])  # OK
+    # The cells are counted before the replications of the benchmark
+    replicating_results = [
+        result for result in results if result["benchmark"] == "cell_replicating"
+    ]
+    print([result["actual_cells_number"] for result in replicating_results] == [10, 25])
+    # OK
+    print(all(result["loops_number"] >= 1 for result in results))  # OK
+
+    path = (
+        sys.argv[1]
+        if len(sys.argv) > 1
+        else os.path.join(tempfile.mkdtemp(), "benchmark.json")
+    )
+    saveResults(results, path)
+    print(loadResults(path) == results)  # OK
+
+    baseline = loadResults(sys.argv[2]) if len(sys.argv) > 2 else results
+    print(compareResults(baseline, results))
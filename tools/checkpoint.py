@@ -0,0 +1,404 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+import json
+import struct
+import numpy as np
+from CellPopulation import CellPopulation
+from environment.field_storage import FieldStorage
+from tools.async_writer import AsyncWriter
+from tools.timing_wheel import TimingWheel
+
+# Beginning of every checkpoint file, followed by the format version
+MAGIC = b"ECOSYSCK"
+FORMAT_VERSION = 1
+# Every array starts at an offset multiple of ARRAY_ALIGNMENT bytes
+ARRAY_ALIGNMENT = 64
+# Magic, version and length of the JSON header
+PREAMBLE_FORMAT = "<8sII"
+
+
+def alignOffset(offset: int) -> int:
+    """Returns the first offset multiple of ARRAY_ALIGNMENT after offset"""
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+
+class CheckpointStorage(FieldStorage):
+    """Backend of the fields of a restored world, returning the arrays read from a
+    checkpoint instead of creating new ones : the grids are built around the mapped
+    arrays without allocating, filling or coloring anything. The arrays missing from
+    the checkpoint are created in memory.
+
+    Attributes:
+      arrays (dict): arrays of the checkpoint, by name
+    """
+
+    arrays: dict
+
+    def __init__(self, arrays: dict, tile_size: int = None) -> None:
+        """
+        Args:
+          arrays (dict): arrays of the checkpoint, by name
+          tile_size (int): number of lines of units of the strips the fields are
+            processed by, None to process every field at once
+        """
+        super().__init__(tile_size=tile_size)
+        self.arrays = arrays
+
+    def containsArray(self, name: str) -> bool:
+        return name in self.arrays
+
+    def createArray(self, name: str, shape: tuple, dtype, fill_value=0) -> np.ndarray:
+        """Returns the array name of the checkpoint, or creates it if the checkpoint
+        doesn't contain it
+
+        Args:
+          name (str): name of the array
+          shape (tuple): shape of the array, the first axis being the x axis
+          dtype: type of the elements
+          fill_value: initial value of the elements of a created array
+
+        Returns:
+          np.ndarray: the array
+
+        Raises:
+          ValueError: if the array of the checkpoint doesn't have the expected shape
+        """
+        if not self.containsArray(name):
+            return super().createArray(name, shape, dtype, fill_value)
+        array = self.arrays[name]
+        if array.shape != tuple(shape):
+            raise ValueError(
+                f"The array {name} of the checkpoint has the shape {array.shape}, "
+                + f"expected {tuple(shape)}"
+            )
+        return array.astype(dtype, copy=False)
+
+
+def getCheckpointArrays(world) -> dict:
+    """Returns the arrays describing the state of a world, by name. The arrays of
+    the fields are named as in their FieldStorage
+
+    Args:
+      world (World): the world to save
+    """
+    population = world.cell_population
+    arrays = {
+        "occupation": world.environment_grid.occupation_array,
+        "temperature": world.temperature_grid.temperature_array,
+        "temperature_color": world.temperature_grid.color_array,
+        "temperature_occupation": world.temperature_grid.occupation_array,
+        "glucose": world.glucose_grid.glucose_array,
+        "glucose_color": world.glucose_grid.color_array,
+        "glucose_occupation": world.glucose_grid.occupation_array,
+        "slot_index": population.slot_index,
+        "slot_generation": population.slot_generation,
+        "color": population.color,
+        "slot": population.slot,
+    }
+    for name in population.cell_attributes:
+        arrays[f"cell_{name}"] = getattr(population, name)
+
+    # The events of the wheel as rows (step, kind, slot, generation)
+    arrays["events"] = np.array(
+        [
+            (step, kind, slot, generation)
+            for step, (kind, slot, generation) in (
+                population.event_wheel.getPendingEvents()
+            )
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    return arrays
+
+
+def saveCheckpoint(world, path: str, writer: AsyncWriter = None) -> bool:
+    """Saves the complete state of a world in a binary file : a preamble (MAGIC,
+    FORMAT_VERSION and the header length), a JSON header describing the scalars of
+    the world and the position, type and shape of every array, then the raw arrays
+    aligned on ARRAY_ALIGNMENT bytes.
+    With a writer, the state is copied and the file is written by the writer thread,
+    so that the simulation goes on during the write. The snapshot may then be
+    dropped by the backpressure policy of the writer.
+
+    Args:
+      world (World): the world to save
+      path (str): path of the checkpoint file
+      writer (AsyncWriter): thread writing the file, None to write it in the
+        caller's thread
+
+    Returns:
+      bool: False if the snapshot has been dropped by the writer
+    """
+    population = world.cell_population
+    # The writer thread gets copies, the world changing while the file is written
+    arrays = {
+        name: np.ascontiguousarray(array) if writer is None else np.array(array)
+        for name, array in getCheckpointArrays(world).items()
+    }
+    header = {
+        "pixel_side": world.pixel_dimensions[0],
+        "bg_color": list(world.bg_color),
+        "tile_size": world.glucose_grid.storage.tile_size,
+        "glucose_version": world.glucose_grid.version,
+        "temperature_version": world.temperature_grid.version,
+        "seed": world.random_generator.seed,
+        "random_state": world.random_generator.getState(),
+        "size": population.size,
+        "capacity": population.capacity,
+        "used_slots_number": population.used_slots_number,
+        "free_slots": population.free_slots,
+        "default_max_age": int(population.default_max_age),
+        "default_replication_rate": float(population.default_replication_rate),
+        "default_speed": float(population.default_speed),
+        "clock": population.clock,
+        "wheel_size": population.event_wheel.wheel_size,
+        "arrays": {},
+    }
+
+    # The offsets depend on the header length, which depends on the offsets : the
+    # arrays are placed after a header whose length is rounded up generously
+    descriptions = {
+        name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 0}
+        for name, array in arrays.items()
+    }
+    header["arrays"] = descriptions
+    header_length = alignOffset(len(json.dumps(header)) + 32 * len(arrays) + 256)
+    offset = alignOffset(struct.calcsize(PREAMBLE_FORMAT) + header_length)
+    for name, array in arrays.items():
+        descriptions[name]["offset"] = offset
+        offset = alignOffset(offset + array.nbytes)
+
+    # Encoded right away, the lists of the header belonging to the world
+    encoded_header = json.dumps(header).encode("utf-8").ljust(header_length)
+    if writer is None:
+        writeCheckpoint(path, encoded_header, arrays, descriptions, offset)
+        return True
+    return writer.submit(
+        writeCheckpoint, path, encoded_header, arrays, descriptions, offset
+    )
+
+
+def writeCheckpoint(
+    path: str, encoded_header: bytes, arrays: dict, descriptions: dict, end: int
+) -> None:
+    """Writes a checkpoint file prepared by saveCheckpoint
+
+    Args:
+      path (str): path of the checkpoint file
+      encoded_header (bytes): JSON header, padded to its length
+      arrays (dict): arrays to write, by name
+      descriptions (dict): descriptions of the arrays in the header, by name
+      end (int): size of the file
+    """
+    with open(path, "wb") as checkpoint_file:
+        checkpoint_file.write(
+            struct.pack(PREAMBLE_FORMAT, MAGIC, FORMAT_VERSION, len(encoded_header))
+        )
+        checkpoint_file.write(encoded_header)
+        for name, array in arrays.items():
+            checkpoint_file.seek(descriptions[name]["offset"])
+            array.tofile(checkpoint_file)
+        checkpoint_file.truncate(end)
+
+
+def readHeader(path: str) -> dict:
+    """Reads the header of a checkpoint file
+
+    Args:
+      path (str): path of the checkpoint file
+
+    Returns:
+      dict: the JSON header
+
+    Raises:
+      ValueError: if the file isn't a checkpoint or its version is not supported
+    """
+    with open(path, "rb") as checkpoint_file:
+        preamble = checkpoint_file.read(struct.calcsize(PREAMBLE_FORMAT))
+        magic, version, header_length = struct.unpack(PREAMBLE_FORMAT, preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Checkpoint version {version} is not supported, "
+                + f"expected {FORMAT_VERSION}"
+            )
+        return json.loads(checkpoint_file.read(header_length).decode("utf-8"))
+
+
+def loadCheckpoint(path: str, in_memory: bool = False):
+    """Restores a world saved by saveCheckpoint.
+    The arrays are memory mapped copy-on-write : they are read from the disk only
+    when accessed, and the changes of the restored world never modify the file, so
+    many worlds can be forked from the same checkpoint. The grids are built directly
+    around the mapped arrays by a CheckpointStorage of the saved tile_size, so a
+    world larger than the memory is restored without reading its fields.
+
+    Args:
+      path (str): path of the checkpoint file
+      in_memory (bool): True to copy every array in memory instead of mapping it
+
+    Returns:
+      World: the restored world
+    """
+    from World import World
+
+    header = readHeader(path)
+    arrays = {}
+    for name, description in header["arrays"].items():
+        shape = tuple(description["shape"])
+        if np.prod(shape) == 0:
+            array = np.zeros(shape, dtype=description["dtype"])
+        else:
+            array = np.memmap(
+                path,
+                dtype=description["dtype"],
+                mode="c",
+                offset=description["offset"],
+                shape=shape,
+            )
+        arrays[name] = np.array(array) if in_memory else array
+
+    storage = CheckpointStorage(arrays, header.get("tile_size"))
+    world = World(header["pixel_side"], storage=storage)
+    world.bg_color = tuple(header["bg_color"])
+    # The versions go on from the saved ones, so that no map of a field computed
+    # before the restore is taken for a map of the restored field
+    world.glucose_grid.version = header.get("glucose_version", 0)
+    world.temperature_grid.version = header.get("temperature_version", 0)
+    world.random_generator.seed = header["seed"]
+    world.random_generator.setState(header["random_state"])
+
+    population = CellPopulation(
+        header["default_max_age"],
+        header["default_replication_rate"],
+        header["default_speed"],
+        random_generator=world.random_generator,
+    )
+    population.size = header["size"]
+    population.capacity = header["capacity"]
+    population.used_slots_number = header["used_slots_number"]
+    population.free_slots = header["free_slots"]
+    for name, dtype in population.cell_attributes.items():
+        # Attributes added since the checkpoint was saved start at zero
+        if f"cell_{name}" in arrays:
+            setattr(population, name, arrays[f"cell_{name}"].astype(dtype, copy=False))
+        else:
+            setattr(population, name, np.zeros(population.capacity, dtype=dtype))
+    population.color = arrays["color"]
+    population.slot = arrays["slot"]
+    population.slot_index = arrays["slot_index"]
+    population.slot_generation = arrays["slot_generation"]
+
+    population.event_wheel = TimingWheel(header["wheel_size"], header["clock"])
+    for step, kind, slot, generation in arrays["events"].tolist():
+        population.event_wheel.schedule(step, (kind, slot, generation))
+    world.cell_population = population
+    return world
+
+
+if __name__ == "__main__":
+    import tempfile
+    import threading
+    import os
+    from Cell import Cell
+    from Simulation import Simulation
+    from World import World
+
+    the_world = World(200, seed=5)
+    the_world.cell_population.default_replication_rate = 1 / 20
+    the_world.addCellToList(Cell(the_world.environment_grid, 100, 100))
+    the_world.glucose_grid.changeMultipleGlucoseConcentration([4, 5], [6, 7], 0.004)
+    Simulation(the_world).step(60)
+
+    path = os.path.join(tempfile.mkdtemp(), "world.ckpt")
+    saveCheckpoint(the_world, path)
+    saved_glucose = the_world.glucose_grid.glucose_array.copy()
+    print(readHeader(path)["size"] == len(the_world.cell_population))  # OK
+
+    def getState(world) -> tuple:
+        population = world.cell_population
+        return (
+            population.x[: len(population)].tolist(),
+            population.y[: len(population)].tolist(),
+            world.glucose_grid.glucose_array.tolist(),
+            world.environment_grid.occupation_array.tolist(),
+        )
+
+    # Two worlds forked from the checkpoint evolve as the original one
+    forked_worlds = [loadCheckpoint(path), loadCheckpoint(path, in_memory=True)]
+    for world in [the_world] + forked_worlds:
+        Simulation(world).step(60)
+    for world in forked_worlds:
+        print(getState(world) == getState(the_world))  # OK
+
+    # The file is left untouched by the forked worlds
+    print(
+        (loadCheckpoint(path).glucose_grid.glucose_array == saved_glucose).all()
+    )  # OK
+
+    # A tiled world is restored around the mapped arrays, with its colors
+    tiled_world = World(200, seed=5, storage=FieldStorage(tile_size=8))
+    tiled_world.glucose_grid.changeMultipleGlucoseConcentration([4], [6], 0.004)
+    saveCheckpoint(tiled_world, path)
+    restored_world = loadCheckpoint(path)
+    restored_grid = restored_world.glucose_grid
+    print(restored_grid.storage.tile_size == 8)  # OK
+    print(isinstance(restored_grid.glucose_array, np.memmap))  # OK
+    print(isinstance(restored_grid.color_array, np.memmap))  # OK
+    print(
+        (restored_grid.color_array == tiled_world.glucose_grid.color_array).all()
+    )  # OK
+    restored_grid.makeGlucoseDiffuse()
+    tiled_world.glucose_grid.makeGlucoseDiffuse()
+    print(
+        (restored_grid.glucose_array == tiled_world.glucose_grid.glucose_array).all()
+    )  # OK
+
+    # The occupation of the units of the fields and their versions are restored
+    the_world.glucose_grid.occupation_array[3, 4] = True
+    the_world.temperature_grid.occupation_array[5, 6] = True
+    the_world.glucose_grid.signalUnitsChange()
+    saveCheckpoint(the_world, path)
+    restored_world = loadCheckpoint(path)
+    assert restored_world.glucose_grid.getGlucoseUnit(3, 4).is_occupied
+    assert restored_world.temperature_grid.getTemperatureUnit(5, 6).is_occupied
+    assert restored_world.glucose_grid.version == the_world.glucose_grid.version
+    assert restored_world.temperature_grid.version == the_world.temperature_grid.version
+    print(restored_world.glucose_grid.occupation_array.sum() == 1)  # OK
+
+    # Snapshots written by a slow writer thread, stuck until disk_ready is set : the
+    # world goes on meanwhile, and with drop_oldest only the newest snapshots waiting
+    # in the queue are written
+    disk_busy = threading.Event()
+    disk_ready = threading.Event()
+
+    def waitForDisk() -> None:
+        disk_busy.set()
+        disk_ready.wait()
+
+    slow_writer = AsyncWriter(max_queue_size=2, policy="drop_oldest")
+    slow_writer.submit(waitForDisk)
+    disk_busy.wait()
+    snapshot_paths = []
+    for index in range(5):
+        snapshot_paths.append(os.path.join(os.path.dirname(path), f"{index}.ckpt"))
+        saveCheckpoint(the_world, snapshot_paths[-1], slow_writer)
+        Simulation(the_world).step(5)
+    print(slow_writer.queue_depth == 2)  # OK
+    print(slow_writer.dropped_tasks_number == 3)  # OK
+    disk_ready.set()
+    slow_writer.close()
+    print(slow_writer.max_queue_depth == 2)  # OK
+    print([os.path.exists(snapshot_path) for snapshot_path in snapshot_paths])
+    # [False, False, False, True, True]
+    print(
+        loadCheckpoint(snapshot_paths[-1]).cell_population.clock
+        == the_world.cell_population.clock - 5
+    )  # OK
@@ -0,0 +1,86 @@
+import math
+import numpy as np
+
+# math.erf applied element by element on numpy arrays, for the color functions of the
+# tables
+vectorized_erf = np.vectorize(math.erf, otypes=[float])
+
+
+class Colormap:
+    """Lookup table of the colors of a scalar field.
+    The values between lower_bound and upper_bound are quantized into entries_number
+    evenly spaced entries, whose colors are computed once by a color function.
+    Coloring a whole field array is then a single gather in the table.
+
+    Attributes:
+      lower_bound (float): value of the first entry, lower values are clipped to it
+      upper_bound (float): value of the last entry, higher values are clipped to it
+      entries_number (int): number of entries of the table
+      table (np.ndarray): array of shape (entries_number, 3) of the RGB colors, as
+        unsigned bytes
+    """
+
+    lower_bound: float
+    upper_bound: float
+    entries_number: int
+    table: np.ndarray
+
+    def __init__(
+        self,
+        color_function,
+        lower_bound: float,
+        upper_bound: float,
+        entries_number: int = 4096,
+    ) -> None:
+        """
+        Args:
+          color_function: function computing the RGB colors of an array of values, as
+            an array whose last axis of size 3 is the color channels
+          lower_bound (float): value of the first entry of the table
+          upper_bound (float): value of the last entry of the table
+          entries_number (int): number of entries of the table, 256 or 4096 usually
+        """
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.entries_number = entries_number
+        values = np.linspace(lower_bound, upper_bound, entries_number)
+        self.table = np.clip(np.rint(color_function(values)), 0, 255).astype(np.uint8)
+
+    def __str__(self) -> str:
+        return (
+            f"Colormap of {self.entries_number} entries "
+            + f"from {self.lower_bound} to {self.upper_bound}\n"
+        )
+
+    def quantize(self, values) -> np.ndarray:
+        """Returns the indices of the table entries nearest to the values
+
+        Args:
+          values (float or np.ndarray): values to quantize
+
+        Returns:
+          np.ndarray: indices of the entries, of the shape of values
+        """
+        scale = (self.entries_number - 1) / (self.upper_bound - self.lower_bound)
+        indices = np.rint((np.asarray(values, dtype=float) - self.lower_bound) * scale)
+        return np.clip(indices, 0, self.entries_number - 1).astype(np.intp)
+
+    def apply(self, values, out: np.ndarray = None) -> np.ndarray:
+        """Returns the colors of the values, looked up in the table
+
+        Args:
+          values (float or np.ndarray): values to color
+          out (np.ndarray): array of shape values.shape + (3,) the colors are written
+            in, a new array of unsigned bytes is created if None
+
+        Returns:
+          np.ndarray: RGB colors, the last axis of size 3 being the color channels
+        """
+        return np.take(self.table, self.quantize(values), axis=0, out=out)
+
+
+if __name__ == "__main__":
+    gray = Colormap(lambda values: np.stack([values] * 3, axis=-1), 0, 255, 256)
+    print(gray)  # OK
+    print((gray.apply([0, 127.6, 300]) == [[0] * 3, [128] * 3, [255] * 3]).all())  # OK
+    print(gray.apply(np.zeros((4, 5))).shape == (4, 5, 3))  # OK
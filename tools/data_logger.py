@@ -1,19 +1,18 @@
-import matplotlib.pyplot as plt
-
-
 class DataLogger:
     """Class to use and log data
     Object contening data to study
     Attribute
     -------
     cell_list : list
-        List of data to study (actually a cells list)
+        List of data to study (actually a cells list or a CellPopulation)
     cell_count : list
         List of the number of cell by time
     Methods
     -------
     counting_cell(self) -> None
         Update cell_count and add it the length of the latest self.cell_list
+    record(self, simulation) -> None
+        Called by a Simulation every log_interval iterations, counts the cells
     draw_cell_number_by_time(self) -> None
         Draw a representation of number of cell by time
     """
@@ -32,7 +31,13 @@ class DataLogger:
     def countingCell(self):
         self.cell_count.append(len(self.cell_list))
 
+    def record(self, simulation):
+        self.countingCell()
+
     def drawCellNumberByTime(self):
+        # Imported here so that headless simulations don't need matplotlib
+        import matplotlib.pyplot as plt
+
         plt.plot([i / 10000 for i in range(len(self.cell_count))], self.cell_count)
         plt.title("Number of cell by time")
         plt.ylabel("Number of cell")
@@ -11,35 +11,50 @@ class Direction:
     WEST = (-1, 0)
     NORTHWEST = (-0.5, 0.5)
 
+    # Directions indexed by RandomGenerator.drawDirectionIndices
+    DIRECTIONS = (
+        NORTH,
+        NORTHEAST,
+        EAST,
+        SOUTHEAST,
+        SOUTH,
+        SOUTHWEST,
+        WEST,
+        NORTHWEST,
+    )
+    # Directions indexed by RandomGenerator.drawReplicationDirectionIndices
+    REPLICATION_DIRECTIONS = (NORTH, SOUTH, EAST, WEST)
+
     ###########
     # METHODS #
     ###########
     @staticmethod
-    def getRandomDirection():
+    def getRandomDirection(random_generator=None):
         """
         Return a random Direction
+
+        Args:
+          random_generator (RandomGenerator): generator used for the draw, the random
+            module if None
         """
-        return random.choice(
-            [
-                Direction.NORTH,
-                Direction.NORTHEAST,
-                Direction.EAST,
-                Direction.SOUTHEAST,
-                Direction.SOUTH,
-                Direction.SOUTHWEST,
-                Direction.WEST,
-                Direction.NORTHWEST,
-            ]
-        )
+        if random_generator is None:
+            return random.choice(Direction.DIRECTIONS)
+        return Direction.DIRECTIONS[random_generator.drawDirectionIndices(None)]
 
     @staticmethod
-    def getRandomReplicationDirection():
+    def getRandomReplicationDirection(random_generator=None):
         """
         Return a random Direction for replication -> chose only between North, South, East adn West
+
+        Args:
+          random_generator (RandomGenerator): generator used for the draw, the random
+            module if None
         """
-        return random.choice(
-            [Direction.NORTH, Direction.SOUTH, Direction.EAST, Direction.WEST]
-        )
+        if random_generator is None:
+            return random.choice(Direction.REPLICATION_DIRECTIONS)
+        return Direction.REPLICATION_DIRECTIONS[
+            random_generator.drawReplicationDirectionIndices(None)
+        ]
 
 
 if __name__ == "__main__":
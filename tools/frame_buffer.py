@@ -0,0 +1,63 @@
+import numpy as np
+from Cell import Cell
+
+
+def createFrameBuffer(pixel_dimensions: tuple) -> np.ndarray:
+    """Creates an RGB frame buffer in the layout of pygame.surfarray, indexed by [x, y]
+
+    Args:
+      pixel_dimensions (tuple): width and length of the frame, in pixels
+
+    Returns:
+      np.ndarray: array of shape (width, length, 3) of unsigned bytes
+    """
+    return np.zeros((pixel_dimensions[0], pixel_dimensions[1], 3), dtype=np.uint8)
+
+
+def paintCells(frame: np.ndarray, population, chunk_size: int = 4096) -> None:
+    """Paints every cell of a population as a Cell.width x Cell.length square of its
+    color, at its display position. The squares crossing a border of the frame are
+    wrapped to the opposite side, as the world is a torus.
+    The cells are painted by chunks of chunk_size cells, each chunk in one vectorized
+    assignment.
+
+    Args:
+      frame (np.ndarray): RGB frame buffer created by createFrameBuffer
+      population (CellPopulation): the cells to paint
+      chunk_size (int): number of cells painted at once, bounding the memory used
+    """
+    cells_number = len(population)
+    if cells_number == 0:
+        return None
+    population.adaptColors()
+
+    width_offsets = np.arange(Cell.width)
+    length_offsets = np.arange(Cell.length)
+    for start in range(0, cells_number, chunk_size):
+        cells = slice(start, min(start + chunk_size, cells_number))
+        x_pixels = (
+            np.floor(population.display_x[cells]).astype(np.int64)[:, None]
+            + width_offsets
+        ) % frame.shape[0]
+        y_pixels = (
+            np.floor(population.display_y[cells]).astype(np.int64)[:, None]
+            + length_offsets
+        ) % frame.shape[1]
+        colors = np.clip(population.color[cells], 0, 255).astype(np.uint8)
+        frame[x_pixels[:, :, None], y_pixels[:, None, :]] = colors[:, None, None, :]
+
+
+if __name__ == "__main__":
+    from environment.grid.EnvironmentGrid import EnvironmentGrid
+    from CellPopulation import CellPopulation
+
+    enviro = EnvironmentGrid(20, 20)
+    population = CellPopulation()
+    population.addCell(enviro, 0, 0)
+    population.addCell(enviro, 90, 50)  # Crossing the right border of the frame
+
+    frame = createFrameBuffer((enviro.width, enviro.length))
+    paintCells(frame, population)
+    print((frame[0, 0] == Cell.birth_color).all())  # OK
+    print((frame[5, 55] == Cell.birth_color).all())  # OK, wrapped
+    print((frame[50, 50] == 0).all())  # OK
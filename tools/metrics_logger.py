@@ -0,0 +1,256 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+import os
+import numpy as np
+from environment.unit.EnvironmentUnit import EnvironmentUnit
+from tools.async_writer import AsyncWriter
+
+# Metrics recorded by MetricsLogger, in the order of the columns
+METRIC_NAMES = (
+    "iteration",
+    "population",
+    "births",
+    "deaths",
+    "successful_moves",
+    "failed_moves",
+    "mean_age",
+    "total_glucose",
+    "mean_temperature",
+)
+
+# Formats of the files written by MetricsLogger
+FILE_FORMATS = ("binary", "csv")
+
+
+def getColumnPath(directory: str, metric_name: str) -> str:
+    """Returns the path of the binary file storing the column of a metric"""
+    return os.path.join(directory, f"{metric_name}.f64")
+
+
+def getCsvPath(directory: str) -> str:
+    """Returns the path of the CSV file storing every metric"""
+    return os.path.join(directory, "metrics.csv")
+
+
+def readMetrics(directory: str, file_format: str = "binary") -> dict:
+    """Reads the metrics written by a MetricsLogger, which may still be running.
+    Only the records flushed on disk are read, the binary columns being cut to the
+    length of the shortest one.
+
+    Args:
+      directory (str): directory of the files of the logger
+      file_format (str): format of the files, one of FILE_FORMATS
+
+    Returns:
+      dict: array of the values of each metric of METRIC_NAMES
+    """
+    if file_format == "binary":
+        columns = {
+            name: np.fromfile(getColumnPath(directory, name), dtype=np.float64)
+            for name in METRIC_NAMES
+        }
+        records_number = min(len(column) for column in columns.values())
+        return {name: column[:records_number] for name, column in columns.items()}
+    if file_format == "csv":
+        table = np.loadtxt(
+            getCsvPath(directory), delimiter=",", skiprows=1, ndmin=2
+        ).reshape(-1, len(METRIC_NAMES))
+        return {name: table[:, column] for column, name in enumerate(METRIC_NAMES)}
+    raise ValueError(
+        f"Unknown file format {file_format}, expected one of {FILE_FORMATS}"
+    )
+
+
+class MetricsLogger:
+    """Logger of a Simulation recording several metrics every log_interval iterations
+    into a fixed-size buffer, flushed on disk by chunks when it is full. The memory
+    used doesn't depend on the length of the run, and the files can be read by
+    readMetrics while the simulation is running.
+
+    The births, deaths and moves are counted over the interval since the previous
+    record. The total glucose is in kg, the mean temperature in Kelvin and the mean
+    age in loops.
+
+    In binary format, each metric is a column file of raw float64 values, appended at
+    each flush. In CSV format, the records are appended as rows of a single file.
+    With an AsyncWriter, the flushed records are written by its thread, so the disk
+    never blocks the simulation.
+
+    Attributes:
+      directory (str): directory the files are written in
+      file_format (str): format of the files, one of FILE_FORMATS
+      buffer (np.ndarray): array of shape (buffer_size, len(METRIC_NAMES)) of the
+        records not flushed yet
+      buffered_records_number (int): number of records stored in buffer
+      flushed_records_number (int): number of records already written on disk
+      last_counts (tuple): births, deaths, successful and failed moves numbers of the
+        simulation at the previous record
+      writer (AsyncWriter): thread writing the flushed records, None to write them
+        in the simulation's thread
+    """
+
+    directory: str
+    file_format: str
+    buffer: np.ndarray
+    buffered_records_number: int
+    flushed_records_number: int
+    last_counts: tuple
+    writer: AsyncWriter
+
+    def __init__(
+        self,
+        directory: str,
+        buffer_size: int = 4096,
+        file_format: str = "binary",
+        writer: AsyncWriter = None,
+    ) -> None:
+        """Creates the directory and empty files for the metrics
+
+        Args:
+          directory (str): directory the files are written in
+          buffer_size (int): number of records kept in memory before a flush
+          file_format (str): format of the files, one of FILE_FORMATS
+          writer (AsyncWriter): thread writing the flushed records, None to write
+            them in the simulation's thread
+        """
+        if file_format not in FILE_FORMATS:
+            raise ValueError(
+                f"Unknown file format {file_format}, expected one of {FILE_FORMATS}"
+            )
+        self.directory = directory
+        self.file_format = file_format
+        self.buffer = np.zeros((buffer_size, len(METRIC_NAMES)))
+        self.buffered_records_number = 0
+        self.flushed_records_number = 0
+        self.last_counts = (0, 0, 0, 0)
+        self.writer = writer
+
+        os.makedirs(directory, exist_ok=True)
+        if file_format == "binary":
+            for name in METRIC_NAMES:
+                open(getColumnPath(directory, name), "wb").close()
+        else:
+            with open(getCsvPath(directory), "w") as csv_file:
+                csv_file.write(",".join(METRIC_NAMES) + "\n")
+
+    def __str__(self) -> str:
+        string = f"Metrics logger writing in {self.directory} ({self.file_format})\n"
+        string += f"Records flushed : {self.flushed_records_number}, "
+        string += f"buffered : {self.buffered_records_number}\n"
+        return string
+
+    def record(self, simulation) -> None:
+        """Records the metrics of a simulation, called by the simulation every
+        log_interval iterations. The buffer is flushed when it is full.
+
+        Args:
+          simulation (Simulation): the simulation being logged
+        """
+        world = simulation.world
+        population = world.cell_population
+        counts = (
+            simulation.births_number,
+            simulation.deaths_number,
+            simulation.successful_moves_number,
+            simulation.failed_moves_number,
+        )
+        interval_counts = [
+            count - last_count for count, last_count in zip(counts, self.last_counts)
+        ]
+        self.last_counts = counts
+
+        self.buffer[self.buffered_records_number] = (
+            simulation.iteration,
+            len(population),
+            *interval_counts,
+            population.getAges().mean() if len(population) > 0 else 0,
+            world.glucose_grid.glucose_array.sum() * EnvironmentUnit.volume,
+            world.temperature_grid.temperature_array.mean(),
+        )
+        self.buffered_records_number += 1
+        if self.buffered_records_number == len(self.buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered records on disk, or gives a copy of them to the writer
+        thread, and empties the buffer
+        """
+        records = self.buffer[: self.buffered_records_number]
+        if self.writer is None:
+            self.writeRecords(records)
+        else:
+            self.writer.submit(self.writeRecords, records.copy())
+        self.flushed_records_number += self.buffered_records_number
+        self.buffered_records_number = 0
+
+    def writeRecords(self, records: np.ndarray) -> None:
+        """Appends records to the files
+
+        Args:
+          records (np.ndarray): array of shape (records_number, len(METRIC_NAMES))
+        """
+        if self.file_format == "binary":
+            for column, name in enumerate(METRIC_NAMES):
+                with open(getColumnPath(self.directory, name), "ab") as column_file:
+                    np.ascontiguousarray(records[:, column]).tofile(column_file)
+        else:
+            with open(getCsvPath(self.directory), "a") as csv_file:
+                np.savetxt(csv_file, records, delimiter=",", fmt="%.10g")
+
+    def close(self) -> None:
+        """Writes the remaining records on disk, to be called at the end of a run.
+        The writer thread, if any, is waited for.
+        """
+        self.flush()
+        if self.writer is not None:
+            self.writer.waitForTasks()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from Cell import Cell
+    from Simulation import Simulation
+    from World import World
+
+    for file_format in FILE_FORMATS:
+        the_world = World(200, seed=1)
+        # Created in the population of the world, the cells get its replication rate
+        # and maximal age, so that they are born and die during the run
+        the_world.cell_population.default_replication_rate = 1 / 10
+        the_world.cell_population.default_max_age = 40
+        the_world.cell_population.addCell(the_world.environment_grid, 100, 100)
+        directory = tempfile.mkdtemp()
+        logger = MetricsLogger(directory, buffer_size=8, file_format=file_format)
+        simulation = Simulation(the_world, logger, log_interval=10)
+
+        # The last iteration is logged, the records describing the final world
+        simulation.step(91)
+        print(logger.flushed_records_number == 8)  # OK
+        # The flushed records are readable during the run
+        print(len(readMetrics(directory, file_format)["iteration"]) == 8)  # OK
+        logger.close()
+        metrics = readMetrics(directory, file_format)
+        print(metrics["iteration"][-1] == 90)  # OK
+        print(metrics["population"][-1] == len(the_world.cell_population))  # OK
+        print(metrics["births"].sum() > 0 and metrics["deaths"].sum() > 0)  # OK
+        print(
+            metrics["population"][-1]
+            == 1 + metrics["births"].sum() - metrics["deaths"].sum()
+        )  # OK
+
+    # Writing the records in a background thread
+    the_world = World(200, seed=1)
+    the_world.addCellToList(Cell(the_world.environment_grid, 100, 100))
+    directory = tempfile.mkdtemp()
+    writer = AsyncWriter()
+    logger = MetricsLogger(directory, buffer_size=8, writer=writer)
+    Simulation(the_world, logger, log_interval=10).step(100)
+    logger.close()
+    writer.close()
+    print(len(readMetrics(directory)["iteration"]) == 10)  # OK
@@ -0,0 +1,243 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import itertools
+import numpy as np
+from Cell import Cell
+from Simulation import Simulation
+from World import World
+from tools.data_logger import DataLogger
+
+
+def makeParameterGrid(
+    replication_rates: list = None,
+    max_ages: list = None,
+    speeds: list = None,
+    seeds: list = None,
+) -> list[dict]:
+    """Returns every combination of the given cell parameters and seeds.
+    The parameters left to None take the default value of the class Cell.
+
+    Args:
+      replication_rates (list): probabilities of the cells to replicate in one loop
+      max_ages (list): maximal ages of the cells, in loops
+      speeds (list): speeds of the cells, in pixel.loop⁻¹
+      seeds (list): seeds of the worlds simulated for each combination of parameters
+
+    Returns:
+      list: dictionaries of keys "replication_rate", "max_age", "speed" and "seed"
+    """
+    combinations = itertools.product(
+        [Cell.replication_rate] if replication_rates is None else replication_rates,
+        [Cell.max_age] if max_ages is None else max_ages,
+        [Cell.speed] if speeds is None else speeds,
+        [0] if seeds is None else seeds,
+    )
+    return [
+        {"replication_rate": rate, "max_age": age, "speed": speed, "seed": seed}
+        for rate, age, speed, seed in combinations
+    ]
+
+
+def runWorld(
+    parameters: dict, iterations: int, world_side: int = 500, log_interval: int = 100
+) -> dict:
+    """Simulates a headless world starting from one cell in its middle, whose cells
+    have the given parameters, and returns its population curve.
+    The parameters are the defaults of the world's population, the class Cell is left
+    untouched, so several worlds can be simulated in the same process.
+
+    Args:
+      parameters (dict): dictionary of makeParameterGrid
+      iterations (int): number of iterations to simulate
+      world_side (int): number of pixels of the side of the world
+      log_interval (int): number of iterations between two counts of the cells
+
+    Returns:
+      dict: the parameters and the key "population", array of the number of cells
+        every log_interval iterations, completed with zeros after an extinction
+    """
+    the_world = World(world_side, seed=parameters["seed"])
+    population = the_world.cell_population
+    population.default_replication_rate = parameters["replication_rate"]
+    population.default_max_age = parameters["max_age"]
+    population.default_speed = parameters["speed"]
+    Cell(the_world.environment_grid, world_side / 2, world_side / 2, population)
+
+    logger = DataLogger(population)
+    Simulation(the_world, logger, log_interval).step(iterations)
+
+    curve = np.zeros(-(-iterations // log_interval), dtype=np.int64)
+    curve[: len(logger.cell_count)] = logger.cell_count
+    return dict(parameters, population=curve)
+
+
+class ParameterSweep:
+    """Runs headless worlds for every combination of a parameter grid, spread over the
+    processes of a ProcessPoolExecutor, in order to compare cell types.
+    The population curve of each world is returned as soon as its run is over.
+
+    Attributes:
+      parameter_grid (list): dictionaries of makeParameterGrid, one per world
+      iterations (int): number of iterations simulated for each world
+      world_side (int): number of pixels of the side of the worlds
+      log_interval (int): number of iterations between two counts of the cells
+      max_workers (int): number of processes, the number of processors if None
+      results (list): dictionaries returned by runWorld, in order of completion
+    """
+
+    parameter_grid: list
+    iterations: int
+    world_side: int
+    log_interval: int
+    max_workers: int
+    results: list
+
+    def __init__(
+        self,
+        parameter_grid: list,
+        iterations: int,
+        world_side: int = 500,
+        log_interval: int = 100,
+        max_workers: int = None,
+    ) -> None:
+        """
+        Args:
+          parameter_grid (list): dictionaries of makeParameterGrid, one per world
+          iterations (int): number of iterations simulated for each world
+          world_side (int): number of pixels of the side of the worlds
+          log_interval (int): number of iterations between two counts of the cells
+          max_workers (int): number of processes, the number of processors if None
+        """
+        self.parameter_grid = parameter_grid
+        self.iterations = iterations
+        self.world_side = world_side
+        self.log_interval = log_interval
+        self.max_workers = max_workers
+        self.results = []
+
+    def __str__(self) -> str:
+        string = f"Sweep of {len(self.parameter_grid)} worlds "
+        string += f"of {self.iterations} iterations\n"
+        string += f"Finished runs : {len(self.results)}\n"
+        return string
+
+    def iterateRuns(self):
+        """Runs every world of the parameter grid and yields the result of each run as
+        soon as it is over. The results are also stored in results.
+
+        Yields:
+          dict: dictionary returned by runWorld
+        """
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    runWorld,
+                    parameters,
+                    self.iterations,
+                    self.world_side,
+                    self.log_interval,
+                )
+                for parameters in self.parameter_grid
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results.append(result)
+                yield result
+
+    def run(self, callback=None) -> list:
+        """Runs every world of the parameter grid.
+
+        Args:
+          callback: function called with the result of each run as soon as it is over
+
+        Returns:
+          list: dictionaries returned by runWorld, in order of completion
+        """
+        for result in self.iterateRuns():
+            if callback is not None:
+                callback(result)
+        return self.results
+
+    def getDataset(self) -> dict:
+        """Gathers the finished runs into arrays, sorted by parameters then seed.
+
+        Returns:
+          dict: arrays "replication_rate", "max_age", "speed" and "seed" of one value
+            per run, "population" of shape (runs, samples) and "iteration" of the
+            iterations of the samples
+        """
+        results = sorted(
+            self.results,
+            key=lambda result: (
+                result["replication_rate"],
+                result["max_age"],
+                result["speed"],
+                result["seed"],
+            ),
+        )
+        dataset = {
+            key: np.array([result[key] for result in results])
+            for key in ("replication_rate", "max_age", "speed", "seed")
+        }
+        dataset["population"] = np.array(
+            [result["population"] for result in results], dtype=np.int64
+        ).reshape(len(results), -(-self.iterations // self.log_interval))
+        dataset["iteration"] = np.arange(0, self.iterations, self.log_interval)
+        return dataset
+
+    def saveDataset(self, path: str) -> None:
+        """Saves the dataset of getDataset in a .npz file
+
+        Args:
+          path (str): path of the file
+        """
+        np.savez(path, **self.getDataset())
+
+    def drawPopulationCurves(self) -> None:
+        """Draws the population curve of each combination of parameters, averaged over
+        the seeds
+        """
+        # Imported here so that headless sweeps don't need matplotlib
+        import matplotlib.pyplot as plt
+
+        dataset = self.getDataset()
+        parameters = np.stack(
+            (dataset["replication_rate"], dataset["max_age"], dataset["speed"]),
+            axis=1,
+        )
+        combinations, inverse = np.unique(parameters, axis=0, return_inverse=True)
+        for combination_index, (rate, age, speed) in enumerate(combinations):
+            curves = dataset["population"][inverse.ravel() == combination_index]
+            plt.plot(
+                dataset["iteration"],
+                curves.mean(axis=0),
+                label=f"rate={rate:g} max_age={age:g} speed={speed:g}",
+            )
+        plt.title("Number of cell by time for each cell type")
+        plt.ylabel("Number of cell")
+        plt.xlabel("Iterations")
+        plt.legend()
+        plt.show()
+
+
+if __name__ == "__main__":
+    grid = makeParameterGrid(replication_rates=[1 / 100, 1 / 20], seeds=[0, 1])
+    print(len(grid) == 4)  # OK
+
+    # Running in the same process gives the same curve as in a worker process
+    single_result = runWorld(grid[0], 300, world_side=200, log_interval=10)
+    print(len(single_result["population"]) == 30)  # OK
+
+    sweep = ParameterSweep(grid, 300, world_side=200, log_interval=10, max_workers=2)
+    sweep.run(callback=lambda result: print(result["seed"], result["population"][-1]))
+    print(sweep)
+    dataset = sweep.getDataset()
+    print(dataset["population"].shape == (4, 30))  # OK
+    print((dataset["population"][0] == single_result["population"]).all())  # OK
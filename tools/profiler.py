@@ -0,0 +1,141 @@
+import json
+import os
+import time
+
+
+class Profiler:
+    """Timer of the phases of the iterations of a Simulation (diffusion, deaths,
+    aging, movements, replications, logging, rendering...).
+    It keeps the cumulative duration and the number of calls of every phase, and can
+    record every call as a Chrome trace event, to be opened in chrome://tracing or
+    https://ui.perfetto.dev.
+    A simulation without profiler calls its phases directly, so profiling costs
+    nothing when it is disabled.
+
+    Attributes:
+      record_trace (bool): True to record a trace event for every call of a phase
+      durations (dict): cumulative duration of every phase, in seconds
+      calls_numbers (dict): number of calls of every phase
+      trace_events (list): Chrome trace events of the calls, as dictionaries
+      steps_number (int): number of iterations counted by countStep
+      cell_steps_number (int): sum of the numbers of cells of the counted iterations
+      origin (float): time the timestamps of the trace events are relative to
+    """
+
+    record_trace: bool
+    durations: dict
+    calls_numbers: dict
+    trace_events: list
+    steps_number: int
+    cell_steps_number: int
+    origin: float
+
+    def __init__(self, record_trace: bool = False) -> None:
+        """
+        Args:
+          record_trace (bool): True to record a trace event for every call of a phase
+        """
+        self.record_trace = record_trace
+        self.reset()
+
+    def __str__(self) -> str:
+        step_duration = self.durations.get("step", 0)
+        string = f"{'phase':<14}{'total (ms)':>12}{'calls':>9}{'mean (us)':>11}{'share':>8}\n"
+        for name, duration in sorted(self.durations.items(), key=lambda item: -item[1]):
+            calls_number = self.calls_numbers[name]
+            share = duration / step_duration if step_duration > 0 else 0
+            string += f"{name:<14}{1000 * duration:>12.2f}{calls_number:>9}"
+            string += f"{10**6 * duration / calls_number:>11.1f}{share:>8.1%}\n"
+        string += f"Steps per second : {self.steps_per_second:.1f}\n"
+        string += f"Cells x steps per second : {self.cell_steps_per_second:.1f}\n"
+        return string
+
+    @property
+    def steps_per_second(self) -> float:
+        """Number of iterations computed per second, from the duration of the "step"
+        phase
+        """
+        step_duration = self.durations.get("step", 0)
+        return self.steps_number / step_duration if step_duration > 0 else 0.0
+
+    @property
+    def cell_steps_per_second(self) -> float:
+        """Number of cells simulated for one iteration per second"""
+        step_duration = self.durations.get("step", 0)
+        return self.cell_steps_number / step_duration if step_duration > 0 else 0.0
+
+    def reset(self) -> None:
+        """Forgets every measure"""
+        self.durations = {}
+        self.calls_numbers = {}
+        self.trace_events = []
+        self.steps_number = 0
+        self.cell_steps_number = 0
+        self.origin = time.perf_counter()
+
+    def timePhase(self, name: str, function, *args):
+        """Calls function(*args) and adds its duration to the phase name.
+        Phases can be nested, the "step" phase containing the others.
+
+        Args:
+          name (str): name of the phase
+          function: function computing the phase
+          args: arguments of the function
+
+        Returns:
+          the result of the function
+        """
+        start = time.perf_counter()
+        result = function(*args)
+        end = time.perf_counter()
+        self.durations[name] = self.durations.get(name, 0) + end - start
+        self.calls_numbers[name] = self.calls_numbers.get(name, 0) + 1
+        if self.record_trace:
+            self.trace_events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": 10**6 * (start - self.origin),
+                    "dur": 10**6 * (end - start),
+                    "pid": os.getpid(),
+                    "tid": 0,
+                }
+            )
+        return result
+
+    def countStep(self, cells_number: int) -> None:
+        """Counts an iteration of cells_number cells for the throughput measures"""
+        self.steps_number += 1
+        self.cell_steps_number += cells_number
+
+    def saveTrace(self, path: str) -> None:
+        """Saves the recorded trace events in a Chrome trace JSON file
+
+        Args:
+          path (str): path of the JSON file
+        """
+        with open(path, "w") as trace_file:
+            json.dump(
+                {"traceEvents": self.trace_events, "displayTimeUnit": "ms"}, trace_file
+            )
+
+
+if __name__ == "__main__":
+    profiler = Profiler(record_trace=True)
+    for i in range(3):
+        profiler.countStep(10)
+        profiler.timePhase("step", profiler.timePhase, "sleep", time.sleep, 0.01)
+    print(profiler.calls_numbers == {"sleep": 3, "step": 3})  # OK
+    print(profiler.durations["step"] >= profiler.durations["sleep"] >= 0.03)  # OK
+    print(
+        abs(10 * profiler.steps_per_second - profiler.cell_steps_per_second) < 1e-6
+    )  # OK
+    print(len(profiler.trace_events) == 6)  # OK
+    print(profiler)
+
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "trace.json")
+    profiler.saveTrace(path)
+    with open(path) as trace_file:
+        print(len(json.load(trace_file)["traceEvents"]) == 6)  # OK
@@ -0,0 +1,132 @@
+import numpy as np
+
+
+class RandomGenerator:
+    """Seedable source of the random numbers of a world, backed by a
+    numpy.random.Generator. The draws of one simulation step are made for all the
+    cells at once.
+
+    Attributes:
+      seed (int): seed the generator was created with, None for an unpredictable one
+      generator (np.random.Generator): the underlying numpy generator
+    """
+
+    seed: int
+    generator: np.random.Generator
+
+    def __init__(self, seed: int = None) -> None:
+        """
+        Args:
+          seed (int): seed of the generator, two generators of the same seed give the
+            same draws. None to seed it from the operating system
+        """
+        self.seed = seed
+        self.generator = np.random.default_rng(seed)
+
+    def __str__(self) -> str:
+        return f"Random generator of seed {self.seed}\n"
+
+    def random(self, draws_number: int = None):
+        """Returns random floats uniformly drawn in [0, 1)
+
+        Args:
+          draws_number (int): number of floats drawn, a single float if None
+        """
+        return self.generator.random(draws_number)
+
+    def drawDirectionIndices(self, draws_number: int) -> np.ndarray:
+        """Draws indices of Direction.DIRECTIONS, one for each moving cell
+
+        Args:
+          draws_number (int): number of indices drawn
+
+        Returns:
+          np.ndarray: integers between 0 and 7
+        """
+        return self.generator.integers(0, 8, draws_number)
+
+    def drawWeightedDirectionIndices(
+        self, cumulative_probabilities: np.ndarray
+    ) -> np.ndarray:
+        """Draws indices of Direction.DIRECTIONS, one for each moving cell, each cell
+        having its own probabilities of the directions
+
+        Args:
+          cumulative_probabilities (np.ndarray): array of shape (8, draws_number) of
+            the cumulative probabilities of the directions for each cell, the last
+            row being 1
+
+        Returns:
+          np.ndarray: integers between 0 and 7
+        """
+        draws = self.generator.random(cumulative_probabilities.shape[1])
+        return (cumulative_probabilities[:-1] <= draws).sum(axis=0)
+
+    def drawReplicationDirectionIndices(self, draws_number: int) -> np.ndarray:
+        """Draws indices of Direction.REPLICATION_DIRECTIONS, one for each replicating cell
+
+        Args:
+          draws_number (int): number of indices drawn
+
+        Returns:
+          np.ndarray: integers between 0 and 3
+        """
+        return self.generator.integers(0, 4, draws_number)
+
+    def drawReplications(self, replication_rates: np.ndarray) -> np.ndarray:
+        """Bernoulli draws deciding which cells are capable of replicating
+
+        Args:
+          replication_rates (np.ndarray): probabilities of the cells to replicate
+
+        Returns:
+          np.ndarray: boolean array, True for the cells capable of replicating
+        """
+        return self.generator.random(len(replication_rates)) <= replication_rates
+
+    def drawReplicationDelays(self, replication_rates: np.ndarray) -> np.ndarray:
+        """Draws the numbers of steps until the next replication attempt of several
+        cells, following a geometric distribution : the delay is the number of
+        Bernoulli draws of parameter replication_rate needed to get a success.
+
+        Args:
+          replication_rates (np.ndarray): probabilities of the cells to replicate, in ]0, 1]
+
+        Returns:
+          np.ndarray: integers at least equal to 1
+        """
+        return self.generator.geometric(replication_rates)
+
+    def getState(self) -> dict:
+        """Returns the state of the generator, to be given to setState"""
+        return self.generator.bit_generator.state
+
+    def setState(self, state: dict) -> None:
+        """Restores a state returned by getState
+
+        Args:
+          state (dict): state of the bit generator
+        """
+        self.generator.bit_generator.state = state
+
+
+if __name__ == "__main__":
+    first_generator = RandomGenerator(42)
+    second_generator = RandomGenerator(42)
+
+    # Reproducibility tests
+    print(
+        (
+            first_generator.drawDirectionIndices(10)
+            == second_generator.drawDirectionIndices(10)
+        ).all()
+    )  # OK
+    state = first_generator.getState()
+    draws = first_generator.drawReplications(np.full(5, 0.5))
+    first_generator.setState(state)
+    print((first_generator.drawReplications(np.full(5, 0.5)) == draws).all())  # OK
+    certain_directions = np.zeros((3, 8))
+    certain_directions[0, 2:] = certain_directions[1, 7:] = 1
+    certain_directions[2] = 1
+    print(first_generator.drawWeightedDirectionIndices(certain_directions.T).tolist())
+    # OK -> [2, 7, 0]
@@ -0,0 +1,63 @@
+import pygame
+from tools.frame_buffer import createFrameBuffer, paintCells
+
+
+class Renderer:
+    """Observer of a Simulation displaying the cells of its world in a pygame window.
+    Every cell is painted in a NumPy frame buffer, blitted on the window at once.
+    The cells can be painted over the cached map of a glucose or temperature grid.
+
+    Attributes:
+      window (pygame.Surface): the pygame window the world is displayed on
+      bg_color (tuple): RGB tuple of the color of the background
+      frame (np.ndarray): RGB frame buffer of the window, indexed by [x, y]
+      render_interval (int): number of iterations between two drawn frames
+      field_grid (GlucoseGrid or TemperatureGrid): grid displayed under the cells,
+        None for a plain background
+      is_running (bool): False once the user has closed the window
+    """
+
+    def __init__(self, world, render_interval: int = 1, field_grid=None) -> None:
+        """
+        Args:
+          world (World): object of class World to display
+          render_interval (int): number of iterations between two drawn frames
+          field_grid (GlucoseGrid or TemperatureGrid): grid of the world displayed
+            under the cells, None for a plain background
+        """
+        pygame.init()  # Initiation of pygame -> mandatory
+        self.window = pygame.display.set_mode(world.pixel_dimensions)
+        self.bg_color = world.bg_color
+        self.window.fill(self.bg_color)
+        self.frame = createFrameBuffer(world.pixel_dimensions)
+        self.render_interval = render_interval
+        self.field_grid = field_grid
+        self.is_running = True
+
+    def update(self, simulation) -> None:
+        """Draws every cell of the simulated world and displays the window, once every
+        render_interval iterations. The events of the user are collected at every
+        iteration.
+
+        Args:
+          simulation (Simulation): the simulation which has just been updated
+        """
+        for event in pygame.event.get():  # Collecting the events from the user
+            if event.type == pygame.QUIT:  # End loop if user click on cross butun
+                self.is_running = False
+                return None
+
+        if simulation.iteration % self.render_interval != 0:
+            return None
+
+        if self.field_grid is None:
+            self.frame[...] = self.bg_color  # Resetting the frame blank
+        else:
+            self.frame[...] = simulation.world.getMapPixels(self.field_grid)
+        paintCells(self.frame, simulation.world.cell_population)
+        pygame.surfarray.blit_array(self.window, self.frame)
+        pygame.display.flip()  # Displaying the window continuously
+
+    def close(self) -> None:
+        """Closes the pygame window"""
+        pygame.quit()
@@ -0,0 +1,128 @@
+if __name__ == "__main__":
+    import os
+    import sys
+
+    currentdir = os.path.dirname(os.path.realpath(__file__))
+    parentdir = os.path.dirname(currentdir)
+    sys.path.append(parentdir)
+
+import math
+from environment.diffusion import EXPLICIT_STABILITY_LIMIT
+from environment.unit.EnvironmentUnit import EnvironmentUnit
+import environment.physical_data as phy
+
+# Subsystems of a Simulation, each advanced at its own period
+SUBSYSTEMS = ("glucose", "temperature", "cells", "logging", "rendering")
+
+
+class Scheduler:
+    """Clocks of the subsystems of a Simulation. Each subsystem is advanced every
+    period iterations of the game loop, at the iterations multiple of its period.
+    A field advanced every period iterations diffuses for period * time_step seconds
+    at once, so the fields only pay for the updates their physics needs.
+
+    Attributes:
+      time_step (float): duration of one iteration of the game loop, in seconds
+      periods (dict): number of iterations between two updates of every subsystem of
+        SUBSYSTEMS
+    """
+
+    time_step: float
+    periods: dict
+
+    def __init__(
+        self, periods: dict = None, time_step: float = phy.TIME_ITERATION
+    ) -> None:
+        """
+        Args:
+          periods (dict): number of iterations between two updates of some subsystems
+            of SUBSYSTEMS, the others being updated at every iteration
+          time_step (float): duration of one iteration of the game loop, in seconds
+        """
+        periods = {} if periods is None else periods
+        for name, period in periods.items():
+            if name not in SUBSYSTEMS:
+                raise ValueError(
+                    f"Unknown subsystem {name}, expected one of {SUBSYSTEMS}"
+                )
+            if period < 1:
+                raise ValueError(f"The period of {name} must be at least 1")
+        self.periods = {name: int(periods.get(name, 1)) for name in SUBSYSTEMS}
+        self.time_step = time_step
+
+    def __str__(self) -> str:
+        string = "Scheduler periods :\n"
+        for name, period in self.periods.items():
+            string += f"{name} : {period} iterations ({self.getDuration(name)} s)\n"
+        return string
+
+    @classmethod
+    def fromStabilityLimits(
+        cls,
+        log_interval: int = 1,
+        render_interval: int = 1,
+        cells_period: int = 1,
+        time_step: float = phy.TIME_ITERATION,
+    ) -> "Scheduler":
+        """Returns a scheduler advancing each field at the longest period for which a
+        single explicit diffusion step stays stable, computed from the diffusion
+        coefficients and the thickness of an EnvironmentUnit.
+        The periods follow the diffusion numbers of the grids, those of units 1 m
+        apart (see phy.computeGlucoseDiffusionNumber) : about 96 s for the glucose
+        and 0.44 s for the heat. With the dimensionless numbers of real units, the
+        stable time steps would be about 2.4 * 10⁻⁵ s and 10⁻⁷ s, far below an
+        iteration, so these periods only suit the diffusion speed of the model.
+
+        Args:
+          log_interval (int): number of iterations between two calls to the logger
+          render_interval (int): number of iterations between two renderings
+          cells_period (int): number of iterations between two updates of the cells
+          time_step (float): duration of one iteration of the game loop, in seconds
+        """
+        unit_thickness = EnvironmentUnit.volume / EnvironmentUnit.surface
+        glucose_time_step = phy.computeGlucoseStableTimeStep(
+            unit_thickness, EXPLICIT_STABILITY_LIMIT
+        )
+        thermal_time_step = phy.computeThermalStableTimeStep(
+            unit_thickness, EXPLICIT_STABILITY_LIMIT
+        )
+        return cls(
+            {
+                "glucose": max(1, math.floor(glucose_time_step / time_step)),
+                "temperature": max(1, math.floor(thermal_time_step / time_step)),
+                "cells": cells_period,
+                "logging": log_interval,
+                "rendering": render_interval,
+            },
+            time_step,
+        )
+
+    def isDue(self, name: str, iteration: int) -> bool:
+        """Returns True if the subsystem name is updated at this iteration"""
+        return iteration % self.periods[name] == 0
+
+    def getDuration(self, name: str) -> float:
+        """Returns the time between two updates of the subsystem name, in seconds"""
+        return self.periods[name] * self.time_step
+
+
+if __name__ == "__main__":
+    scheduler = Scheduler({"logging": 100})
+    print([scheduler.isDue("logging", i) for i in (0, 50, 200)] == [True, False, True])
+    # OK
+    print(scheduler.isDue("glucose", 7))  # OK
+
+    # The fields are advanced by single stable explicit steps
+    scheduler = Scheduler.fromStabilityLimits()
+    unit_thickness = EnvironmentUnit.volume / EnvironmentUnit.surface
+    for name, computeDiffusionNumber in (
+        ("glucose", phy.computeGlucoseDiffusionNumber),
+        ("temperature", phy.computeThermalDiffusionNumber),
+    ):
+        diffusion_number = computeDiffusionNumber(
+            unit_thickness, scheduler.getDuration(name)
+        )
+        print(
+            EXPLICIT_STABILITY_LIMIT / 2 < diffusion_number <= EXPLICIT_STABILITY_LIMIT
+        )  # OK
+    print(scheduler)
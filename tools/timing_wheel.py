@@ -0,0 +1,86 @@
+class TimingWheel:
+    """Bucketed timing wheel scheduling events at future steps of a simulation.
+    An event scheduled at a step is stored in the bucket step % wheel_size, so that
+    only the bucket of the current step has to be visited to find the due events.
+    Events more than wheel_size steps ahead stay in their bucket until their round comes.
+
+    Attributes:
+      wheel_size (int): number of buckets of the wheel
+      current_step (int): step whose events are returned by popDueEvents
+      buckets (list): lists of (step, event) tuples
+      events_number (int): number of events waiting in the wheel
+    """
+
+    wheel_size: int
+    current_step: int
+    buckets: list
+    events_number: int
+
+    def __init__(self, wheel_size: int = 1024, current_step: int = 0) -> None:
+        """
+        Args:
+          wheel_size (int): number of buckets of the wheel
+          current_step (int): step the wheel starts at
+        """
+        self.wheel_size = wheel_size
+        self.current_step = current_step
+        self.buckets = [[] for _ in range(wheel_size)]
+        self.events_number = 0
+
+    def __len__(self) -> int:
+        return self.events_number
+
+    def __str__(self) -> str:
+        return f"Timing wheel at step {self.current_step} with {self.events_number} events\n"
+
+    def schedule(self, step: int, event) -> None:
+        """Schedules an event. An event scheduled at a step already passed is due at the
+        current step.
+
+        Args:
+          step (int): step the event is due at
+          event: any object, returned by popDueEvents when the event is due
+        """
+        step = max(step, self.current_step)
+        self.buckets[step % self.wheel_size].append((step, event))
+        self.events_number += 1
+
+    def popDueEvents(self) -> list:
+        """Removes and returns the events due at the current step.
+
+        Returns:
+          list: (step, event) tuples of the due events
+        """
+        bucket = self.buckets[self.current_step % self.wheel_size]
+        due_events = [entry for entry in bucket if entry[0] <= self.current_step]
+        if due_events:
+            bucket[:] = [entry for entry in bucket if entry[0] > self.current_step]
+            self.events_number -= len(due_events)
+        return due_events
+
+    def advance(self) -> None:
+        """Moves the wheel to the next step"""
+        self.current_step += 1
+
+    def getPendingEvents(self) -> list:
+        """Returns every (step, event) tuple waiting in the wheel, sorted by step"""
+        return sorted(
+            (entry for bucket in self.buckets for entry in bucket),
+            key=lambda entry: entry[0],
+        )
+
+
+if __name__ == "__main__":
+    wheel = TimingWheel(4)
+    wheel.schedule(1, "first")
+    wheel.schedule(5, "second")  # Same bucket as the first event, one round later
+    wheel.schedule(-3, "late")
+
+    # Due events tests
+    print(wheel.popDueEvents() == [(0, "late")])  # OK
+    wheel.advance()
+    print(wheel.popDueEvents() == [(1, "first")])  # OK
+    for i in range(4):
+        wheel.advance()
+    print(wheel.popDueEvents() == [(5, "second")])  # OK
+    print(len(wheel) == 0)  # OK